@@ -0,0 +1,106 @@
+"""
+Benchmark de memória: pico de RSS do PresencePipeline em um mês sintético grande.
+
+Cada cenário roda em um subprocesso novo (o pico de RSS é por processo). A
+escrita em Excel é descartada para medir apenas o fluxo de dados.
+
+    python benchmarks/memory_benchmark.py --students 20000
+    python benchmarks/memory_benchmark.py --students 20000 --modes on off
+
+Para comparar com uma versão anterior do código, rode o mesmo comando em um
+checkout daquela versão (ex.: git worktree) e compare os números.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / 'benchmarks'))
+
+class _DiscardingWriter:
+    def save_report_to_excel(self, report_tabs: dict, base_filename: str) -> str:
+        return f"{base_filename} ({len(report_tabs)} abas descartadas)"
+
+    def update_master_database(self, df, spreadsheet_id, tab_name):
+        return None
+
+    def save_presence_cube(self, presence_cube, key_registry=None):
+        return None
+
+    def save_quality_report(self, report):
+        return None
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _run_child(args) -> dict:
+    import logging
+    import pandas as pd
+    from presenca.pipeline import PresencePipeline
+    from synthetic_month import build_month
+
+    logging.disable(logging.CRITICAL)
+
+    dados = build_month(args.year, args.month, n_students=args.students, punches_per_day=args.punches)
+    n_batidas = len(dados['registros_brutos'])
+    rss_inputs = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = SimpleNamespace(
+            ANO_DO_RELATORIO=args.year, MES_DO_RELATORIO=args.month, MODO_EXECUCAO='local',
+            CAMINHOS={'local': {'output': tmp, 'dashboard': tmp, 'output_dashboard': tmp}}
+        )
+        start = time.perf_counter()
+        resultado = PresencePipeline(None, _DiscardingWriter(), config, copy_on_write=args.mode == 'on').run(dados_input=dados)
+        elapsed = time.perf_counter() - start
+
+    # run() devolve "" quando alguma etapa falha: medir essa execução seria medir um pipeline pela metade.
+    if not resultado:
+        raise RuntimeError("O pipeline falhou durante o benchmark (run() devolveu vazio).")
+
+    return {
+        'copy_on_write': args.mode,
+        'linhas_xml': n_batidas,
+        'pico_rss_entradas_mb': round(rss_inputs, 1),
+        'pico_rss_total_mb': round(_peak_rss_mb(), 1),
+        'tempo_s': round(elapsed, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--punches', type=int, default=3, help='batidas por aluno presente no dia')
+    parser.add_argument('--year', type=int, default=2025)
+    parser.add_argument('--month', type=int, default=11)
+    parser.add_argument('--modes', nargs='+', choices=['on', 'off'], default=['on'],
+                        help='copy-on-write do pandas em cada cenário')
+    parser.add_argument('--mode', choices=['on', 'off'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_run_child(args)))
+        return
+
+    for mode in args.modes:
+        cmd = [sys.executable, __file__, '--mode', mode, '--students', str(args.students),
+               '--punches', str(args.punches), '--year', str(args.year), '--month', str(args.month)]
+        out = subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_ROOT,
+                             env={**os.environ, 'PYTHONWARNINGS': 'ignore'})
+        if out.returncode != 0:
+            sys.exit(f"copy-on-write={mode}: benchmark falhou.\n{out.stderr.strip()}")
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        delta = result['pico_rss_total_mb'] - result['pico_rss_entradas_mb']
+        print(f"copy-on-write={mode}: {result['linhas_xml']} batidas | "
+              f"pico RSS {result['pico_rss_total_mb']} MB (+{delta:.1f} MB no pipeline) | {result['tempo_s']}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Gera em memória um mês sintético no formato do DataReader (mesmas chaves e
+colunas brutas), para benchmarks do pipeline sem depender de XMLs/planilhas.
+"""
+import calendar
+import numpy as np
+import pandas as pd
+import schema
+
+COORDENADORES = ['Prof. Alpha', 'prof. beta', 'PROF. GAMMA', 'Prof. Delta ', '']
+FUNCOES = ['Aluno de mestrado', 'Aluno de doutorado', 'Pesquisador', 'Aluno de graduação']
+
+def build_month(ano: int, mes: int, n_students: int = 5000, punches_per_day: int = 3,
+                presence_rate: float = 0.6, n_unknown: int = 200, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    ids = np.arange(100000, 100000 + n_students)
+    nomes = np.array([f"Aluno Sintetico {i}" for i in range(n_students)], dtype=object)
+
+    cadastro = pd.DataFrame({
+        schema.CADASTRO_NOME_COMPLETO: nomes,
+        schema.CADASTRO_FUNCAO: rng.choice(FUNCOES, n_students),
+        schema.CADASTRO_COORDENADOR: rng.choice(COORDENADORES, n_students),
+        schema.CADASTRO_ID_STONELAB: ids,
+        schema.CADASTRO_NOME_ENTRADA: np.char.lower(nomes.astype(str)).astype(object),
+    })
+
+    inicio = pd.Timestamp(ano, mes, 1) - pd.to_timedelta(rng.integers(0, 365, n_students), unit='D')
+    io_alunos = pd.DataFrame({
+        schema.IO_COL_ID_RAW: ids,
+        schema.IO_COL_START_RAW: inicio.strftime('%d/%m/%Y'),
+        schema.IO_COL_FREQ1_RAW: rng.integers(1, 6, n_students),
+    })
+
+    _, ultimo_dia = calendar.monthrange(ano, mes)
+    dias = pd.bdate_range(pd.Timestamp(ano, mes, 1), pd.Timestamp(ano, mes, ultimo_dia))
+    nomes_xml = np.concatenate([cadastro[schema.CADASTRO_NOME_ENTRADA].to_numpy(),
+                                np.array([f"Visitante {i}" for i in range(n_unknown)], dtype=object)])
+
+    presentes = rng.random((len(dias), len(nomes_xml))) < presence_rate
+    dia_idx, pessoa_idx = np.nonzero(presentes)
+    dia_idx = np.repeat(dia_idx, punches_per_day)
+    pessoa_idx = np.repeat(pessoa_idx, punches_per_day)
+    segundos = rng.integers(7 * 3600, 21 * 3600, len(dia_idx))
+    horarios = dias.to_numpy()[dia_idx] + segundos.astype('timedelta64[s]')
+
+    registros = pd.DataFrame({
+        'Name': nomes_xml[pessoa_idx],
+        'Datetime': pd.DatetimeIndex(horarios).strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+    justificados = rng.choice(ids, max(1, n_students // 20), replace=False)
+    justificativas = pd.DataFrame({
+        schema.JUSTIFICATIVA_ID_STONELAB: justificados,
+        schema.JUSTIFICATIVA_INICIO: f"{mes:02d}/03/{ano}",
+        schema.JUSTIFICATIVA_FIM: f"{mes:02d}/07/{ano}",
+        schema.JUSTIFICATIVA_MOTIVO: schema.JUSTIFICATIVA_MOTIVO_FERIAS,
+    })
+
+    return {
+        'cadastro': cadastro,
+        'io_alunos': io_alunos,
+        'ignorar': pd.DataFrame({'Nome': ['Visitante 0', 'Visitante 1']}),
+        'feriados': pd.DataFrame({'Evento': ['Feriado'], schema.FERIADOS_DATA: [f"{ano}-{mes:02d}-15"]}),
+        'justificativas': justificativas,
+        'registros_brutos': registros,
+    }
@@ -2,6 +2,15 @@ import os
 
 LIMIAR_ATINGIMENTO_GERAL = 0.75
 
+# Estratégia de KPI semanal ('padrao', 'dias_fixos', 'limiar') e estratégias
+# extras calculadas lado a lado no report_raw para comparação.
+KPI_ESTRATEGIA = 'padrao'
+KPI_ESTRATEGIAS_COMPARACAO = []
+
+# Histórico consultado pelas abas de inatividade/limpeza: 'csv' (base mestra)
+# ou 'sqlite' (banco indexado; importa o CSV na primeira execução).
+HISTORICO_BACKEND = 'csv'
+
 CAMINHOS = {
     'colab': {
         'dados_presenca': "/gdrive/MyDrive/projetos-colab-compartilhados/Sistema_Gestao_Presenca/Database/Raw_unstructured_data/xml_biometria",
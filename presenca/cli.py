@@ -0,0 +1,105 @@
+"""
+Linha de comando do pipeline de presença.
+
+    python -m presenca run --year 2025 --month 11 [--mode local|colab]
+                           [--profile local] [--workers 4] [--io-concurrency 4] [--cache-dir DIR]
+                           [--only-tabs report_raw Resumo_por_Aluno ... | dashboard]
+
+Cada chamada monta um RunConfig imutável; períodos diferentes podem rodar
+em processos paralelos sem compartilhar estado de configuração.
+"""
+import argparse
+import logging
+import sys
+from typing import List, Optional
+from .run_config import MODOS_EXECUCAO, RunConfig, load_settings
+from .tab_plan import TabPlan, available_targets
+
+log = logging.getLogger(__name__)
+
+def execute(run_config: RunConfig) -> str:
+    """Autentica (colab), lê, valida e roda o pipeline. Retorna o relatório (ou a base histórica, no alvo 'dashboard'); '' em falha."""
+    from .pipeline import PresencePipeline
+    from .utils.data_reader import DataReader
+    from .utils.data_writer import DataWriter
+    from .utils.data_quality import InputValidator
+    from .utils.input_validator import validar_estrutura_inputs
+
+    log.info(f"Iniciando Pipeline - MODO: {run_config.mode.upper()}")
+    log.info(f"Período de Análise: {run_config.year}-{run_config.month:02d}")
+    path_dados = run_config.CAMINHOS.get(run_config.path_key, {}).get('dados_presenca')
+    log.info(f"Lendo dados de: {path_dados}")
+
+    gspread_client = None
+    gdrive_service = None
+
+    if run_config.mode == 'colab':
+        try:
+            from .utils.google_clients import authenticate_colab
+            log.info("Autenticando sessão do Google Colab...")
+            gspread_client, gdrive_service = authenticate_colab()
+            log.info("Autenticação (Sheets + Drive) realizada com sucesso!")
+        except ImportError:
+            log.warning("Libs do Google Colab não encontradas.")
+        except Exception as e:
+            log.error(f"Erro na autenticação: {e}")
+            return ""
+
+    data_reader = DataReader(config=run_config, gspread_client=gspread_client)
+    dados_brutos = data_reader.load_all_sources()
+
+    relatorio_qualidade = InputValidator().validate(dados_brutos)
+    if not validar_estrutura_inputs(dados_brutos, relatorio_qualidade):
+        log.error("Pipeline interrompido na validação.")
+        return ""
+
+    data_writer = DataWriter(config=run_config, gdrive_service=gdrive_service, gspread_client=gspread_client)
+    pipeline = PresencePipeline(data_reader=data_reader, data_writer=data_writer, config=run_config)
+    return pipeline.run(dados_input=dados_brutos, quality_report=relatorio_qualidade)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m presenca', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='gera o relatório mensal de um período')
+    run.add_argument('--year', type=int, help='ano do relatório (padrão: ANO_DO_RELATORIO do perfil)')
+    run.add_argument('--month', type=int, help='mês do relatório (padrão: MES_DO_RELATORIO do perfil)')
+    run.add_argument('--mode', choices=MODOS_EXECUCAO, help='modo de execução (padrão: MODO_EXECUCAO do perfil)')
+    run.add_argument('--profile', help="perfil de settings: carrega configs/settings_<perfil>.py "
+                                       "(padrão: 'local' se existir, senão 'colab')")
+    run.add_argument('--workers', type=int, default=1, help='processos para leitura dos XMLs')
+    run.add_argument('--io-concurrency', type=int, help='chamadas de I/O em paralelo no modo colab '
+                                                        '(planilhas, Drive); 1 desliga o paralelismo')
+    run.add_argument('--cache-dir', help='pasta para os intermediários reaproveitáveis (cubo de presença)')
+    run.add_argument('--only-tabs', nargs='+', default=(), metavar='ABA',
+                     help="roda só as etapas necessárias para estas abas; 'dashboard' atualiza só a "
+                          "base histórica, sem Excel")
+    return parser
+
+def config_from_args(args: argparse.Namespace) -> RunConfig:
+    profile, settings = load_settings(args.profile)
+    return RunConfig.from_settings(
+        settings, year=args.year, month=args.month, mode=args.mode, workers=args.workers,
+        io_concurrency=args.io_concurrency, cache_dir=args.cache_dir, profile=profile, only_tabs=tuple(args.only_tabs)
+    )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    try:
+        run_config = config_from_args(args)
+    except (ImportError, ValueError) as e:
+        log.error(f"Configuração inválida: {e}")
+        return 2
+
+    desconhecidas = TabPlan(run_config.only_tabs).unknown
+    if desconhecidas:
+        log.error(f"Abas desconhecidas: {desconhecidas}. Disponíveis: {available_targets()}")
+        return 2
+
+    return 0 if execute(run_config) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
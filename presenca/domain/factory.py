@@ -1,49 +1,78 @@
 import pandas as pd
+import numpy as np
 import logging
-from typing import Dict, List, Optional
-from .models.tenure import Tenure, FrequencyChange
+import weakref
+from typing import Dict, List, Optional, Tuple
+from .models.tenure import Tenure
+from .models.tenure_table import TenureTable
 from .models.coordinator import Coordinator
+from ..utils.student_keys import StudentKeyRegistry
+from ..utils.stage_metrics import StageMetrics
 import schema
 
 log = logging.getLogger(__name__)
 
 class TenureFactory:
+
+    def __init__(self, key_registry: Optional[StudentKeyRegistry] = None):
+        self.key_registry = key_registry if key_registry is not None else StudentKeyRegistry()
     
-    def create_tenures_from_df(self, df: pd.DataFrame) -> Dict[str, List[Tenure]]:
-        tenures_dict = {}
+    def create_tenures_from_df(self, df: pd.DataFrame) -> Dict[int, List[Tenure]]:
+        """Versão validada (pydantic) das jornadas, para uso nas bordas do sistema."""
+        return self.create_tenure_table(df).to_models()
+
+    def create_tenure_table(self, df: pd.DataFrame) -> TenureTable:
         df_cleaned = self._clean_io_df(df)
         
         if df_cleaned.empty:
-            return {}
+            return TenureTable.empty()
 
-        if schema.COL_IO_START in df_cleaned.columns and schema.COL_ID_STONELAB in df_cleaned.columns:
-            df_cleaned.sort_values(by=schema.COL_IO_START, ascending=False, inplace=True, na_position='last')
+        if schema.COL_IO_START in df_cleaned.columns and schema.COL_STUDENT_KEY in df_cleaned.columns:
+            df_cleaned.sort_values(by=schema.COL_IO_START, ascending=False, inplace=True, na_position='last', kind='stable')
             
             original_len = len(df_cleaned)
-            df_cleaned.drop_duplicates(subset=[schema.COL_ID_STONELAB], keep='first', inplace=True)
+            df_cleaned.drop_duplicates(subset=[schema.COL_STUDENT_KEY], keep='first', inplace=True)
             
             if len(df_cleaned) < original_len:
                 log.info(f"Factory: Deduplicação aplicada. Removidos {original_len - len(df_cleaned)} registros antigos de IO.")
 
-        for row in df_cleaned.itertuples():
-            sid_raw = getattr(row, schema.COL_ID_STONELAB, None)
-            if pd.isna(sid_raw):
-                continue
-                
-            sid = str(sid_raw).strip().replace('.0', '')
-            
-            if sid not in tenures_dict:
-                tenures_dict[sid] = []
-            
-            tenure = self._create_tenure_from_row(row)
-            if tenure:
-                tenures_dict[sid].append(tenure)
-                
-        return tenures_dict
+        df_cleaned = df_cleaned[df_cleaned[schema.COL_STUDENT_KEY] != StudentKeyRegistry.MISSING]
+
+        start = df_cleaned[schema.COL_IO_START].to_numpy(dtype='datetime64[D]')
+        end1 = df_cleaned[schema.COL_IO_END1].to_numpy(dtype='datetime64[D]')
+        end2 = df_cleaned[schema.COL_IO_END2].to_numpy(dtype='datetime64[D]')
+        freq1 = self._safe_int(df_cleaned.get(schema.COL_IO_FREQ1))
+        freq2 = self._safe_int(df_cleaned.get(schema.COL_IO_FREQ2))
+        if freq1 is None: freq1 = np.zeros(len(df_cleaned), dtype=np.int64)
+        if freq2 is None: freq2 = np.zeros(len(df_cleaned), dtype=np.int64)
+
+        has_change = (freq2 > 0) & ~np.isnat(end1)
+
+        return TenureTable(
+            keys=df_cleaned[schema.COL_STUDENT_KEY].to_numpy(),
+            beginnings=start,
+            ends=np.where(has_change, end2, end1),
+            frequencies=freq1,
+            change_dates=np.where(has_change, end1, np.datetime64('NaT', 'D')),
+            changed_frequencies=np.where(has_change, freq2, 0)
+        )
+
+    @staticmethod
+    def _safe_int(values: Optional[pd.Series]) -> Optional[np.ndarray]:
+        """Números viram inteiros; textos só valem se forem apenas dígitos; o resto vira 0."""
+        if values is None:
+            return None
+        if pd.api.types.is_numeric_dtype(values):
+            numeric = pd.to_numeric(values, errors='coerce')
+            numeric = numeric.where(np.isfinite(numeric), 0)
+            return numeric.fillna(0).astype(np.int64).to_numpy()
+
+        text = values.astype(str).str.strip()
+        digits = text.where(text.str.fullmatch(r'\d+', na=False), '0')
+        return digits.astype(np.int64).to_numpy()
 
     def _clean_io_df(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_copy = df.copy()
-        df_copy.columns = df_copy.columns.str.strip()
+        df_copy = df.set_axis(df.columns.str.strip(), axis=1)
         
         rename_map = {
             schema.IO_COL_ID_RAW: schema.COL_ID_STONELAB,
@@ -53,7 +82,7 @@ class TenureFactory:
             schema.IO_COL_FREQ1_RAW: schema.COL_IO_FREQ1,
             schema.IO_COL_FREQ2_RAW: schema.COL_IO_FREQ2
         }
-        df_copy.rename(columns=rename_map, inplace=True)
+        df_copy = df_copy.rename(columns=rename_map)
 
         if schema.COL_ID_STONELAB not in df_copy.columns:
             log.warning("Factory: Coluna ID exata não encontrada. Tentando busca inteligente...")
@@ -70,6 +99,9 @@ class TenureFactory:
             else:
                 return pd.DataFrame()
 
+        if schema.COL_STUDENT_KEY not in df_copy.columns:
+            df_copy[schema.COL_STUDENT_KEY] = self.key_registry.encode(df_copy[schema.COL_ID_STONELAB])
+
         if schema.COL_IO_FREQ1 not in df_copy.columns:
             found_freq = None
             for col in df_copy.columns:
@@ -93,7 +125,7 @@ class TenureFactory:
         date_cols = [schema.COL_IO_START, schema.COL_IO_END1, schema.COL_IO_END2]
         for col in date_cols:
             if col in df_copy.columns:
-                df_copy[col] = pd.to_datetime(df_copy[col], dayfirst=True, errors='coerce').dt.date
+                df_copy[col] = pd.to_datetime(df_copy[col], dayfirst=True, errors='coerce').dt.normalize()
             else:
                 df_copy[col] = pd.NaT
         
@@ -102,45 +134,54 @@ class TenureFactory:
         else:
             return pd.DataFrame()
 
-    def _create_tenure_from_row(self, row: pd.Series) -> Optional[Tenure]:
-        try:
-            start = getattr(row, schema.COL_IO_START)
-            if pd.isna(start):
-                return None
-
-            end1 = getattr(row, schema.COL_IO_END1) if hasattr(row, schema.COL_IO_END1) else None
-            end2 = getattr(row, schema.COL_IO_END2) if hasattr(row, schema.COL_IO_END2) else None
-            freq1 = getattr(row, schema.COL_IO_FREQ1) if hasattr(row, schema.COL_IO_FREQ1) else 0
-            freq2 = getattr(row, schema.COL_IO_FREQ2) if hasattr(row, schema.COL_IO_FREQ2) else 0
-
-            def safe_int(val):
-                try:
-                    if pd.isna(val): return 0
-                    if isinstance(val, int): return val
-                    if isinstance(val, float): return int(val)
-                    if isinstance(val, str) and val.strip().isdigit(): return int(val.strip())
-                    return 0
-                except:
-                    return 0
-
-            f1 = safe_int(freq1)
-            f2 = safe_int(freq2)
-            
-            final_end = end1 if pd.notna(end1) else None
-            changes = []
-
-            if f2 > 0 and pd.notna(end1):
-                changes.append(FrequencyChange(reference_date=end1, new_expected_frequency=f2))
-                final_end = end2 if pd.notna(end2) else None
-
-            return Tenure(
-                beginning=start,
-                original_expected_frequency=f1,
-                end=final_end,
-                frequency_changes=changes
-            )
-        except Exception:
-            return None
+class TenureProvider:
+    """
+    Entrega a TenureTable de um DataFrame de IO, memorizada primeiro pela
+    identidade do frame e depois pelo conteúdo: o mesmo objeto (o pipeline
+    não altera frames já lidos) é reconhecido sem custo; uma cópia idêntica
+    paga um hash do conteúdo e também reaproveita a tabela já construída.
+    """
+
+    def __init__(self, factory: TenureFactory, metrics: Optional[StageMetrics] = None, max_entries: int = 4):
+        self.factory = factory
+        self.metrics = metrics if metrics is not None else StageMetrics()
+        self.max_entries = max_entries
+        self._cache: Dict[int, TenureTable] = {}
+        self._by_identity: Dict[int, Tuple[weakref.ref, int]] = {}
+
+    def get(self, io_df: pd.DataFrame) -> TenureTable:
+        fingerprint = self._fingerprint(io_df)
+        
+        if fingerprint in self._cache:
+            self.metrics.increment('jornadas_cache_hit')
+            return self._cache[fingerprint]
+
+        self.metrics.increment('jornadas_cache_miss')
+        table = self.factory.create_tenure_table(io_df)
+        
+        if len(self._cache) >= self.max_entries:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[fingerprint] = table
+        return table
+
+    def _fingerprint(self, df: pd.DataFrame) -> int:
+        entry = self._by_identity.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+
+        fingerprint = self._content_fingerprint(df)
+        if df is not None:
+            # Só referências fracas: o cache não prende frames; ids de frames coletados saem daqui.
+            self._by_identity = {k: v for k, v in self._by_identity.items() if v[0]() is not None}
+            self._by_identity[id(df)] = (weakref.ref(df), fingerprint)
+        return fingerprint
+
+    @staticmethod
+    def _content_fingerprint(df: pd.DataFrame) -> int:
+        if df is None or df.empty:
+            return hash(('vazio', tuple(getattr(df, 'columns', []))))
+        row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+        return hash((tuple(df.columns), len(df), int(row_hashes.sum()), int(np.bitwise_xor.reduce(row_hashes))))
 
 class CoordinatorFactory:
     
@@ -156,4 +197,30 @@ class CoordinatorFactory:
         if normalized_name not in self._coordinators:
             self._coordinators[normalized_name] = Coordinator(normalized_name)
             
-        return self._coordinators[normalized_name]
\ No newline at end of file
+        return self._coordinators[normalized_name]
+
+    def create_dimension(self, raw_names: pd.Series) -> pd.Series:
+        """
+        Normaliza apenas os nomes distintos e devolve uma coluna categórica
+        com o nome canônico de cada coordenador. Os objetos Coordinator
+        ficam disponíveis em lookup() para a lógica de domínio.
+        """
+        codes, uniques = pd.factorize(raw_names, use_na_sentinel=False)
+        names = [self.get_or_create(raw).name for raw in uniques]
+
+        categories = sorted(set(names))
+        position = {name: i for i, name in enumerate(categories)}
+        unique_codes = np.array([position[name] for name in names], dtype=np.int32)
+
+        return pd.Series(
+            pd.Categorical.from_codes(unique_codes[codes], categories=categories),
+            index=raw_names.index,
+            name=raw_names.name
+        )
+
+    def lookup(self, name: str) -> Coordinator:
+        return self._coordinators.get(name) or self.get_or_create(name)
+
+    @property
+    def coordinators(self) -> Dict[str, Coordinator]:
+        return dict(self._coordinators)
\ No newline at end of file
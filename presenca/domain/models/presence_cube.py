@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+class PresenceCube:
+    """
+    Presença diária compacta: matriz booleana aluno × dia sobre o horizonte
+    das batidas ("o aluno S apareceu no dia D?"). Frequência observada por
+    semana, última presença e contagens por janela saem de reduções
+    vetorizadas sobre a matriz, sem voltar às batidas.
+
+    As linhas seguem as chaves inteiras do aluno em ordem crescente. Para
+    persistir, to_npz() grava os IDs StoneLab (as chaves só valem dentro de
+    uma execução) e a matriz compactada em bits.
+    """
+
+    def __init__(self, student_keys: np.ndarray, start, presence: np.ndarray):
+        self.student_keys = np.asarray(student_keys, dtype=np.int32)
+        self.start = np.datetime64(start, 'D') if start is not None else np.datetime64('NaT', 'D')
+        self.presence = np.asarray(presence, dtype=bool)
+
+    @classmethod
+    def empty(cls) -> 'PresenceCube':
+        return cls(np.empty(0, np.int32), None, np.zeros((0, 0), dtype=bool))
+
+    @classmethod
+    def from_punches(cls, keys, dates, start=None, end=None) -> 'PresenceCube':
+        """Monta o cubo a partir de pares (chave do aluno, data) de batidas."""
+        keys = np.asarray(keys, dtype=np.int32)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        valid = ~np.isnat(dates) & (keys >= 0)
+        keys, dates = keys[valid], dates[valid]
+        if len(keys) == 0:
+            return cls.empty()
+
+        start = np.datetime64(start, 'D') if start is not None else dates.min()
+        end = np.datetime64(end, 'D') if end is not None else dates.max()
+        inside = (dates >= start) & (dates <= end)
+        keys, dates = keys[inside], dates[inside]
+
+        student_keys, rows = np.unique(keys, return_inverse=True)
+        presence = np.zeros((len(student_keys), int((end - start).astype(int)) + 1), dtype=bool)
+        presence[rows, (dates - start).astype(np.int64)] = True
+        return cls(student_keys, start, presence)
+
+    @property
+    def n_days(self) -> int:
+        return self.presence.shape[1]
+
+    @property
+    def days(self) -> np.ndarray:
+        return self.start + np.arange(self.n_days)
+
+    def __len__(self) -> int:
+        return len(self.student_keys)
+
+    def _rows(self, keys) -> np.ndarray:
+        """Linha de cada chave no cubo (-1 para alunos sem presença)."""
+        keys = np.asarray(keys, dtype=np.int32)
+        if len(self.student_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.student_keys, keys), len(self.student_keys) - 1)
+        return np.where(self.student_keys[rows] == keys, rows, -1)
+
+    def days_present(self, keys, window_starts, n_days: int = 7) -> np.ndarray:
+        """Quantos dias cada aluno esteve presente em [início, início + n_days)."""
+        keys = np.asarray(keys, dtype=np.int32)
+        counts = np.zeros(len(keys), dtype=np.int16)
+        if len(self.student_keys) == 0 or len(keys) == 0:
+            return counts
+
+        rows = self._rows(keys)
+        first = (np.asarray(window_starts, dtype='datetime64[D]') - self.start).astype(np.int64)
+        lo = np.clip(first, 0, self.n_days)
+        hi = np.clip(first + n_days, 0, self.n_days)
+
+        cumulative = np.zeros((len(self.student_keys), self.n_days + 1), dtype=np.int32)
+        np.cumsum(self.presence, axis=1, out=cumulative[:, 1:])
+
+        known = rows >= 0
+        counts[known] = cumulative[rows[known], hi[known]] - cumulative[rows[known], lo[known]]
+        return counts
+
+    def last_presence(self) -> pd.Series:
+        """Último dia de presença por chave de aluno (só alunos com alguma presença)."""
+        if len(self.student_keys) == 0:
+            return pd.Series(dtype='datetime64[ns]')
+        any_day = self.presence.any(axis=1)
+        last_idx = self.n_days - 1 - np.argmax(self.presence[:, ::-1], axis=1)
+        last = (self.start + last_idx[any_day]).astype('datetime64[ns]')
+        return pd.Series(last, index=self.student_keys[any_day])
+
+    def to_npz(self, path: str, key_registry=None) -> str:
+        """Grava o cubo em .npz; com key_registry, as linhas são salvas como IDs StoneLab."""
+        ids = key_registry.decode(self.student_keys).astype(str) if key_registry is not None else self.student_keys.astype(str)
+        np.savez_compressed(
+            path,
+            student_ids=ids,
+            start=np.array([str(self.start)]),
+            n_days=np.array([self.n_days]),
+            bits=np.packbits(self.presence, axis=1)
+        )
+        return path
+
+    @classmethod
+    def from_npz(cls, path: str, key_registry=None) -> 'PresenceCube':
+        """Lê um cubo gravado; com key_registry, os IDs voltam a ser chaves desta execução."""
+        with np.load(path, allow_pickle=False) as data:
+            ids = data['student_ids']
+            n_days = int(data['n_days'][0])
+            start = str(data['start'][0])
+            presence = np.unpackbits(data['bits'], axis=1, count=n_days).astype(bool)
+
+        if key_registry is not None:
+            keys = key_registry.encode(pd.Series(ids, dtype=object))
+        else:
+            keys = ids.astype(np.int32)
+
+        order = np.argsort(keys, kind='stable')
+        return cls(keys[order], None if start == 'NaT' else start, presence[order])
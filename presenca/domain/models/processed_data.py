@@ -0,0 +1,30 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+class ProcessedData(Mapping):
+    """
+    Conjunto imutável das saídas do processamento (DataFrames, jornadas,
+    registro de chaves...). Os geradores leem por chave, como em um dict,
+    mas não podem trocar entradas; alterações geram um novo container via
+    replace(). Com o copy-on-write do pandas ligado, as cópias resultantes
+    compartilham os dados até que alguém de fato os modifique.
+    """
+
+    def __init__(self, entries: Mapping = None):
+        self._entries: Dict[str, Any] = dict(entries or {})
+
+    def __getitem__(self, key: str) -> Any:
+        return self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def replace(self, **updates: Any) -> 'ProcessedData':
+        """Devolve um novo container com as entradas informadas substituídas."""
+        return ProcessedData({**self._entries, **updates})
+
+    def __repr__(self):
+        return f"ProcessedData({', '.join(self._entries)})"
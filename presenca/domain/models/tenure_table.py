@@ -0,0 +1,156 @@
+from collections.abc import Mapping
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from .tenure import Tenure, FrequencyChange
+
+class TenureView:
+    """Visão leve (sem validação) de uma linha da TenureTable, com a mesma interface de Tenure."""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'TenureTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def beginning(self) -> date:
+        return self._table.beginnings[self._row].item()
+
+    @property
+    def end(self) -> Optional[date]:
+        return self._table.ends[self._row].item()
+
+    @property
+    def original_expected_frequency(self) -> int:
+        return int(self._table.frequencies[self._row])
+
+    @property
+    def frequency_changes(self) -> List[FrequencyChange]:
+        change_date = self._table.change_dates[self._row]
+        if np.isnat(change_date):
+            return []
+        return [FrequencyChange(
+            reference_date=change_date.item(),
+            new_expected_frequency=int(self._table.changed_frequencies[self._row])
+        )]
+
+    def active_at_date(self, ref_date: date) -> bool:
+        return bool(self._table.active_rows(np.array([self._row]), np.array([ref_date], dtype='datetime64[D]'))[0])
+
+    def get_expected_frequency(self, ref_date: date) -> int:
+        rows = np.array([self._row])
+        return int(self._table.frequency_rows(rows, np.array([ref_date], dtype='datetime64[D]'))[0])
+
+    def to_model(self) -> Tenure:
+        """Converte para o modelo pydantic (validação nas bordas do sistema)."""
+        return Tenure(
+            beginning=self.beginning,
+            end=self.end,
+            original_expected_frequency=self.original_expected_frequency,
+            frequency_changes=self.frequency_changes
+        )
+
+    def __repr__(self):
+        return f"TenureView(beginning={self.beginning}, end={self.end}, freq={self.original_expected_frequency})"
+
+class TenureTable(Mapping):
+    """
+    Jornadas em formato colunar (struct-of-arrays), indexadas pela chave
+    inteira do aluno. Como Mapping, tenures[key] devolve a lista de visões
+    daquele aluno; as consultas em lote usam active_at() e
+    expected_frequency_at() sobre arrays NumPy.
+    """
+
+    def __init__(self, keys: np.ndarray, beginnings: np.ndarray, ends: np.ndarray,
+                 frequencies: np.ndarray, change_dates: np.ndarray, changed_frequencies: np.ndarray):
+        self.keys_array = np.asarray(keys, dtype=np.int32)
+        self.beginnings = np.asarray(beginnings, dtype='datetime64[D]')
+        self.ends = np.asarray(ends, dtype='datetime64[D]')
+        self.frequencies = np.asarray(frequencies, dtype=np.int16)
+        self.change_dates = np.asarray(change_dates, dtype='datetime64[D]')
+        self.changed_frequencies = np.asarray(changed_frequencies, dtype=np.int16)
+
+        self._order = np.argsort(self.keys_array, kind='stable')
+        self._sorted_keys = self.keys_array[self._order]
+        self._unique_keys = np.unique(self._sorted_keys)
+
+    @classmethod
+    def empty(cls) -> 'TenureTable':
+        return cls(
+            np.empty(0, np.int32), np.empty(0, 'datetime64[D]'), np.empty(0, 'datetime64[D]'),
+            np.empty(0, np.int16), np.empty(0, 'datetime64[D]'), np.empty(0, np.int16)
+        )
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.keys_array)
+
+    @property
+    def student_keys(self) -> np.ndarray:
+        """Chaves distintas de alunos com jornada (ordenadas)."""
+        return self._unique_keys
+
+    def __getitem__(self, key: int) -> List[TenureView]:
+        start = np.searchsorted(self._sorted_keys, key, side='left')
+        stop = np.searchsorted(self._sorted_keys, key, side='right')
+        if start == stop:
+            raise KeyError(key)
+        return [TenureView(self, int(row)) for row in self._order[start:stop]]
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(k) for k in self._unique_keys)
+
+    def __len__(self) -> int:
+        return len(self._unique_keys)
+
+    def __contains__(self, key) -> bool:
+        start = np.searchsorted(self._sorted_keys, key, side='left')
+        return start < len(self._sorted_keys) and self._sorted_keys[start] == key
+
+    def active_rows(self, rows: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        ends = self.ends[rows]
+        return (self.beginnings[rows] <= dates) & (np.isnat(ends) | (dates <= ends))
+
+    def frequency_rows(self, rows: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        changes = self.change_dates[rows]
+        changed = ~np.isnat(changes) & (changes <= dates)
+        return np.where(changed, self.changed_frequencies[rows], self.frequencies[rows])
+
+    def active_at(self, keys: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        """Para cada par (aluno, data), indica se alguma jornada do aluno cobre a data."""
+        pair_idx, rows, dates = self._expand(keys, dates)
+        active = self.active_rows(rows, dates)
+        return np.bincount(pair_idx[active], minlength=len(keys)) > 0
+
+    def expected_frequency_at(self, keys: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        """
+        Frequência esperada da primeira jornada que cobre a data com frequência
+        positiva; 0 quando nenhuma jornada se aplica.
+        """
+        result = np.zeros(len(keys), dtype=np.int16)
+        pair_idx, rows, dates = self._expand(keys, dates)
+        freq = self.frequency_rows(rows, dates)
+        valid = self.active_rows(rows, dates) & (freq > 0)
+
+        first_pairs, first_pos = np.unique(pair_idx[valid], return_index=True)
+        result[first_pairs] = freq[valid][first_pos]
+        return result
+
+    def _expand(self, keys: np.ndarray, dates: np.ndarray):
+        """Expande cada par (aluno, data) em um par por jornada do aluno."""
+        keys = np.asarray(keys, dtype=np.int32)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+
+        start = np.searchsorted(self._sorted_keys, keys, side='left')
+        stop = np.searchsorted(self._sorted_keys, keys, side='right')
+        counts = stop - start
+
+        pair_idx = np.repeat(np.arange(len(keys)), counts)
+        offsets = np.arange(len(pair_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = self._order[start[pair_idx] + offsets]
+        return pair_idx, rows, dates[pair_idx]
+
+    def to_models(self) -> Dict[int, List[Tenure]]:
+        """Materializa as jornadas como modelos pydantic validados."""
+        return {key: [view.to_model() for view in views] for key, views in self.items()}
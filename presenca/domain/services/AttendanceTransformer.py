@@ -1,122 +1,209 @@
 import pandas as pd
+import numpy as np
 import logging
 import schema
-from typing import Dict
-from ..factory import TenureFactory, CoordinatorFactory
+from typing import Dict, Optional, Tuple
+from ..factory import TenureFactory, TenureProvider, CoordinatorFactory
+from ..models.presence_cube import PresenceCube
+from .daily_span_aggregator import DailySpanAggregator
+from ...utils.student_keys import StudentKeyRegistry
+from ...utils.name_vocabulary import NameVocabulary
+from ...utils.punch_datetime import PunchDatetimeParser
 
 log = logging.getLogger(__name__)
 
 class AttendanceTransformer:
-    def __init__(self, data_frames: dict, config: dict):
-        self.data = data_frames
+    def __init__(self, data_frames: dict, config: dict, tenure_provider: Optional[TenureProvider] = None,
+                 daily_spans: bool = True):
+        self.data = dict(data_frames)
+        # Primeira/última batida por dia só alimenta a etapa 'dwell' (permanência).
+        self.daily_spans = daily_spans
         self.config = config
-        self.tenure_factory = TenureFactory()
+        self.tenure_provider = tenure_provider or TenureProvider(TenureFactory(data_frames.get('student_keys')))
         self.coordinator_factory = CoordinatorFactory()
+        self._chaves_por_nome = None
         log.info("Processador de Dados: Inicializado.")
 
     def run(self) -> dict:
         self._clean_and_rename_base_dfs()
         self._apply_ignore_list()
         self._filter_by_tenure()        
+        self._build_presence_cube()
+        self._build_student_spans()
         return self.data
 
     def _clean_and_rename_base_dfs(self):
         df_registros = self.data['registros_brutos']
         if not df_registros.empty:
-            df_registros.dropna(subset=['Datetime', 'Name'], inplace=True)
+            df_registros = df_registros.dropna(subset=['Datetime', 'Name'])
+            df_registros['Datetime'] = PunchDatetimeParser().parse(df_registros['Datetime'])
+            df_registros[schema.COL_XML_DATE] = df_registros['Datetime'].dt.normalize()
+            if self.daily_spans:
+                self.data['permanencia_nomes'] = self._aggregate_daily_spans(df_registros)
             
-            df_registros[schema.COL_XML_DATE] = pd.to_datetime(
-                df_registros['Datetime'].str.split(' ').str[0],
-                errors='coerce'
-            ).dt.date
-            
-            df_registros.dropna(subset=[schema.COL_XML_DATE], inplace=True)
-            df_registros.drop_duplicates(subset=['Name', schema.COL_XML_DATE], inplace=True)
-            df_registros.rename(columns={'Name': schema.COL_NOME_ENTRADA}, inplace=True)
+            df_registros = (
+                df_registros.dropna(subset=[schema.COL_XML_DATE])
+                .drop_duplicates(subset=['Name', schema.COL_XML_DATE])
+                .rename(columns={'Name': schema.COL_NOME_ENTRADA})
+            )
             self.data['registros_brutos'] = df_registros
         
         df_depara = self.data['cadastro']
-        df_depara.columns = df_depara.columns.str.strip()
+        df_depara = df_depara.set_axis(df_depara.columns.str.strip(), axis=1)
         
-        df_depara.rename(columns={
+        df_depara = df_depara.rename(columns={
             schema.CADASTRO_NOME_COMPLETO: schema.COL_NAME,
             schema.CADASTRO_FUNCAO: schema.COL_FUNCTION,
             schema.CADASTRO_COORDENADOR: schema.COL_COORDINATOR,
             schema.CADASTRO_ID_STONELAB: schema.COL_ID_STONELAB,
             schema.CADASTRO_NOME_ENTRADA: schema.COL_NOME_ENTRADA
-        }, inplace=True)
+        })
         
-        df_depara[schema.COL_COORDINATOR] = df_depara[schema.COL_COORDINATOR].apply(
-            self.coordinator_factory.get_or_create
+        df_depara[schema.COL_COORDINATOR] = self.coordinator_factory.create_dimension(
+            df_depara[schema.COL_COORDINATOR]
         )
-
-        def clean_coordinator_name(val):
-            if hasattr(val, 'name'):
-                return str(val.name).strip()
-            s_val = str(val)
-            if 'Coordinator' in s_val:
-                return s_val.replace("Coordinator(name='", "").replace("')", "").strip()
-            return s_val.strip()
-
-        df_depara[schema.COL_COORDINATOR] = df_depara[schema.COL_COORDINATOR].apply(clean_coordinator_name)
         
         self.data['cadastro'] = df_depara
+        self.data['coordinators'] = self.coordinator_factory
 
     def _apply_ignore_list(self):
-        df_ignorar = self.data['ignorar']
-        df_depara = self.data['cadastro']
+        vocabulary = self._name_vocabulary()
+        flags = vocabulary.registration_flags(self.data['cadastro'], self.data['ignorar'])
+        self.data['mascaras_nomes'] = flags
         
-        set_ignorar_raw = set(df_ignorar.iloc[:, 0].dropna().unique())
-        
-        set_cadastro_nomes = set(df_depara[schema.COL_NAME].dropna().unique())
-        if schema.COL_NOME_ENTRADA in df_depara.columns:
-             set_cadastro_nomes.union(
-                set(df_depara[schema.COL_NOME_ENTRADA].dropna().unique())
-             )
-             
-        self.data['ignorar_final'] = set_ignorar_raw - set_cadastro_nomes
-        
-        if not self.data['registros_brutos'].empty:
-            self.data['registros_brutos'] = self.data['registros_brutos'][
-                ~self.data['registros_brutos'][schema.COL_NOME_ENTRADA].isin(
-                    self.data['ignorar_final']
-                )
-            ].copy()
+        df_registros = self.data['registros_brutos']
+        if not df_registros.empty:
+            ignorados = vocabulary.rows(vocabulary.ignored(flags), df_registros[schema.COL_NOME_ENTRADA])
+            if ignorados.any():
+                self.data['registros_brutos'] = df_registros[~ignorados]
+
+    def _aggregate_daily_spans(self, df_registros: pd.DataFrame) -> pd.DataFrame:
+        """Primeira/última batida por nome e dia, antes de reduzir as batidas a uma por dia."""
+        vocabulary = self._name_vocabulary()
+        aggregator = DailySpanAggregator()
+        for start in range(0, len(df_registros), aggregator.CHUNK_SIZE):
+            chunk = df_registros.iloc[start:start + aggregator.CHUNK_SIZE]
+            aggregator.update(vocabulary.codes(chunk['Name']), chunk['Datetime'].to_numpy())
+        return aggregator.result()
+
+    def _name_vocabulary(self) -> NameVocabulary:
+        vocabulary = self.data.get('name_vocabulary')
+        if vocabulary is None:
+            df_registros = self.data['registros_brutos']
+            col_nome = 'Name' if 'Name' in df_registros.columns else schema.COL_NOME_ENTRADA
+            vocabulary = NameVocabulary.from_series(df_registros[col_nome])
+            self.data['name_vocabulary'] = vocabulary
+        return vocabulary
 
     def _filter_by_tenure(self):
-        tenures = self.tenure_factory.create_tenures_from_df(
-            self.data['io_alunos']
-        )
+        tenures = self.tenure_provider.get(self.data['io_alunos'])
         self.data['tenures'] = tenures
         
         if self.data['registros_brutos'].empty:
             self.data['registros_final'] = pd.DataFrame()
             return
 
-        df_registros_alunos = pd.merge(
-            self.data['registros_brutos'], self.data['cadastro'],
-            on=schema.COL_NOME_ENTRADA, how='inner'
-        )
-        ids_com_jornada = list(tenures.keys())
-        df_com_jornada = df_registros_alunos[
-            df_registros_alunos[schema.COL_ID_STONELAB].astype(str).isin(ids_com_jornada)
-        ].copy()
-
-        def is_active(row): return self._is_active_at_date(row, tenures)
+        df_registros = self.data['registros_brutos']
+        rows, keys = self._match_student_keys(df_registros[schema.COL_NOME_ENTRADA], tenures)
+        
+        df_com_jornada = pd.DataFrame({
+            schema.COL_STUDENT_KEY: keys,
+            schema.COL_XML_DATE: df_registros[schema.COL_XML_DATE].to_numpy()[rows],
+            'Datetime': df_registros['Datetime'].to_numpy()[rows]
+        })
         
         if not df_com_jornada.empty:
-            df_com_jornada['active'] = df_com_jornada.apply(is_active, axis=1)
-            self.data['registros_final'] = df_com_jornada[
-                df_com_jornada['active']
-            ].copy()
+            active = tenures.active_at(
+                df_com_jornada[schema.COL_STUDENT_KEY].to_numpy(),
+                df_com_jornada[schema.COL_XML_DATE].to_numpy(dtype='datetime64[D]')
+            )
+            self.data['registros_final'] = df_com_jornada[active].reset_index(drop=True)
         else:
              self.data['registros_final'] = pd.DataFrame()
 
-    def _is_active_at_date(self, row, tenures_dict):
-        sid = str(row[schema.COL_ID_STONELAB])
-        pdate = pd.to_datetime(row[schema.COL_XML_DATE]).date()
-        if sid in tenures_dict:
-            for tenure in tenures_dict[sid]:
-                if tenure.active_at_date(pdate):
-                    return True
-        return False
\ No newline at end of file
+    def _build_presence_cube(self):
+        """Reduz as batidas válidas à matriz aluno × dia usada pelos relatórios."""
+        registros = self.data['registros_final']
+        if registros.empty:
+            self.data['presence_cube'] = PresenceCube.empty()
+            return
+        self.data['presence_cube'] = PresenceCube.from_punches(
+            registros[schema.COL_STUDENT_KEY].to_numpy(),
+            registros[schema.COL_XML_DATE].to_numpy(dtype='datetime64[D]')
+        )
+        log.info(f"Cubo de presença: {len(self.data['presence_cube'])} alunos x {self.data['presence_cube'].n_days} dias.")
+
+    def _build_student_spans(self):
+        """Leva a primeira/última batida por nome e dia para a chave do aluno, só dentro da jornada."""
+        spans = self.data.pop('permanencia_nomes', None)
+        if spans is None or spans.empty:
+            self.data['permanencia'] = pd.DataFrame(columns=[schema.COL_STUDENT_KEY, schema.COL_XML_DATE, 'first_punch', 'last_punch', 'punches'])
+            return
+
+        tenures = self.data['tenures']
+        rows, keys = self._keys_for_codes(spans['name_code'].to_numpy(), tenures)
+        spans = spans.iloc[rows]
+        ativos = tenures.active_at(keys, spans[schema.COL_XML_DATE].to_numpy(dtype='datetime64[D]'))
+
+        self.data['permanencia'] = (
+            spans[ativos]
+            .drop(columns=['name_code'])
+            .assign(**{schema.COL_STUDENT_KEY: keys[ativos]})
+            .groupby([schema.COL_STUDENT_KEY, schema.COL_XML_DATE], as_index=False)
+            .agg(first_punch=('first_punch', 'min'), last_punch=('last_punch', 'max'), punches=('punches', 'sum'))
+        )
+
+    def _match_student_keys(self, nomes_entrada: pd.Series, tenures) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Alunos com jornada de cada batida, via nome_entrada, como pares
+        (posição da batida, chave do aluno). O cadastro é reduzido a pares
+        nome -> chave aplicados sobre o vocabulário de nomes, sem levar as
+        colunas do cadastro para as batidas. Como no merge com o cadastro, um
+        nome_entrada usado por mais de um aluno credita a batida a todos eles;
+        nomes sem correspondência ficam de fora.
+        """
+        return self._keys_for_codes(self._name_vocabulary().codes(nomes_entrada), tenures)
+
+    def _keys_for_codes(self, codes: np.ndarray, tenures) -> Tuple[np.ndarray, np.ndarray]:
+        codes = np.asarray(codes)
+        keys_by_code, starts, counts = self._keys_by_name_code(tenures)
+
+        known = codes >= 0
+        n_keys = np.zeros(len(codes), dtype=np.int64)
+        n_keys[known] = counts[codes[known]]
+        rows = np.repeat(np.arange(len(codes)), n_keys)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(n_keys) - n_keys, n_keys)
+        return rows, keys_by_code[starts[codes[rows]] + offsets]
+
+    def _keys_by_name_code(self, tenures) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Chaves dos alunos com jornada agrupadas por código de nome: (chaves, início de cada código, quantidade)."""
+        if self._chaves_por_nome is not None and self._chaves_por_nome[0] is tenures:
+            return self._chaves_por_nome[1]
+
+        df_cadastro = self.data['cadastro']
+        com_jornada = df_cadastro.loc[
+            df_cadastro[schema.COL_STUDENT_KEY].isin(tenures.student_keys)
+            & df_cadastro[schema.COL_NOME_ENTRADA].notna(),
+            [schema.COL_NOME_ENTRADA, schema.COL_STUDENT_KEY]
+        ].drop_duplicates()
+
+        vocabulary = self._name_vocabulary()
+        name_codes = vocabulary.codes(com_jornada[schema.COL_NOME_ENTRADA].astype(object))
+        no_vocabulario = name_codes >= 0
+        name_codes = name_codes[no_vocabulario]
+        chaves = com_jornada[schema.COL_STUDENT_KEY].to_numpy(dtype=np.int32)[no_vocabulario]
+
+        ordem = np.argsort(name_codes, kind='stable')
+        counts = np.bincount(name_codes, minlength=len(vocabulary))
+        starts = np.cumsum(counts) - counts
+
+        compartilhados = int((counts > 1).sum())
+        if compartilhados:
+            log.warning(
+                f"Processador de Dados: {compartilhados} nomes de entrada são usados por mais de um aluno; "
+                f"as batidas desses nomes contam para todos eles."
+            )
+
+        result = (chaves[ordem], starts, counts)
+        self._chaves_por_nome = (tenures, result)
+        return result
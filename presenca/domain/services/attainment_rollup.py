@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import schema
+
+class AttainmentRollup:
+    """
+    Agregação única do relatório semanal com KPIs para as abas de gestão.
+
+    Um só groupby sobre as linhas aluno/semana produz o nível mais fino
+    (aluno × coordenador × semana) com todas as somas necessárias; os níveis
+    aluno, coordenador × semana e semana saem desse resultado pequeno
+    (rollup), com status e percentuais vetorizados. Resumo, painel, KPI
+    geral e cobrança viram projeções desses níveis.
+    """
+
+    def __init__(self, report_kpi: pd.DataFrame):
+        self.report_kpi = report_kpi
+        self.finest = self._aggregate_finest(report_kpi)
+
+    @staticmethod
+    def _aggregate_finest(report: pd.DataFrame) -> pd.DataFrame:
+        keys = [schema.COL_NAME, schema.COL_COORDINATOR, schema.COL_DATE]
+        if report.empty or any(k not in report.columns for k in keys):
+            return pd.DataFrame()
+
+        situacao = report.get(schema.OUT_COL_SITUACAO)
+        if situacao is not None:
+            situacao = situacao.astype(object)
+            atingiu = (situacao == schema.STATUS_ATINGIU).to_numpy()
+            contabiliza = (situacao.str.strip() != schema.STATUS_JUSTIFICADO).to_numpy()
+        else:
+            atingiu = np.zeros(len(report), dtype=bool)
+            contabiliza = np.zeros(len(report), dtype=bool)
+
+        def _num(col):
+            return report[col].fillna(0).to_numpy() if col in report.columns else np.zeros(len(report))
+
+        tem_id = report[schema.COL_ID_STONELAB].notna().to_numpy() if schema.COL_ID_STONELAB in report.columns else np.zeros(len(report), dtype=bool)
+
+        linhas = pd.DataFrame({
+            schema.COL_NAME: report[schema.COL_NAME],
+            schema.COL_COORDINATOR: report[schema.COL_COORDINATOR],
+            schema.COL_DATE: report[schema.COL_DATE],
+            'presenca': _num('observed_frequency'),
+            'meta': _num('meta_dinamica'),
+            'uteis': _num('workdays'),
+            'justificativas': _num('justified_days'),
+            'com_nome': report[schema.COL_NAME].notna().to_numpy().astype(np.int32),
+            'atingiu': atingiu.astype(np.int32),
+            'linhas_kpi': contabiliza.astype(np.int32),
+            'alunos_kpi': (contabiliza & tem_id).astype(np.int32),
+            'atingiu_kpi': (contabiliza & atingiu).astype(np.int32),
+        })
+        return linhas.groupby(keys, observed=True, dropna=False, sort=False).sum().reset_index()
+
+    def by_student(self) -> pd.DataFrame:
+        """Nível aluno (nome × coordenador): totais do mês, percentual visual e status."""
+        if self.finest.empty or 'uteis' not in self.finest.columns:
+            return pd.DataFrame()
+
+        resumo = self.finest.groupby([schema.COL_NAME, schema.COL_COORDINATOR], observed=True)[
+            ['presenca', 'meta', 'uteis', 'justificativas']
+        ].sum().reset_index()
+
+        uteis = resumo['uteis'].to_numpy(dtype=float)
+        presenca = resumo['presenca'].to_numpy(dtype=float)
+        ratio = np.zeros(len(resumo))
+        np.divide(presenca, uteis, out=ratio, where=uteis > 0)
+        resumo['ratio_visual'] = np.where(uteis > 0, np.minimum(ratio, 1.0), 0.0)
+
+        resumo['status'] = np.select(
+            [resumo['presenca'] >= resumo['meta'], resumo['justificativas'] > 0],
+            [schema.STATUS_ATINGIU, schema.STATUS_JUSTIFICADO],
+            default=schema.STATUS_NAO_ATINGIU
+        )
+        return resumo
+
+    def by_coordinator_week(self) -> pd.DataFrame:
+        """Nível coordenador × semana: alunos na semana e quantos atingiram."""
+        if self.finest.empty:
+            return pd.DataFrame()
+
+        painel = self.finest.groupby([schema.COL_COORDINATOR, schema.COL_DATE], observed=True).agg(
+            total_alunos=('com_nome', 'sum'),
+            atingiram=('atingiu', 'sum')
+        ).reset_index()
+
+        total = painel['total_alunos'].to_numpy(dtype=float)
+        ratio = np.zeros(len(painel))
+        np.divide(painel['atingiram'].to_numpy(dtype=float), total, out=ratio, where=total > 0)
+        painel['ratio'] = ratio
+        return painel
+
+    def by_week(self) -> pd.DataFrame:
+        """Nível semana (sem semanas justificadas): total de alunos, atingidos e KPI."""
+        if self.finest.empty:
+            return pd.DataFrame()
+
+        semanas = self.finest.groupby(schema.COL_DATE).agg(
+            linhas=('linhas_kpi', 'sum'),
+            total_de_alunos=('alunos_kpi', 'sum'),
+            atingidos=('atingiu_kpi', 'sum')
+        ).reset_index()
+        semanas = semanas[semanas['linhas'] > 0].drop(columns=['linhas']).reset_index(drop=True)
+
+        total = semanas['total_de_alunos'].to_numpy(dtype=float)
+        kpi = np.zeros(len(semanas))
+        np.divide(semanas['atingidos'].to_numpy(dtype=float), total, out=kpi, where=total > 0)
+        semanas['KPI_Presenca'] = kpi.round(2)
+        return semanas
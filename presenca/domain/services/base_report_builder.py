@@ -1,7 +1,9 @@
 import pandas as pd
+import numpy as np
 import logging
-from datetime import timedelta, date
+from datetime import timedelta
 import schema
+from ..models.tenure_table import TenureTable
 
 log = logging.getLogger(__name__)
 
@@ -10,7 +12,7 @@ class BaseReportBuilder:
     def __init__(self, config: object):
         self.config = config
 
-    def build(self, active_students: pd.DataFrame, tenures: dict) -> pd.DataFrame:
+    def build(self, active_students: pd.DataFrame, tenures: TenureTable) -> pd.DataFrame:
         if active_students.empty:
             log.warning("BaseBuilder: Recebi lista de alunos vazia.")
             return pd.DataFrame()
@@ -34,46 +36,33 @@ class BaseReportBuilder:
             weeks.append(current_monday)
             current_monday += timedelta(days=7)
 
-        rows = []
-        
-        if schema.COL_ID_STONELAB in active_students.columns:
-            active_students[schema.COL_ID_STONELAB] = active_students[schema.COL_ID_STONELAB].astype(str).str.strip()
+        if not weeks:
+            return pd.DataFrame()
+
+        n_students, n_weeks = len(active_students), len(weeks)
+        student_pos = np.repeat(np.arange(n_students), n_weeks)
+        week_dates = np.tile(np.array(weeks, dtype='datetime64[D]'), n_students)
 
-        for student in active_students.itertuples():
-            sid = str(getattr(student, schema.COL_ID_STONELAB)).strip()
-            
-            student_tenures = tenures.get(sid, [])
-            
-            if not student_tenures:
-                continue
+        keys = active_students[schema.COL_STUDENT_KEY].to_numpy()[student_pos]
+        freq_esperada = tenures.expected_frequency_at(keys, week_dates)
+        is_active_this_week = freq_esperada > 0
 
-            for week_date in weeks:
-                freq_esperada = 0
-                is_active_this_week = False
-                
-                for tenure in student_tenures:
-                    t_start = tenure.beginning
-                    t_end = tenure.end if tenure.end else date.max
-                    
-                    if t_start <= week_date <= t_end:
-                        freq_esperada = tenure.get_expected_frequency(week_date)
-                        
-                        if freq_esperada > 0:
-                            is_active_this_week = True
-                            break
-                
-                if is_active_this_week:
-                    row = {
-                        schema.COL_ID_STONELAB: sid,
-                        schema.COL_NAME: getattr(student, schema.COL_NAME, ""),
-                        schema.COL_FUNCTION: getattr(student, schema.COL_FUNCTION, ""),
-                        schema.COL_COORDINATOR: getattr(student, schema.COL_COORDINATOR, ""),
-                        schema.COL_DATE: week_date,
-                        "expected_frequency": int(freq_esperada)
-                    }
-                    rows.append(row)
-            
-        if not rows:
+        if not is_active_this_week.any():
             return pd.DataFrame()
 
-        return pd.DataFrame(rows)
\ No newline at end of file
+        student_pos = student_pos[is_active_this_week]
+
+        def student_column(col):
+            if col not in active_students.columns:
+                return ""
+            return active_students[col].to_numpy()[student_pos]
+
+        return pd.DataFrame({
+            schema.COL_STUDENT_KEY: keys[is_active_this_week],
+            schema.COL_ID_STONELAB: student_column(schema.COL_ID_STONELAB),
+            schema.COL_NAME: student_column(schema.COL_NAME),
+            schema.COL_FUNCTION: student_column(schema.COL_FUNCTION),
+            schema.COL_COORDINATOR: student_column(schema.COL_COORDINATOR),
+            schema.COL_DATE: week_dates[is_active_this_week].astype('datetime64[ns]'),
+            "expected_frequency": freq_esperada[is_active_this_week].astype(int)
+        })
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import schema
+
+class DailySpanAggregator:
+    """
+    Primeira e última batida por (nome, dia), acumuladas bloco a bloco.
+
+    Cada bloco de batidas é reduzido a min/max/contagem por (código do nome,
+    dia) e combinado ao parcial acumulado; como min, max e soma são
+    associativos, o resultado independe da divisão em blocos e a memória
+    fica limitada ao número de pares (nome, dia), nunca ao de batidas.
+
+    O par (nome, dia) vira uma única chave int64 (código << 20 | dia desde
+    1970), e a redução é uma ordenação seguida de reduceat.
+    """
+
+    CHUNK_SIZE = 250_000
+    _DAY_BITS = 20
+
+    def __init__(self):
+        self._group = np.empty(0, dtype=np.int64)
+        self._first = np.empty(0, dtype=np.int64)
+        self._last = np.empty(0, dtype=np.int64)
+        self._punches = np.empty(0, dtype=np.int32)
+
+    @staticmethod
+    def _reduce(group, first, last, punches):
+        order = np.argsort(group, kind='stable')
+        group = group[order]
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]]) if len(group) else np.empty(0, dtype=np.int64)
+        return (
+            group[starts],
+            np.minimum.reduceat(first[order], starts) if len(starts) else first,
+            np.maximum.reduceat(last[order], starts) if len(starts) else last,
+            np.add.reduceat(punches[order], starts).astype(np.int32) if len(starts) else punches
+        )
+
+    def update(self, name_codes, datetimes) -> 'DailySpanAggregator':
+        """Incorpora um bloco de batidas (códigos de nome, carimbos de data/hora)."""
+        codes = np.asarray(name_codes, dtype=np.int64)
+        stamps = np.asarray(datetimes, dtype='datetime64[s]')
+        valid = (codes >= 0) & ~np.isnat(stamps)
+        if not valid.any():
+            return self
+
+        seconds = stamps[valid].astype(np.int64)
+        days = seconds // 86400
+        group = (codes[valid] << self._DAY_BITS) | days
+        chunk = self._reduce(group, seconds, seconds, np.ones(len(seconds), dtype=np.int32))
+
+        self._group, self._first, self._last, self._punches = self._reduce(
+            np.concatenate([self._group, chunk[0]]),
+            np.concatenate([self._first, chunk[1]]),
+            np.concatenate([self._last, chunk[2]]),
+            np.concatenate([self._punches, chunk[3]])
+        )
+        return self
+
+    def result(self) -> pd.DataFrame:
+        days = self._group & ((1 << self._DAY_BITS) - 1)
+        return pd.DataFrame({
+            'name_code': (self._group >> self._DAY_BITS).astype(np.int32),
+            schema.COL_XML_DATE: (days * 86400).astype('datetime64[s]'),
+            'first_punch': self._first.astype('datetime64[s]'),
+            'last_punch': self._last.astype('datetime64[s]'),
+            'punches': self._punches,
+        })
@@ -0,0 +1,132 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type
+import numpy as np
+import pandas as pd
+import schema
+
+log = logging.getLogger(__name__)
+
+class KpiCalendar:
+    """Calendário compartilhado pelas estratégias: segundas-feiras e dias úteis sem feriados."""
+
+    def __init__(self, holidays=()):
+        self.holidays = np.unique(np.asarray(list(holidays), dtype='datetime64[D]'))
+        self.holidays = self.holidays[~np.isnat(self.holidays)]
+
+    @classmethod
+    def from_feriados(cls, df_feriados: pd.DataFrame) -> 'KpiCalendar':
+        if df_feriados is None or df_feriados.empty or schema.FERIADOS_DATA not in df_feriados.columns:
+            return cls()
+        return cls(pd.to_datetime(df_feriados[schema.FERIADOS_DATA], errors='coerce').dropna().to_numpy(dtype='datetime64[D]'))
+
+    @staticmethod
+    def mondays(dates: pd.Series) -> np.ndarray:
+        dates = pd.to_datetime(dates, errors='coerce')
+        return (dates.dt.normalize() - pd.to_timedelta(dates.dt.dayofweek, unit='D')).to_numpy(dtype='datetime64[D]')
+
+    def workdays(self, mondays: np.ndarray) -> np.ndarray:
+        """Dias úteis (segunda a sexta, fora feriados) da semana de cada segunda; -1 para datas inválidas."""
+        valid = ~np.isnat(mondays)
+        result = np.full(len(mondays), -1, dtype=np.int64)
+        result[valid] = np.busday_count(mondays[valid], mondays[valid] + 5, holidays=self.holidays)
+        return result
+
+class KpiStrategy(ABC):
+    """
+    Política de atingimento semanal. Recebe o quadro semanal compartilhado
+    (uma linha por aluno/semana, já com frequência observada, esperada e
+    faltas justificadas) e devolve, de forma vetorizada, a meta de dias e o
+    status de cada linha.
+    """
+
+    name: str = ''
+    label: str = ''
+
+    def __init__(self, config: object = None):
+        self.config = config
+
+    @abstractmethod
+    def target(self, week_frame: pd.DataFrame, calendar: KpiCalendar) -> np.ndarray:
+        """Dias de presença exigidos em cada linha."""
+
+    def compute(self, week_frame: pd.DataFrame, calendar: KpiCalendar) -> np.ndarray:
+        return self.classify(week_frame, self.target(week_frame, calendar))
+
+    @staticmethod
+    def classify(week_frame: pd.DataFrame, meta: np.ndarray) -> np.ndarray:
+        freq_obs = week_frame['observed_frequency'].to_numpy()
+        if 'justified_days' in week_frame.columns:
+            faltas_just = week_frame['justified_days'].fillna(0).to_numpy()
+        else:
+            faltas_just = np.zeros(len(week_frame))
+
+        return np.select(
+            [freq_obs >= meta, (freq_obs < meta) & (faltas_just > 0)],
+            [schema.STATUS_ATINGIU, schema.STATUS_JUSTIFICADO],
+            default=schema.STATUS_NAO_ATINGIU
+        )
+
+    @staticmethod
+    def _expected_ratio(week_frame: pd.DataFrame) -> np.ndarray:
+        if 'expected_frequency' not in week_frame.columns:
+            return np.full(len(week_frame), 3 / 5.0)
+        return week_frame['expected_frequency'].astype(float).to_numpy() / 5.0
+
+_KPI_STRATEGIES: Dict[str, Type[KpiStrategy]] = {}
+
+def register_kpi_strategy(cls: Type[KpiStrategy]) -> Type[KpiStrategy]:
+    _KPI_STRATEGIES[cls.name] = cls
+    return cls
+
+def available_kpi_strategies() -> List[str]:
+    return list(_KPI_STRATEGIES)
+
+def build_kpi_strategy(name: str, config: object = None) -> KpiStrategy:
+    try:
+        return _KPI_STRATEGIES[name](config)
+    except KeyError:
+        raise ValueError(f"Estratégia de KPI desconhecida: '{name}'. Disponíveis: {available_kpi_strategies()}")
+
+@register_kpi_strategy
+class DynamicTargetStrategy(KpiStrategy):
+    """Padrão: teto de (dias úteis da semana × frequência esperada / 5)."""
+
+    name = 'padrao'
+    label = 'Meta Dinâmica'
+    FALLBACK_TARGET = 3
+
+    def target(self, week_frame: pd.DataFrame, calendar: KpiCalendar) -> np.ndarray:
+        workdays = calendar.workdays(calendar.mondays(week_frame[schema.COL_DATE]))
+        ratio = self._expected_ratio(week_frame)
+
+        invalid = (workdays < 0) | np.isnan(ratio)
+        meta = np.ceil(np.where(invalid, 0, workdays * np.where(invalid, 0, ratio)))
+        meta[invalid] = self.FALLBACK_TARGET
+        return meta.astype(np.int64)
+
+@register_kpi_strategy
+class FixedDaysStrategy(KpiStrategy):
+    """Número fixo de dias por semana (KPI_DIAS_FIXOS), limitado aos dias úteis."""
+
+    name = 'dias_fixos'
+    label = 'Dias Fixos'
+    DEFAULT_DAYS = 3
+
+    def target(self, week_frame: pd.DataFrame, calendar: KpiCalendar) -> np.ndarray:
+        days = int(getattr(self.config, 'KPI_DIAS_FIXOS', self.DEFAULT_DAYS))
+        workdays = calendar.workdays(calendar.mondays(week_frame[schema.COL_DATE]))
+        return np.where(workdays < 0, days, np.minimum(days, workdays))
+
+@register_kpi_strategy
+class ThresholdStrategy(KpiStrategy):
+    """Fração LIMIAR_ATINGIMENTO_GERAL da frequência esperada, proporcional aos dias úteis."""
+
+    name = 'limiar'
+    label = 'Limiar'
+
+    def target(self, week_frame: pd.DataFrame, calendar: KpiCalendar) -> np.ndarray:
+        limiar = float(getattr(self.config, 'LIMIAR_ATINGIMENTO_GERAL', schema.LIMIAR_ATINGIMENTO_GERAL))
+        workdays = calendar.workdays(calendar.mondays(week_frame[schema.COL_DATE]))
+        ratio = np.nan_to_num(self._expected_ratio(week_frame), nan=3 / 5.0)
+        return np.ceil(limiar * np.maximum(workdays, 0) * ratio).astype(np.int64)
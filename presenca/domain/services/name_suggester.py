@@ -0,0 +1,141 @@
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+_COMBINING_MARKS = re.compile(r'[\u0300-\u036f]')
+_SEPARATORS = re.compile(r'[\W_]+')
+
+class NameSuggester:
+    """
+    Sugere, para um nome do XML sem correspondência, a pessoa do cadastro com
+    grafia mais próxima.
+
+    Os nomes do cadastro (nome completo e nome_entrada) são normalizados e
+    indexados por trigramas em um índice invertido. Cada consulta percorre
+    primeiro os trigramas mais raros (até um orçamento de postings) e só
+    compara, por distância de edição limitada, os poucos candidatos que
+    compartilham mais trigramas com ela, sem varrer o cadastro inteiro.
+    """
+
+    def __init__(self, search_names: Iterable[str], labels: Iterable[str],
+                 max_candidates: int = 8, max_distance_ratio: float = 0.3,
+                 postings_budget: int = 4000):
+        self.max_candidates = max_candidates
+        self.max_distance_ratio = max_distance_ratio
+        self.postings_budget = postings_budget
+
+        label_by_name: Dict[str, str] = {}
+        for name, label in zip(search_names, labels):
+            if isinstance(name, str) and isinstance(label, str):
+                normalized = self.normalize(name)
+                if normalized:
+                    label_by_name.setdefault(normalized, label)
+        self._names: List[str] = list(label_by_name)
+        self._labels: List[str] = list(label_by_name.values())
+        self._build_index()
+
+    @classmethod
+    def from_cadastro(cls, df_cadastro: pd.DataFrame, col_name: str, col_entrada: str, **kwargs) -> 'NameSuggester':
+        """Indexa nome completo e nome_entrada; a sugestão exibida é o nome completo."""
+        if df_cadastro.empty or col_name not in df_cadastro.columns:
+            return cls([], [], **kwargs)
+        names = df_cadastro[col_name].astype(object)
+        search, labels = list(names), list(names)
+        if col_entrada in df_cadastro.columns:
+            search += list(df_cadastro[col_entrada].astype(object))
+            labels += list(names)
+        return cls(search, labels, **kwargs)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        text = _COMBINING_MARKS.sub('', unicodedata.normalize('NFD', str(name).upper()))
+        return _SEPARATORS.sub(' ', text).strip()
+
+    @staticmethod
+    def _trigrams(name: str) -> set:
+        padded = f"  {name} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _build_index(self):
+        grams, owners = [], []
+        for idx, name in enumerate(self._names):
+            name_grams = self._trigrams(name)
+            grams.extend(name_grams)
+            owners.extend([idx] * len(name_grams))
+
+        codes, vocabulary = pd.factorize(pd.Series(grams, dtype=object))
+        order = np.argsort(codes, kind='stable')
+        self._postings = np.asarray(owners, dtype=np.int32)[order]
+        self._offsets = np.searchsorted(codes[order], np.arange(len(vocabulary) + 1))
+        self._gram_ids: Dict[str, int] = {gram: i for i, gram in enumerate(vocabulary)}
+
+    def suggest(self, name: str) -> Optional[str]:
+        query = self.normalize(name) if isinstance(name, str) else ''
+        if not query or not self._names:
+            return None
+
+        gram_ids = np.array([self._gram_ids[g] for g in self._trigrams(query) if g in self._gram_ids], dtype=np.int64)
+        if len(gram_ids) == 0:
+            return None
+
+        sizes = self._offsets[gram_ids + 1] - self._offsets[gram_ids]
+        order = np.argsort(sizes, kind='stable')
+        within_budget = np.cumsum(sizes[order]) <= self.postings_budget
+        within_budget[:min(3, len(order))] = True
+        selected = gram_ids[order[within_budget]]
+
+        hits = np.concatenate([self._postings[self._offsets[g]:self._offsets[g + 1]] for g in selected])
+        counts = np.bincount(hits, minlength=len(self._names))
+        candidates = np.flatnonzero(counts)
+        shared = counts[candidates]
+        if len(candidates) > self.max_candidates:
+            top = np.argpartition(-shared, self.max_candidates - 1)[:self.max_candidates]
+            candidates, shared = candidates[top], shared[top]
+        candidates = candidates[np.argsort(-shared, kind='stable')]
+
+        limit = max(1, math.floor(len(query) * self.max_distance_ratio))
+        best_label, best_distance = None, limit + 1
+        for candidate in candidates:
+            target = self._names[candidate]
+            if abs(len(target) - len(query)) >= best_distance:
+                continue
+            distance = self._edit_distance(query, target)
+            if distance < best_distance:
+                best_label, best_distance = self._labels[candidate], distance
+                if distance == 0:
+                    break
+        return best_label
+
+    def suggest_many(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        return {name: self.suggest(name) for name in pd.unique(pd.Series(list(names), dtype=object))}
+
+    @staticmethod
+    def _edit_distance(a: str, b: str) -> int:
+        """Levenshtein bit-paralelo (Myers/Hyyrö): O(len(b)) operações sobre inteiros."""
+        if not a:
+            return len(b)
+        peq: Dict[str, int] = {}
+        for i, c in enumerate(a):
+            peq[c] = peq.get(c, 0) | (1 << i)
+
+        mask = (1 << len(a)) - 1
+        last = 1 << (len(a) - 1)
+        pv, mv, score = mask, 0, len(a)
+        for c in b:
+            eq = peq.get(c, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = (ph << 1) | 1
+            mh = mh << 1
+            pv = (mh | ~(xv | ph)) & mask
+            mv = ph & xv & mask
+        return score
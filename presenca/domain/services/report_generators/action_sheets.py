@@ -1,8 +1,10 @@
 import pandas as pd
 from datetime import date, timedelta, datetime
 import logging
-from typing import Dict, Set
+from typing import Dict, Iterable, Optional, Set
 import schema 
+from ..name_suggester import NameSuggester
+from ....utils.name_vocabulary import NameVocabulary
 
 try:
     from ....utils.date_utils import get_workdays_for_week
@@ -19,38 +21,41 @@ class ActionSheetGenerator:
         self.data = data_frames
         self.config = config
 
-    def generate(self) -> dict:
-        tabs = {}
+    def generate(self, tabs: Optional[Iterable[str]] = None) -> dict:
+        result = {}
         start = pd.to_datetime(self.config.DATA_INICIO_GERAL).date()
         end = pd.to_datetime(self.config.DATA_FIM_GERAL).date()
 
-        df_acoes = self._generate_action_sheet_filtered(start, end)
-        tabs[schema.ABA_ACOES_CADASTRO] = df_acoes
+        if tabs is None or schema.ABA_ACOES_CADASTRO in tabs:
+            result[schema.ABA_ACOES_CADASTRO] = self._generate_action_sheet_filtered(start, end)
+
+        raw_tabs = (schema.ABA_XML_EXPORT, schema.ABA_RAW_PRESENCE, schema.ABA_IGNORAR)
+        if tabs is None or any(tab in tabs for tab in raw_tabs):
+            result.update(self._generate_raw_data_tabs(start, end))
         
-        tabs.update(self._generate_raw_data_tabs(start, end))
+        return result
+
+    @staticmethod
+    def _suggest_registrations(report_acoes: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.Series:
+        """Sugere a pessoa do cadastro mais parecida para cada nome não cadastrado."""
+        nao_cadastrado = report_acoes[schema.OUT_COL_ACOES_SITUACAO] == schema.ACAO_NAO_CADASTRADO
+        sugestoes = pd.Series('', index=report_acoes.index, dtype=object)
+        if not nao_cadastrado.any():
+            return sugestoes
+
+        suggester = NameSuggester.from_cadastro(df_cadastro, schema.COL_NAME, schema.COL_NOME_ENTRADA)
+        nomes = report_acoes.loc[nao_cadastrado, schema.COL_NOME_ENTRADA].astype(object)
+        por_nome = suggester.suggest_many(nomes)
         
-        return tabs
+        sugestoes[nao_cadastrado] = nomes.map(por_nome).fillna('')
+        log.info(f"ActionSheet: Sugestões encontradas para {sum(v is not None for v in por_nome.values())} de {len(por_nome)} nomes não cadastrados.")
+        return sugestoes
 
-    def _classify_status(self, nome_xml: str, 
-                         set_cadastro_nome_entrada: Set[str], 
-                         set_cadastro_nome_completo: Set[str], 
-                         set_ignorar_nomes: Set[str], 
-                         map_entrada_para_real: Dict[str, str]) -> str:
-        
-        if nome_xml in set_cadastro_nome_entrada:
-            real_name = map_entrada_para_real.get(nome_xml)
-            if real_name and real_name in set_ignorar_nomes:
-                return schema.ACAO_OK_IGNORADO
-            else:
-                return schema.ACAO_OK_MATCH_CORRETO
-
-        if nome_xml in set_ignorar_nomes:
-            return schema.ACAO_OK_IGNORADO
-            
-        if nome_xml in set_cadastro_nome_completo:
-            return schema.ACAO_CORRIGIR_NOME
-            
-        return schema.ACAO_NAO_CADASTRADO
+    @staticmethod
+    def _week_start(dates: pd.Series) -> pd.Series:
+        """Segunda-feira da semana de cada data (semanas de segunda a domingo)."""
+        days = dates.dt.normalize()
+        return days - pd.to_timedelta(days.dt.dayofweek, unit='D')
 
     def _generate_action_sheet_filtered(self, start: date, end: date) -> pd.DataFrame:
         log.info("Gerando aba 'Acoes_de_Cadastro' (Apenas Problemas)...")
@@ -63,48 +68,35 @@ class ActionSheetGenerator:
             log.warning("ActionSheet: 'registros_brutos' está vazio.")
             return pd.DataFrame(columns=[
                 schema.OUT_COL_ACOES_NOME_XML, schema.OUT_COL_ACOES_SEMANA, 
-                schema.OUT_COL_ACOES_FREQ_OBS, schema.OUT_COL_ACOES_SITUACAO
+                schema.OUT_COL_ACOES_FREQ_OBS, schema.OUT_COL_ACOES_SITUACAO,
+                schema.OUT_COL_ACOES_SUGESTAO
             ])
 
-        set_ignorar_nomes = set(df_ignorar.iloc[:, 0].dropna().unique())
-        set_cadastro_nome_entrada = set(df_cadastro[schema.COL_NOME_ENTRADA].dropna().unique())
-        set_cadastro_nome_completo = set(df_cadastro[schema.COL_NAME].dropna().unique())
-        
-        map_entrada_para_real = {}
-        if schema.COL_NOME_ENTRADA in df_cadastro.columns and schema.COL_NAME in df_cadastro.columns:
-            map_entrada_para_real = df_cadastro.dropna(
-                subset=[schema.COL_NOME_ENTRADA, schema.COL_NAME]
-            ).set_index(schema.COL_NOME_ENTRADA)[schema.COL_NAME].to_dict()
-
-        df_registros[schema.COL_XML_DATE] = pd.to_datetime(df_registros[schema.COL_XML_DATE]).dt.date
-        df_xml_mes = df_registros[
-            (df_registros[schema.COL_XML_DATE] >= start) & (df_registros[schema.COL_XML_DATE] <= end)
-        ].copy()
+        df_xml_mes = df_registros[self._period_mask(df_registros, start, end)]
 
         if df_xml_mes.empty:
             log.warning("ActionSheet: Nenhum registro XML no período.")
             return pd.DataFrame(columns=[
                 schema.OUT_COL_ACOES_NOME_XML, schema.OUT_COL_ACOES_SEMANA, 
-                schema.OUT_COL_ACOES_FREQ_OBS, schema.OUT_COL_ACOES_SITUACAO
+                schema.OUT_COL_ACOES_FREQ_OBS, schema.OUT_COL_ACOES_SITUACAO,
+                schema.OUT_COL_ACOES_SUGESTAO
             ])
 
-        df_xml_mes[schema.OUT_COL_ACOES_SEMANA] = pd.to_datetime(
-            df_xml_mes[schema.COL_XML_DATE]
-        ).dt.to_period('W').apply(lambda r: r.start_time).dt.date
-        
+        semanas = self._week_start(df_xml_mes[schema.COL_XML_DATE]).rename(schema.OUT_COL_ACOES_SEMANA)
         report_base = df_xml_mes.groupby(
-            [schema.COL_NOME_ENTRADA, schema.OUT_COL_ACOES_SEMANA]
+            [df_xml_mes[schema.COL_NOME_ENTRADA], semanas], observed=True
         ).size().reset_index(name=schema.OUT_COL_ACOES_FREQ_OBS)
-
-        report_base[schema.OUT_COL_ACOES_SITUACAO] = report_base[schema.COL_NOME_ENTRADA].apply(
-            lambda nome: self._classify_status(
-                nome,
-                set_cadastro_nome_entrada,
-                set_cadastro_nome_completo,
-                set_ignorar_nomes,
-                map_entrada_para_real
-            )
-        )
+        report_base[schema.OUT_COL_ACOES_SEMANA] = report_base[schema.OUT_COL_ACOES_SEMANA].dt.date
+
+        vocabulary = self.data.get('name_vocabulary')
+        flags = self.data.get('mascaras_nomes')
+        if vocabulary is None:
+            vocabulary = NameVocabulary.from_series(df_registros[schema.COL_NOME_ENTRADA])
+            flags = None
+        if flags is None:
+            flags = vocabulary.registration_flags(df_cadastro, df_ignorar)
+        situacoes = vocabulary.classify(flags)
+        report_base[schema.OUT_COL_ACOES_SITUACAO] = situacoes[vocabulary.codes(report_base[schema.COL_NOME_ENTRADA])]
         
         situacoes_de_acao = [
             schema.ACAO_CORRIGIR_NOME,
@@ -114,6 +106,10 @@ class ActionSheetGenerator:
             report_base[schema.OUT_COL_ACOES_SITUACAO].isin(situacoes_de_acao)
         ].copy()
         
+        report_final_acoes[schema.OUT_COL_ACOES_SUGESTAO] = self._suggest_registrations(
+            report_final_acoes, df_cadastro
+        )
+        
         if not report_final_acoes.empty:
             report_final_acoes.sort_values(
                 by=[schema.OUT_COL_ACOES_SITUACAO, schema.COL_NOME_ENTRADA, schema.OUT_COL_ACOES_SEMANA], 
@@ -122,22 +118,34 @@ class ActionSheetGenerator:
         
         return report_final_acoes
 
+    @staticmethod
+    def _period_mask(df: pd.DataFrame, start: date, end: date) -> pd.Series:
+        dates = df[schema.COL_XML_DATE]
+        return (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))
+
+    def _with_student_attributes(self, punches: pd.DataFrame) -> pd.DataFrame:
+        """Completa as batidas (chave + datas) com os dados do cadastro, só na hora de exportar."""
+        df_cadastro = self.data.get('cadastro', pd.DataFrame())
+        if df_cadastro.empty or schema.COL_STUDENT_KEY not in df_cadastro.columns:
+            return punches.drop(columns=[schema.COL_STUDENT_KEY])
+
+        atributos = df_cadastro.drop_duplicates(subset=[schema.COL_STUDENT_KEY]).set_index(schema.COL_STUDENT_KEY)
+        raw = punches.join(atributos, on=schema.COL_STUDENT_KEY).drop(columns=[schema.COL_STUDENT_KEY])
+        
+        first = [c for c in (schema.COL_NOME_ENTRADA, 'Datetime', schema.COL_XML_DATE) if c in raw.columns]
+        return raw[first + [c for c in raw.columns if c not in first]]
+
     def _generate_raw_data_tabs(self, start: date, end: date) -> dict:
         
         df_registros = self.data.get('registros_brutos', pd.DataFrame())
         renamed_xml = pd.DataFrame()
         
         if not df_registros.empty and schema.COL_XML_DATE in df_registros.columns:
-            df_registros[schema.COL_XML_DATE] = pd.to_datetime(df_registros[schema.COL_XML_DATE]).dt.date
-            
-            xml_periodo = df_registros[
-                (df_registros[schema.COL_XML_DATE] >= start) & (df_registros[schema.COL_XML_DATE] <= end)
-            ].copy()
+            xml_periodo = df_registros[self._period_mask(df_registros, start, end)].copy()
+            xml_periodo[schema.COL_XML_DATE] = xml_periodo[schema.COL_XML_DATE].dt.date
             
             if 'Datetime' in xml_periodo.columns:
-                xml_periodo['Datetime'] = pd.to_datetime(
-                    xml_periodo['Datetime'], errors='coerce'
-                ).dt.strftime('%Y-%m-%d %H:%M:%S')
+                xml_periodo['Datetime'] = xml_periodo['Datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
             
             renamed_xml = xml_periodo.rename(columns={
                 'nome_entrada': 'Nome (XML)', 'Datetime': 'Data e Hora (XML)',
@@ -148,10 +156,10 @@ class ActionSheetGenerator:
         raw_presence = pd.DataFrame()
         
         if not df_registros_final.empty and schema.COL_XML_DATE in df_registros_final.columns:
-            df_registros_final[schema.COL_XML_DATE] = pd.to_datetime(df_registros_final[schema.COL_XML_DATE]).dt.date
-            raw_presence = df_registros_final[
-                (df_registros_final[schema.COL_XML_DATE] >= start) & (df_registros_final[schema.COL_XML_DATE] <= end)
-            ].copy()
+            raw_presence = self._with_student_attributes(
+                df_registros_final[self._period_mask(df_registros_final, start, end)]
+            ).copy()
+            raw_presence[schema.COL_XML_DATE] = raw_presence[schema.COL_XML_DATE].dt.date
         
         return {
             schema.ABA_XML_EXPORT: renamed_xml,
@@ -1,49 +1,47 @@
 import pandas as pd
 import numpy as np
 import logging
-import os
-import unicodedata
 from datetime import date
+from typing import Optional
 import schema
+from ....utils.history_repository import LAST_SEEN_COLUMNS, HistoryRepository, build_history_repository, punch_days
+from ....utils.name_vocabulary import NameVocabulary
+from ....utils.punch_archive import PunchArchive, build_punch_archive
 
 log = logging.getLogger(__name__)
 
 class BiometryCleanupSheetGenerator:
     
-    def __init__(self, processed_data: dict, config: dict):
+    def __init__(self, processed_data: dict, config: dict, history: Optional[HistoryRepository] = None,
+                 archive: Optional[PunchArchive] = None):
         self.registros_brutos = processed_data.get('registros_brutos', pd.DataFrame())
         self.cadastro = processed_data.get('cadastro', pd.DataFrame())
         self.ignorar = processed_data.get('ignorar', pd.DataFrame())
         self.config = config
-        
-        self.output_path = os.path.join("output", "output-dashboard")
-        if hasattr(config, 'CAMINHOS') and 'local' in config.CAMINHOS:
-             self.output_path = config.CAMINHOS['local'].get('output_dashboard', self.output_path)
+        self.history = history
+        self.archive = archive
 
     def generate(self) -> dict:
         log.info("Gerador Limpeza: Listando TODOS inativos (> 15 dias)...")
 
         ref_date = pd.Timestamp(self.config.DATA_FIM_GERAL)
 
-        df_historico = self._load_history_names_and_dates()
+        history = self.history or build_history_repository(self.config)
+        # Nomes do relatório semanal (qualquer semana listada) e nomes biométricos de meses anteriores:
+        # do arquivo de batidas e, para meses de antes do arquivo, do histórico.
+        df_historico = history.last_seen_by_name(ref_date.date(), present_only=False)
+        df_batidas = history.last_punch_by_name(ref_date.date())
+        df_arquivo = self._get_archived_last_punches(ref_date.date())
         df_atual = self._get_current_names_and_dates()
+        df_atual = df_atual[df_atual['Data'] <= ref_date]
         
-        dfs_to_concat = []
-        if not df_historico.empty: dfs_to_concat.append(df_historico)
-        if not df_atual.empty: dfs_to_concat.append(df_atual)
-        
-        if not dfs_to_concat:
+        partes = [df for df in (df_historico, df_batidas, df_arquivo, df_atual) if not df.empty]
+        if not partes:
             return {schema.ABA_LIMPEZA_BIOMETRIA: pd.DataFrame()}
-            
-        df_full = pd.concat(dfs_to_concat, ignore_index=True)
-        
-        df_full['Data'] = pd.to_datetime(df_full['Data'], errors='coerce')
-        df_full = df_full[df_full['Data'] <= ref_date].copy()
 
-        if df_full.empty:
-            return {schema.ABA_LIMPEZA_BIOMETRIA: pd.DataFrame()}
-
-        df_full['nome_norm'] = self._normalize_name(df_full['Nome'])
+        # A última presença já vem agregada por nome; só os dias do mês corrente são agrupados aqui.
+        df_full = pd.concat(partes, ignore_index=True)
+        df_full['Data'] = pd.to_datetime(df_full['Data'], errors='coerce')
         
         stats = df_full.groupby('nome_norm').agg({
             'Nome': 'first', 
@@ -52,7 +50,7 @@ class BiometryCleanupSheetGenerator:
 
         stats['dias_off'] = (ref_date - stats['Data']).dt.days
         
-        stats = stats[stats['dias_off'] > 15].copy()
+        stats = stats[stats['dias_off'] > 15]
 
         if stats.empty:
             log.info("Gerador Limpeza: Nenhum registro ausente há mais de 15 dias.")
@@ -76,29 +74,24 @@ class BiometryCleanupSheetGenerator:
         
         return {schema.ABA_LIMPEZA_BIOMETRIA: df_final}
 
-    def _load_history_names_and_dates(self) -> pd.DataFrame:
-        try:
-            filename = "STONE_LAB_DATABASE_HISTORICO.csv"
-            path = os.path.join(self.output_path, filename)
-            if not os.path.exists(path): return pd.DataFrame(columns=['Nome', 'Data'])
-            
-            df = pd.read_csv(path, usecols=[schema.DB_HIST_COL_NOME, schema.DB_HIST_COL_DATE])
-            df.rename(columns={schema.DB_HIST_COL_NOME: 'Nome', schema.DB_HIST_COL_DATE: 'Data'}, inplace=True)
-            df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-            return df.dropna()
-        except Exception:
-            return pd.DataFrame(columns=['Nome', 'Data'])
+    def _get_archived_last_punches(self, ref_date: date) -> pd.DataFrame:
+        """Último dia com batida por nome no arquivo de batidas, sem os nomes que o transformer ignora."""
+        archive = self.archive if self.archive is not None else build_punch_archive(self.config)
+        if archive is None:
+            return pd.DataFrame(columns=LAST_SEEN_COLUMNS)
+        df = archive.last_punch_by_name(ref_date)
+        if df.empty:
+            return df
+        # O arquivo guarda todas as batidas lidas, inclusive as de nomes da lista de ignorados.
+        vocabulary = NameVocabulary.from_series(df['Nome'])
+        flags = vocabulary.registration_flags(self.cadastro, self.ignorar)
+        return df[~vocabulary.rows(vocabulary.ignored(flags), df['Nome'])]
 
     def _get_current_names_and_dates(self) -> pd.DataFrame:
-        if self.registros_brutos.empty or 'Name' not in self.registros_brutos.columns:
-            return pd.DataFrame(columns=['Nome', 'Data'])
-        
-        df = self.registros_brutos[['Name', 'Datetime']].copy()
-        df.rename(columns={'Name': 'Nome', 'Datetime': 'Data'}, inplace=True)
-        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-        return df.dropna()
-
-    def _normalize_name(self, series: pd.Series) -> pd.Series:
-        s = series.astype(str).str.upper().str.strip().str.replace(r'\.0$', '', regex=True)
-        return s.apply(lambda x: ''.join(c for c in unicodedata.normalize('NFD', x)
-                                          if unicodedata.category(c) != 'Mn'))
\ No newline at end of file
+        """Dias com batida no mês, por nome biométrico (após o transformer a coluna é COL_NOME_ENTRADA)."""
+        dias = punch_days(self.registros_brutos)
+        return pd.DataFrame({
+            'nome_norm': dias['nome_norm'],
+            'Nome': dias['nome'],
+            'Data': pd.to_datetime(dias['data']),
+        })
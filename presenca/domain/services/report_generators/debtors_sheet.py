@@ -7,16 +7,16 @@ class DebtorsSheetGenerator:
 
     def generate(self) -> dict:
         if self.summary_df.empty:
-            return {'Acao_Cobranca': pd.DataFrame()}
+            return {schema.ABA_ACAO_COBRANCA: pd.DataFrame()}
 
         if 'Situacao Geral no Mês' in self.summary_df.columns:
             mask_devedores = self.summary_df['Situacao Geral no Mês'] == schema.STATUS_NAO_ATINGIU
-            df_devedores = self.summary_df[mask_devedores].copy()
+            df_devedores = self.summary_df[mask_devedores]
         else:
             df_devedores = pd.DataFrame()
 
         if df_devedores.empty:
-            return {'Acao_Cobranca': pd.DataFrame(columns=['Aluno', 'Atingimento %', 'Coordenador'])}
+            return {schema.ABA_ACAO_COBRANCA: pd.DataFrame(columns=['Aluno', 'Atingimento %', 'Coordenador'])}
 
         col_map = {
             'Nome do Aluno': 'Aluno',
@@ -34,4 +34,4 @@ class DebtorsSheetGenerator:
         cols_order = [c for c in cols_order if c in df_final.columns]
         df_final = df_final[cols_order]
 
-        return {'Acao_Cobranca': df_final}
\ No newline at end of file
+        return {schema.ABA_ACAO_COBRANCA: df_final}
\ No newline at end of file
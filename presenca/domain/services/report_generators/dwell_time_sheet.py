@@ -0,0 +1,117 @@
+import pandas as pd
+import numpy as np
+import logging
+import schema
+
+log = logging.getLogger(__name__)
+
+class DwellTimeSheetGenerator:
+    """
+    Permanência no laboratório: entrada (primeira batida), saída (última
+    batida) e horas entre elas por aluno e dia, mais as médias semanais por
+    coordenador. Dias com uma única batida entram na lista, mas não têm
+    permanência medida e ficam fora das médias.
+    """
+
+    def __init__(self, processed_data: dict, config: dict):
+        self.permanencia = processed_data.get('permanencia', pd.DataFrame())
+        self.cadastro = processed_data.get('cadastro', pd.DataFrame())
+        self.config = config
+
+    def generate(self) -> dict:
+        log.info("Gerador Permanência: Calculando entrada, saída e permanência por aluno/dia...")
+
+        daily = self._daily_spans()
+        if daily.empty:
+            return {
+                schema.ABA_PERMANENCIA: pd.DataFrame(),
+                schema.ABA_PERMANENCIA_COORDENADORES: pd.DataFrame()
+            }
+
+        return {
+            schema.ABA_PERMANENCIA: self._format_daily(daily),
+            schema.ABA_PERMANENCIA_COORDENADORES: self._weekly_by_coordinator(daily)
+        }
+
+    def _daily_spans(self) -> pd.DataFrame:
+        if self.permanencia.empty:
+            return pd.DataFrame()
+
+        start = pd.Timestamp(self.config.DATA_INICIO_GERAL)
+        end = pd.Timestamp(self.config.DATA_FIM_GERAL)
+        datas = self.permanencia[schema.COL_XML_DATE]
+        daily = self.permanencia[(datas >= start) & (datas <= end)]
+        if daily.empty:
+            return pd.DataFrame()
+
+        first = daily['first_punch']
+        last = daily['last_punch']
+        medido = daily['punches'] > 1
+        daily = daily.assign(
+            dwell_hours=((last - first).dt.total_seconds() / 3600).where(medido),
+            entry_seconds=(first - first.dt.normalize()).dt.total_seconds(),
+            exit_seconds=(last - last.dt.normalize()).dt.total_seconds(),
+            measured=medido
+        )
+
+        if not self.cadastro.empty and schema.COL_STUDENT_KEY in self.cadastro.columns:
+            cols = [c for c in (schema.COL_ID_STONELAB, schema.COL_NAME, schema.COL_COORDINATOR) if c in self.cadastro.columns]
+            atributos = self.cadastro.drop_duplicates(subset=[schema.COL_STUDENT_KEY]).set_index(schema.COL_STUDENT_KEY)[cols]
+            daily = daily.join(atributos, on=schema.COL_STUDENT_KEY)
+        return daily
+
+    @staticmethod
+    def _clock(seconds: pd.Series) -> pd.Series:
+        """Segundos desde a meia-noite -> 'HH:MM'."""
+        minutes = seconds.round().floordiv(60)
+        texto = (
+            minutes.floordiv(60).astype('Int64').astype(str).str.zfill(2) + ':'
+            + minutes.mod(60).astype('Int64').astype(str).str.zfill(2)
+        )
+        return texto.where(seconds.notna(), '')
+
+    def _format_daily(self, daily: pd.DataFrame) -> pd.DataFrame:
+        df = pd.DataFrame({
+            schema.COL_ID_STONELAB: daily.get(schema.COL_ID_STONELAB),
+            schema.OUT_COL_NOME: daily.get(schema.COL_NAME),
+            schema.OUT_COL_COORDENADOR: daily.get(schema.COL_COORDINATOR),
+            schema.OUT_COL_PERM_DATA: daily[schema.COL_XML_DATE].dt.date,
+            schema.OUT_COL_PERM_ENTRADA: self._clock(daily['entry_seconds']),
+            schema.OUT_COL_PERM_SAIDA: self._clock(daily['exit_seconds']),
+            schema.OUT_COL_PERM_BATIDAS: daily['punches'],
+            schema.OUT_COL_PERM_HORAS: daily['dwell_hours'].round(2),
+        })
+        return df.sort_values([schema.OUT_COL_NOME, schema.OUT_COL_PERM_DATA]).reset_index(drop=True)
+
+    def _weekly_by_coordinator(self, daily: pd.DataFrame) -> pd.DataFrame:
+        if schema.COL_COORDINATOR not in daily.columns:
+            return pd.DataFrame()
+
+        datas = daily[schema.COL_XML_DATE]
+        medidos = daily[daily['measured']].assign(
+            week_start=(datas - pd.to_timedelta(datas.dt.dayofweek, unit='D')).dt.date
+        )
+        if medidos.empty:
+            return pd.DataFrame(columns=[
+                schema.OUT_COL_COORDENADOR, schema.OUT_COL_SEMANA, schema.OUT_COL_PERM_ALUNOS,
+                schema.OUT_COL_PERM_DIAS, schema.OUT_COL_PERM_MEDIA_HORAS,
+                schema.OUT_COL_PERM_ENTRADA_MEDIANA, schema.OUT_COL_PERM_SAIDA_MEDIANA
+            ])
+
+        weekly = medidos.groupby([schema.COL_COORDINATOR, 'week_start'], observed=True).agg(
+            alunos=(schema.COL_STUDENT_KEY, 'nunique'),
+            dias=('dwell_hours', 'size'),
+            media=('dwell_hours', 'mean'),
+            entrada=('entry_seconds', 'median'),
+            saida=('exit_seconds', 'median')
+        ).reset_index()
+
+        return pd.DataFrame({
+            schema.OUT_COL_COORDENADOR: weekly[schema.COL_COORDINATOR],
+            schema.OUT_COL_SEMANA: weekly['week_start'],
+            schema.OUT_COL_PERM_ALUNOS: weekly['alunos'],
+            schema.OUT_COL_PERM_DIAS: weekly['dias'],
+            schema.OUT_COL_PERM_MEDIA_HORAS: weekly['media'].round(2),
+            schema.OUT_COL_PERM_ENTRADA_MEDIANA: self._clock(weekly['entrada']),
+            schema.OUT_COL_PERM_SAIDA_MEDIANA: self._clock(weekly['saida'])
+        })
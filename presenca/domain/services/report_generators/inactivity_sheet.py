@@ -2,22 +2,30 @@ import pandas as pd
 import numpy as np
 import logging
 from datetime import date
-from typing import Dict, Set, Any, List
+from typing import Optional
 import schema
-from ...models.coordinator import Coordinator
+from ...models.tenure_table import TenureTable
+from ....utils.dtype_policy import DtypePolicy
+from ....utils.history_repository import HistoryRepository
 from .inactivity_calculator import InactivityCalculator
 
 log = logging.getLogger(__name__)
 
 class InactivitySheetGenerator:
+    """
+    Aba de inatividade em operações colunares: alunos ativos e data de início
+    saem de uma tabela de jornadas montada uma vez a partir da TenureTable, a
+    justificativa na data de referência é um teste de intervalo sobre as
+    justificativas e o coordenador segue como coluna categórica.
+    """
     
-    def __init__(self, processed_data: dict, config: dict):
+    def __init__(self, processed_data: dict, config: dict, history: Optional[HistoryRepository] = None):
         self.processed_data = processed_data
         self.cadastro = processed_data.get('cadastro', pd.DataFrame())
-        self.tenures = processed_data.get('tenures', {})
+        self.tenures = processed_data.get('tenures') or TenureTable.empty()
         self.justificativas_raw = processed_data.get('justificativas', pd.DataFrame())
         self.config = config
-        self.calculator = InactivityCalculator(processed_data, config)
+        self.calculator = InactivityCalculator(processed_data, config, history)
 
     def generate(self) -> dict:
         log.info("Gerador Inatividade: Iniciando análise...")
@@ -28,144 +36,100 @@ class InactivitySheetGenerator:
         except Exception:
             return {schema.ABA_INATIVIDADE: pd.DataFrame()}
         
-        active_ids = self._get_active_students_ids(start_month, ref_date)
-        if not active_ids:
+        tenure_table = self._tenure_table()
+        active_keys = self._get_active_students_keys(tenure_table, start_month, ref_date)
+        if len(active_keys) == 0:
             return {schema.ABA_INATIVIDADE: pd.DataFrame()}
 
-        justifications_map = self._prepare_justifications_map()
-        df_risk = self._prepare_and_deduplicate_students(active_ids)
+        df_risk = self._prepare_and_deduplicate_students(active_keys, self._get_start_dates(tenure_table))
         df_risk = self.calculator.calculate_last_presence(df_risk, ref_date)
-        df_final = self._classify_and_format(df_risk, justifications_map, ref_date)
+        justified = np.isin(df_risk[schema.COL_STUDENT_KEY].to_numpy(), self._justified_keys(ref_date))
+        df_final = self._classify_and_format(df_risk, justified, ref_date)
         return {schema.ABA_INATIVIDADE: df_final}
 
-    def _prepare_and_deduplicate_students(self, active_ids: List[str]) -> pd.DataFrame:
+    def _tenure_table(self) -> pd.DataFrame:
+        """Jornadas com frequência esperada >= 1, uma linha por jornada."""
+        table = pd.DataFrame({
+            'key': self.tenures.keys_array,
+            'beginning': self.tenures.beginnings,
+            'end': self.tenures.ends,
+            'frequency': self.tenures.frequencies,
+        })
+        return table[table['frequency'] >= 1]
+
+    @staticmethod
+    def _get_active_students_keys(tenure_table: pd.DataFrame, start_date: date, end_date: date) -> np.ndarray:
+        """Alunos com jornada em vigor no fim do mês que começou até ele (e não terminou antes do mês)."""
+        end = np.datetime64(end_date, 'D')
+        open_end = tenure_table['end'].isna()
+        active = (
+            (open_end | (tenure_table['end'] >= end))
+            & (tenure_table['beginning'] <= end)
+            & (open_end | (tenure_table['end'] >= np.datetime64(start_date, 'D')))
+        )
+        return tenure_table.loc[active, 'key'].unique()
+
+    @staticmethod
+    def _get_start_dates(tenure_table: pd.DataFrame) -> pd.Series:
+        """Início da jornada mais recente por chave de aluno."""
+        return tenure_table.groupby('key')['beginning'].max()
+
+    def _prepare_and_deduplicate_students(self, active_keys: np.ndarray, start_dates: pd.Series) -> pd.DataFrame:
         df = self.cadastro[
-            self.cadastro[schema.COL_ID_STONELAB].astype(str).isin(active_ids)
-        ].copy()
+            self.cadastro[schema.COL_STUDENT_KEY].isin(active_keys)
+        ]
 
         col_ativo = getattr(schema, 'CADASTRO_ATIVO', 'Ativo')
         if col_ativo in df.columns:
-            df['ativo_temp'] = pd.to_numeric(df[col_ativo], errors='coerce').fillna(0)
-            df = df[df['ativo_temp'] == 1].copy()
-            df.drop(columns=['ativo_temp'], inplace=True)
+            df = df[pd.to_numeric(df[col_ativo], errors='coerce').fillna(0) == 1]
 
-        df['io_start_date'] = df[schema.COL_ID_STONELAB].astype(str).map(self._get_start_dates_map())
+        df = df.copy()
+        df['io_start_date'] = df[schema.COL_STUDENT_KEY].map(start_dates)
 
-        df.sort_values(by='io_start_date', ascending=False, inplace=True, na_position='last')
+        df = df.sort_values(by='io_start_date', ascending=False, na_position='last', kind='stable')
 
         col_nome = schema.COL_NAME if schema.COL_NAME in df.columns else 'Nome'
         
         if col_nome in df.columns:
-            df['temp_dedup_name'] = df[col_nome].astype(str).str.upper().str.strip()
-            df.drop_duplicates(subset=['temp_dedup_name'], keep='first', inplace=True)
-            df.drop(columns=['temp_dedup_name'], inplace=True)
+            df = df[~df[col_nome].astype(str).str.upper().str.strip().duplicated(keep='first')]
             
         return df
 
-    def _prepare_justifications_map(self) -> Dict[str, Set[date]]:
-        if self.justificativas_raw.empty:
-            return {}
-
-        df_just = self.justificativas_raw.copy()
-        df_just.columns = df_just.columns.str.strip()
-        col_map = {
-            schema.JUSTIFICATIVA_INICIO: schema.COL_START,
-            schema.JUSTIFICATIVA_FIM: schema.COL_END,
-            schema.JUSTIFICATIVA_ID_STONELAB: schema.COL_ID_STONELAB
-        }
-        df_just.rename(columns={k: v for k, v in col_map.items() if k in df_just.columns}, inplace=True)
-
-        required = [schema.COL_START, schema.COL_END, schema.COL_ID_STONELAB]
-        if not all(c in df_just.columns for c in required):
-            return {}
-
-        df_just[schema.COL_START] = pd.to_datetime(df_just[schema.COL_START], errors='coerce').dt.date
-        df_just[schema.COL_END] = pd.to_datetime(df_just[schema.COL_END], errors='coerce').dt.date
-        df_just.dropna(subset=required, inplace=True)
-
-        just_map = {}
-        for row in df_just.itertuples():
-            sid = str(getattr(row, schema.COL_ID_STONELAB))
-            start = getattr(row, schema.COL_START)
-            end = getattr(row, schema.COL_END)
-            if start > end: continue
-            if sid not in just_map: just_map[sid] = set()
-            try:
-                just_map[sid].update(pd.date_range(start, end).date)
-            except: pass
-        return just_map
-
-    def _get_freq_value(self, tenure_obj: Any) -> int:
-        candidates = ['frequency','frequency_1','freq','freq_1','expected_frequency','original_expected_frequency']
-        for attr in candidates:
-            if hasattr(tenure_obj, attr):
-                val = getattr(tenure_obj, attr)
-                try:
-                    return int(float(val))
-                except:
-                    continue
-        return 1 
-
-    def _get_active_students_ids(self, start_date: date, end_date: date) -> List[str]:
-        active_ids = []
-        for sid, tenure_list in self.tenures.items():
-            is_active = False
-            for tenure in tenure_list:
-                if self._get_freq_value(tenure) < 1:
-                    continue
-                if tenure.end and tenure.end < end_date:
-                    continue
-                t_end = tenure.end if tenure.end else date.max
-                if not (tenure.beginning > end_date or t_end < start_date):
-                    is_active = True
-                    break
-            if is_active:
-                active_ids.append(sid)
-        return active_ids
-
-    def _get_start_dates_map(self) -> Dict[str, date]:
-        start_map = {}
-        for sid, tenure_list in self.tenures.items():
-            valid_starts = []
-            for t in tenure_list:
-                if self._get_freq_value(t) >= 1:
-                    valid_starts.append(t.beginning)
-            if valid_starts:
-                start_map[str(sid)] = max(valid_starts)
-        return start_map
-
-    def _classify_and_format(self, df: pd.DataFrame, just_map: Dict[str, Set[date]], 
-                             ref_date: date) -> pd.DataFrame:
-        conditions = [
-            (df[schema.OUT_COL_DIAS_AUSENTE] >= 45),
-            (df[schema.OUT_COL_DIAS_AUSENTE] >= 30),
-            (df[schema.OUT_COL_DIAS_AUSENTE] >= 15),
-            (df[schema.OUT_COL_DIAS_AUSENTE] > 10)
-        ]
+    def _justified_keys(self, ref_date: date) -> np.ndarray:
+        """Chaves de alunos com alguma justificativa cujo intervalo [início, fim] contém ref_date."""
+        if self.justificativas_raw.empty or schema.COL_STUDENT_KEY not in self.justificativas_raw.columns:
+            return np.empty(0, dtype=np.int32)
+
+        df_just = self.justificativas_raw.set_axis(self.justificativas_raw.columns.str.strip(), axis=1)
+        if schema.JUSTIFICATIVA_INICIO not in df_just.columns or schema.JUSTIFICATIVA_FIM not in df_just.columns:
+            return np.empty(0, dtype=np.int32)
+
+        ref = pd.Timestamp(ref_date)
+        inicio = pd.to_datetime(df_just[schema.JUSTIFICATIVA_INICIO], errors='coerce').dt.normalize()
+        fim = pd.to_datetime(df_just[schema.JUSTIFICATIVA_FIM], errors='coerce').dt.normalize()
+        cobre = (inicio <= ref) & (ref <= fim) & df_just[schema.COL_STUDENT_KEY].notna()
+        return df_just.loc[cobre, schema.COL_STUDENT_KEY].unique()
+
+    def _classify_and_format(self, df: pd.DataFrame, justified: np.ndarray, ref_date: date) -> pd.DataFrame:
+        dias = df[schema.OUT_COL_DIAS_AUSENTE]
+        conditions = [(dias >= 45), (dias >= 30), (dias >= 15), (dias > 10)]
         choices = [
             schema.RISCO_3_VERMELHO, schema.RISCO_2_LARANJA,
             schema.RISCO_1_AMARELO, schema.RISCO_PRE_INATIVIDADE
         ]
-        df[schema.OUT_COL_RISCO] = np.select(conditions, choices, default=schema.RISCO_ATIVO)
-        
-        def check_justification(row):
-            current_status = row[schema.OUT_COL_RISCO]
-            if current_status == schema.RISCO_ATIVO: return current_status
-            sid = str(row[schema.COL_ID_STONELAB])
-            if sid in just_map and ref_date in just_map[sid]: return schema.RISCO_JUSTIFICADO
-            return current_status
-
-        df[schema.OUT_COL_RISCO] = df.apply(check_justification, axis=1)
+        em_risco = np.select(conditions, [True] * len(choices), default=False)
+        risco = np.select(conditions, choices, default=schema.RISCO_ATIVO)
+        df[schema.OUT_COL_RISCO] = np.where(em_risco & justified, schema.RISCO_JUSTIFICADO, risco)
+
+        df = DtypePolicy.to_category(df, [schema.OUT_COL_RISCO])
         status_to_hide = [schema.RISCO_ATIVO, schema.RISCO_JUSTIFICADO]
         df_filtered = df[~df[schema.OUT_COL_RISCO].isin(status_to_hide)].copy()
         
         if schema.COL_COORDINATOR in df_filtered.columns:
-            df_filtered[schema.OUT_COL_COORDENADOR] = df_filtered[schema.COL_COORDINATOR].apply(
-                lambda x: x.name if isinstance(x, Coordinator) else str(x)
-            )
+            df_filtered[schema.OUT_COL_COORDENADOR] = df_filtered[schema.COL_COORDINATOR]
 
         cols_map = {schema.COL_NAME: schema.OUT_COL_NOME, schema.COL_FUNCTION: schema.OUT_COL_FUNCAO}
-        df_filtered.rename(columns=cols_map, inplace=True)
+        df_filtered = df_filtered.rename(columns=cols_map)
         
         final_columns = [
             schema.OUT_COL_NOME, schema.OUT_COL_FUNCAO, schema.OUT_COL_COORDENADOR,
@@ -175,7 +139,9 @@ class InactivitySheetGenerator:
         df_final = df_filtered[available_cols].copy()
         df_final[schema.OUT_COL_SEMANA] = ref_date
         
-        if 'io_start_date' in df_final.columns:
-             df_final.drop(columns=['io_start_date'], inplace=True)
+        if schema.OUT_COL_ULTIMA_PRESENCA in df_final.columns:
+            df_final[schema.OUT_COL_ULTIMA_PRESENCA] = pd.to_datetime(
+                df_final[schema.OUT_COL_ULTIMA_PRESENCA], errors='coerce'
+            ).dt.date
 
-        return df_final.sort_values(by=schema.OUT_COL_DIAS_AUSENTE, ascending=False)
\ No newline at end of file
+        return df_final.sort_values(by=schema.OUT_COL_DIAS_AUSENTE, ascending=False, kind='stable')
@@ -0,0 +1,107 @@
+import pandas as pd
+import numpy as np
+import logging
+from typing import Optional
+import schema
+from ....utils.history_repository import HistoryRepository, build_history_repository, normalize_name
+
+log = logging.getLogger(__name__)
+
+class InactivityTrendSheetGenerator:
+    """
+    Transições de nível de risco entre a aba de inatividade desta execução e
+    a foto anterior gravada em ABA_DB_INATIVIDADE.
+
+    Só a partição imediatamente anterior é lida: ela já traz desde quando
+    cada pessoa está no nível, então o tempo no nível é carregado de foto em
+    foto, sem varrer o histórico inteiro. A comparação é um merge por nome
+    normalizado com os níveis convertidos em códigos de gravidade.
+    """
+
+    def __init__(self, inactivity_tab: pd.DataFrame, config: object, history: Optional[HistoryRepository] = None):
+        self.inactivity_tab = inactivity_tab if inactivity_tab is not None else pd.DataFrame()
+        self.config = config
+        self.history = history
+
+    def generate(self) -> dict:
+        log.info("Gerador Transições de Risco: Comparando com a foto anterior...")
+        ref_date = pd.Timestamp(self.config.DATA_FIM_GERAL)
+
+        history = self.history or build_history_repository(self.config)
+        anterior = history.previous_risk_snapshot(ref_date.date())
+        atual = self._current_snapshot()
+
+        tem_historico = anterior is not None
+        if not tem_historico:
+            log.info("Gerador Transições de Risco: Nenhuma foto anterior. Primeira execução do histórico de risco.")
+            anterior = pd.DataFrame(columns=schema.DB_INATIVIDADE_COLUNAS)
+
+        anterior = self._keyed(anterior)
+        anterior = anterior.rename(columns={c: f'{c}_ant' for c in anterior.columns if c != 'nome_norm'})
+        df = atual.merge(anterior, on='nome_norm', how='outer')
+
+        gravidade = self._severity(df[schema.OUT_COL_RISCO])
+        gravidade_ant = self._severity(df[f'{schema.OUT_COL_RISCO}_ant'])
+        mudanca = np.select(
+            [gravidade_ant == 0, gravidade == 0, gravidade > gravidade_ant, gravidade < gravidade_ant],
+            [schema.MUDANCA_NOVO_RISCO, schema.MUDANCA_SAIU_RISCO, schema.MUDANCA_PIOROU, schema.MUDANCA_MELHOROU],
+            default=schema.MUDANCA_MANTEVE
+        )
+        if not tem_historico:
+            mudanca = np.full(len(df), schema.MUDANCA_SEM_HISTORICO, dtype=object)
+
+        desde_ant = pd.to_datetime(df[f'{schema.OUT_COL_NIVEL_DESDE}_ant'], errors='coerce')
+        desde = desde_ant.where((gravidade == gravidade_ant) & desde_ant.notna(), ref_date)
+
+        trend = pd.DataFrame({
+            schema.OUT_COL_NOME: df[schema.OUT_COL_NOME].fillna(df[f'{schema.OUT_COL_NOME}_ant']),
+            schema.OUT_COL_COORDENADOR: df[schema.OUT_COL_COORDENADOR].fillna(df[f'{schema.OUT_COL_COORDENADOR}_ant']),
+            schema.OUT_COL_RISCO_ANTERIOR: df[f'{schema.OUT_COL_RISCO}_ant'].fillna(
+                schema.RISCO_ATIVO if tem_historico else ''),
+            schema.OUT_COL_RISCO: df[schema.OUT_COL_RISCO].fillna(schema.RISCO_ATIVO),
+            schema.OUT_COL_MUDANCA_RISCO: mudanca,
+            schema.OUT_COL_NIVEL_DESDE: desde.dt.date,
+            schema.OUT_COL_DIAS_NO_NIVEL: (ref_date - desde).dt.days,
+            schema.OUT_COL_DIAS_AUSENTE: pd.to_numeric(df[schema.OUT_COL_DIAS_AUSENTE], errors='coerce').astype('Int64'),
+            schema.OUT_COL_SEMANA: ref_date.date(),
+        })
+        trend = trend.sort_values(
+            by=[schema.OUT_COL_MUDANCA_RISCO, schema.OUT_COL_DIAS_AUSENTE], ascending=[True, False], kind='stable'
+        ).reset_index(drop=True)
+
+        contagem = trend[schema.OUT_COL_MUDANCA_RISCO].value_counts().to_dict()
+        log.info(f"Gerador Transições de Risco: {contagem}")
+        return {schema.ABA_TRANSICOES_INATIVIDADE: trend}
+
+    @staticmethod
+    def snapshot(trend: pd.DataFrame) -> pd.DataFrame:
+        """Foto desta execução para ABA_DB_INATIVIDADE: quem segue em risco, com o início do nível atual."""
+        if trend is None or trend.empty:
+            return pd.DataFrame(columns=schema.DB_INATIVIDADE_COLUNAS)
+        em_risco = trend[trend[schema.OUT_COL_RISCO].isin(schema.NIVEIS_RISCO)]
+        return em_risco[schema.DB_INATIVIDADE_COLUNAS].reset_index(drop=True)
+
+    def _current_snapshot(self) -> pd.DataFrame:
+        tab = self.inactivity_tab
+        if tab.empty or schema.OUT_COL_NOME not in tab.columns:
+            return self._keyed(pd.DataFrame(columns=schema.DB_INATIVIDADE_COLUNAS)).drop(
+                columns=[schema.OUT_COL_NIVEL_DESDE])
+        em_risco = tab[tab[schema.OUT_COL_RISCO].astype(str).isin(schema.NIVEIS_RISCO)]
+        return self._keyed(pd.DataFrame({
+            schema.OUT_COL_NOME: em_risco[schema.OUT_COL_NOME].astype(str),
+            schema.OUT_COL_COORDENADOR: em_risco.get(schema.OUT_COL_COORDENADOR, pd.Series(index=em_risco.index)).astype(object),
+            schema.OUT_COL_RISCO: em_risco[schema.OUT_COL_RISCO].astype(str),
+            schema.OUT_COL_DIAS_AUSENTE: em_risco[schema.OUT_COL_DIAS_AUSENTE],
+        }))
+
+    @staticmethod
+    def _keyed(snapshot: pd.DataFrame) -> pd.DataFrame:
+        """Foto sem a coluna Semana, com o nome normalizado como chave (uma linha por nome)."""
+        df = snapshot.drop(columns=[schema.OUT_COL_SEMANA], errors='ignore')
+        df = df.assign(nome_norm=normalize_name(df[schema.OUT_COL_NOME]) if len(df) else pd.Series(dtype=object))
+        return df.drop_duplicates('nome_norm')
+
+    @staticmethod
+    def _severity(niveis: pd.Series) -> np.ndarray:
+        """0 para fora de risco; 1..4 do Risco Inicial ao Vermelho."""
+        return pd.Categorical(niveis, categories=schema.NIVEIS_RISCO).codes.astype(np.int64) + 1
@@ -1,50 +1,36 @@
 import pandas as pd
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 from datetime import date, datetime
 import schema
-from ...models.coordinator import Coordinator
+from ..attainment_rollup import AttainmentRollup
 
 log = logging.getLogger(__name__)
 
 class KpiSheetGenerator:
     
-    def __init__(self, report_kpi: pd.DataFrame):
+    def __init__(self, report_kpi: pd.DataFrame, rollup: Optional[AttainmentRollup] = None):
         self.report_kpi = report_kpi
-
-    def generate(self) -> Dict[str, pd.DataFrame]:
-        report_raw_output = self._prepare_report_raw_output()
-        gpb = self._calculate_base_metrics()
-        
-        if gpb.empty:
-            return {
-                schema.ABA_REPORT_RAW: report_raw_output,
-                schema.ABA_KPI_GERAL: pd.DataFrame()
-            }
-
-        kpi_geral = self._generate_kpi_geral(gpb)
-        
-        return {
-            schema.ABA_REPORT_RAW: report_raw_output,
-            schema.ABA_KPI_GERAL: kpi_geral
+        self._rollup = rollup
+
+    @property
+    def rollup(self) -> AttainmentRollup:
+        # Só o kpi_geral usa o rollup; o report_raw sozinho não paga a agregação.
+        if self._rollup is None:
+            self._rollup = AttainmentRollup(self.report_kpi)
+        return self._rollup
+
+    def generate(self, tabs: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        builders = {
+            schema.ABA_REPORT_RAW: self._prepare_report_raw_output,
+            schema.ABA_KPI_GERAL: self._calculate_base_metrics
         }
+        return {tab: build() for tab, build in builders.items() if tabs is None or tab in tabs}
 
     def _prepare_report_raw_output(self) -> pd.DataFrame:
         if self.report_kpi.empty:
             return pd.DataFrame()
             
-        report_output = self.report_kpi.copy()
-        
-        if schema.COL_COORDINATOR in report_output.columns:
-            def clean_coord_name(x):
-                if hasattr(x, 'name'): return x.name
-                s = str(x)
-                if "Coordinator(name=" in s:
-                    return s.replace("Coordinator(name='", "").replace("')", "").replace('Coordinator(name="', '').replace('")', '')
-                return s
-
-            report_output[schema.COL_COORDINATOR] = report_output[schema.COL_COORDINATOR].apply(clean_coord_name)
-
         column_map = {
             schema.COL_ID_STONELAB: schema.COL_ID_STONELAB,
             schema.COL_NAME: schema.OUT_COL_NOME,
@@ -59,11 +45,9 @@ class KpiSheetGenerator:
             schema.OUT_COL_SITUACAO: schema.OUT_COL_SITUACAO
         }
         
-        cols_to_keep = [col for col in column_map.keys() if col in report_output.columns]
-        report_output = report_output[cols_to_keep]
-        report_output.rename(columns=column_map, inplace=True)
-        
-        return report_output
+        cols_to_keep = [col for col in column_map.keys() if col in self.report_kpi.columns]
+        comparacoes = [col for col in self.report_kpi.columns if str(col).startswith(f"{schema.OUT_COL_SITUACAO} (")]
+        return self.report_kpi[cols_to_keep + comparacoes].rename(columns=column_map)
 
     def _calculate_base_metrics(self) -> pd.DataFrame:
         if self.report_kpi.empty:
@@ -72,31 +56,4 @@ class KpiSheetGenerator:
         if schema.OUT_COL_SITUACAO not in self.report_kpi.columns:
             return pd.DataFrame()
 
-        df = self.report_kpi[
-            self.report_kpi[schema.OUT_COL_SITUACAO].str.strip() != schema.STATUS_JUSTIFICADO
-        ].copy()
-        
-        if df.empty:
-            return pd.DataFrame()
-
-        df["Atingimento_Bin"] = df[schema.OUT_COL_SITUACAO].map(
-            lambda x: 1 if x == schema.STATUS_ATINGIU else 0
-        )
-        
-        gpb = df.groupby(by=[schema.COL_DATE]).agg(
-            total_de_alunos=(schema.COL_ID_STONELAB, "count"),
-            atingidos=("Atingimento_Bin", "sum")
-        ).reset_index()
-        
-        return gpb
-
-    def _generate_kpi_geral(self, gpb: pd.DataFrame) -> pd.DataFrame:
-        kpi_geral = gpb.copy()
-        kpi_geral["KPI_Presenca"] = 0.0
-        
-        mask = kpi_geral["total_de_alunos"] > 0
-        kpi_geral.loc[mask, "KPI_Presenca"] = (
-            kpi_geral.loc[mask, "atingidos"] / kpi_geral.loc[mask, "total_de_alunos"]
-        ).round(2)
-        
-        return kpi_geral
\ No newline at end of file
+        return self.rollup.by_week()
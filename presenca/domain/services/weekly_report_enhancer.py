@@ -1,71 +1,49 @@
 import pandas as pd
 import numpy as np
 import schema
+from typing import Optional
 from ..models.tenure import Tenure
+from ..models.presence_cube import PresenceCube
 
 class WeeklyReportEnhancer:
     
     def enhance(self, base_report: pd.DataFrame, attendance: pd.DataFrame, 
                 student_info: pd.DataFrame, holidays_df: pd.DataFrame, 
-                justifications_df: pd.DataFrame, tenures: dict) -> pd.DataFrame:
+                justifications_df: pd.DataFrame, tenures: dict,
+                presence_cube: Optional[PresenceCube] = None) -> pd.DataFrame:
         
-        report = base_report.copy()
-        
-        if schema.COL_ID_STONELAB in report.columns:
-            report[schema.COL_ID_STONELAB] = report[schema.COL_ID_STONELAB].astype(str).str.strip()
-            
-        if schema.COL_ID_STONELAB in attendance.columns:
-            attendance[schema.COL_ID_STONELAB] = attendance[schema.COL_ID_STONELAB].astype(str).str.strip()
+        report = base_report.copy(deep=False)
+
+        if presence_cube is None:
+            presence_cube = self._cube_from_attendance(attendance)
 
-        report = self._add_observed_frequency(report, attendance)
+        report = self._add_observed_frequency(report, presence_cube)
         report = self._add_workdays_and_holidays(report, holidays_df)
         report = self._add_justifications(report, justifications_df)
         
         return report
 
-    def _add_observed_frequency(self, report: pd.DataFrame, attendance: pd.DataFrame) -> pd.DataFrame:
-        if attendance.empty:
-            report['observed_frequency'] = 0
-            return report
-
-        if 'Datetime' in attendance.columns:
-            attendance.rename(columns={'Datetime': schema.COL_DATE}, inplace=True)
-        elif 'Date' in attendance.columns:
-            attendance.rename(columns={'Date': schema.COL_DATE}, inplace=True)
-
-        if schema.COL_DATE not in attendance.columns:
-            report['observed_frequency'] = 0
-            return report
-
-        attendance[schema.COL_DATE] = pd.to_datetime(attendance[schema.COL_DATE], errors='coerce')
+    @staticmethod
+    def _cube_from_attendance(attendance: pd.DataFrame) -> PresenceCube:
+        if attendance.empty or schema.COL_STUDENT_KEY not in attendance.columns:
+            return PresenceCube.empty()
+
+        for col_date in ('Datetime', 'Date', schema.COL_DATE):
+            if col_date in attendance.columns:
+                dates = pd.to_datetime(attendance[col_date], errors='coerce')
+                return PresenceCube.from_punches(
+                    attendance[schema.COL_STUDENT_KEY].to_numpy(),
+                    dates.to_numpy(dtype='datetime64[D]')
+                )
+        return PresenceCube.empty()
+
+    def _add_observed_frequency(self, report: pd.DataFrame, presence_cube: PresenceCube) -> pd.DataFrame:
+        """Dias com presença na semana (segunda a domingo) de cada linha do relatório."""
         report[schema.COL_DATE] = pd.to_datetime(report[schema.COL_DATE], errors='coerce')
-
-        week_map = report[[schema.COL_DATE]].drop_duplicates().sort_values(schema.COL_DATE)
-        week_map['week_end'] = week_map[schema.COL_DATE] + pd.Timedelta(days=6)
-        
-        def get_week_start(date_val):
-            for _, row in week_map.iterrows():
-                if row[schema.COL_DATE] <= date_val <= row['week_end']:
-                    return row[schema.COL_DATE]
-            return pd.NaT
-
-        attendance['week_start'] = attendance[schema.COL_DATE].apply(get_week_start)
-        
-        freq_final = attendance.groupby([schema.COL_ID_STONELAB, 'week_start']).size().reset_index(name='observed_frequency')
-        
-        report = pd.merge(
-            report, 
-            freq_final, 
-            left_on=[schema.COL_ID_STONELAB, schema.COL_DATE],
-            right_on=[schema.COL_ID_STONELAB, 'week_start'],
-            how='left'
-        )
-        
-        report['observed_frequency'] = report['observed_frequency'].fillna(0).astype(int)
-        
-        if 'week_start' in report.columns:
-            report.drop(columns=['week_start'], inplace=True)
-            
+        report['observed_frequency'] = presence_cube.days_present(
+            report[schema.COL_STUDENT_KEY].to_numpy(),
+            report[schema.COL_DATE].to_numpy(dtype='datetime64[D]')
+        ).astype(int)
         return report
 
     def _add_workdays_and_holidays(self, report: pd.DataFrame, holidays_df: pd.DataFrame) -> pd.DataFrame:
@@ -96,20 +74,18 @@ class WeeklyReportEnhancer:
         if just_df.empty:
             return report
 
-        just_df = just_df.copy()
-        if schema.COL_ID_STONELAB in just_df.columns:
-             just_df[schema.COL_ID_STONELAB] = just_df[schema.COL_ID_STONELAB].astype(str).str.strip()
+        if schema.COL_STUDENT_KEY not in just_df.columns:
+            return report
         
         just_map = {}
         col_start = schema.JUSTIFICATIVA_INICIO if schema.JUSTIFICATIVA_INICIO in just_df.columns else schema.COL_START
         col_end = schema.JUSTIFICATIVA_FIM if schema.JUSTIFICATIVA_FIM in just_df.columns else schema.COL_END
-        col_id = schema.JUSTIFICATIVA_ID_STONELAB if schema.JUSTIFICATIVA_ID_STONELAB in just_df.columns else schema.COL_ID_STONELAB
 
-        for row in just_df.itertuples():
+        for row in just_df[[schema.COL_STUDENT_KEY, col_start, col_end]].itertuples(index=False, name=None):
             try:
-                sid = str(getattr(row, col_id)).strip()
-                s_date = pd.to_datetime(getattr(row, col_start), dayfirst=True, errors='coerce')
-                e_date = pd.to_datetime(getattr(row, col_end), dayfirst=True, errors='coerce')
+                sid, raw_start, raw_end = row
+                s_date = pd.to_datetime(raw_start, dayfirst=True, errors='coerce')
+                e_date = pd.to_datetime(raw_end, dayfirst=True, errors='coerce')
                 
                 if pd.isna(s_date) or pd.isna(e_date): continue
                 
@@ -118,7 +94,7 @@ class WeeklyReportEnhancer:
             except: continue
 
         def count_justified(row):
-            sid = str(row[schema.COL_ID_STONELAB]).strip()
+            sid = row[schema.COL_STUDENT_KEY]
             if sid not in just_map: return 0
             
             week_start = row[schema.COL_DATE].date()
@@ -1,174 +1,279 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from .run_config import RunConfig
+from .tab_plan import TabPlan
 from .utils.data_reader import DataReader
 from .utils.data_writer import DataWriter
-from .domain.factory import TenureFactory
+from .utils.async_io import IoOrchestrator
+from .utils.data_quality import DataQualityReport, InputValidator
+from .utils.history_repository import HistoryRepository, build_history_repository, ids_last_seen
+from .utils.dtype_policy import DtypePolicy
+from .utils.punch_archive import build_punch_archive
+from .utils.student_keys import StudentKeyRegistry
+from .utils.name_vocabulary import NameVocabulary
+from .utils.stage_metrics import StageMetrics
+from .domain.factory import TenureFactory, TenureProvider
+from .domain.models.processed_data import ProcessedData
 from .domain.services.AttendanceTransformer import AttendanceTransformer
 from .domain.services.base_report_builder import BaseReportBuilder
 from .domain.services.weekly_report_enhancer import WeeklyReportEnhancer
 from .domain.services.kpi_calculator_padrao import KpiCalculatorPadrao
+from .domain.services.attainment_rollup import AttainmentRollup
 from .domain.services.report_generators.action_sheets import ActionSheetGenerator
 from .domain.services.report_generators.summary_sheet import SummarySheetGenerator
 from .domain.services.report_generators.kpi_sheets import KpiSheetGenerator
 from .domain.services.report_generators.inactivity_sheet import InactivitySheetGenerator
+from .domain.services.report_generators.inactivity_trend_sheet import InactivityTrendSheetGenerator
+from .domain.services.report_generators.dwell_time_sheet import DwellTimeSheetGenerator
 from .domain.services.report_generators.biometry_cleanup_sheet import BiometryCleanupSheetGenerator
 from .domain.services.report_generators.unified_pivot_sheet import UnifiedPivotSheetGenerator 
 from .domain.services.report_generators.debtors_sheet import DebtorsSheetGenerator
 import pandas as pd
-import calendar
-from datetime import datetime
 import schema
 
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
 log = logging.getLogger(__name__)
 
+
 class PresencePipeline:
     
-    def __init__(self, data_reader: DataReader, data_writer: DataWriter, config: object):
+    def __init__(self, data_reader: DataReader, data_writer: DataWriter, config: object, copy_on_write: bool = True):
         self.data_reader = data_reader
         self.data_writer = data_writer
-        self.config = config
-        self.tenure_factory = TenureFactory()
+        self.config = RunConfig.from_settings(config)
+        self.tab_plan = TabPlan(self.config.only_tabs)
+        self._history: HistoryRepository = None
+        self.key_registry = StudentKeyRegistry()
+        self.name_vocabulary = NameVocabulary()
+        self.metrics = StageMetrics()
+        self.tenure_factory = TenureFactory(self.key_registry)
+        self.tenure_provider = TenureProvider(self.tenure_factory, self.metrics)
+        self.dtype_policy = DtypePolicy()
+        self.copy_on_write = copy_on_write
         log.info("Pipeline de Presença: Iniciando execução.")
 
-    def run(self, dados_input: Dict[str, Any] = None) -> str:
+    def run(self, dados_input: Dict[str, Any] = None, quality_report: DataQualityReport = None) -> str:
+        # As etapas recebem DataFrames compartilhados e devolvem novos; com copy-on-write,
+        # filtros e renomeações só copiam dados quando alguém escreve. A opção vale só
+        # durante a execução, sem mudar o pandas de quem importa o módulo.
+        with pd.option_context('mode.copy_on_write', self.copy_on_write):
+            return self._run(dados_input, quality_report)
+
+    def _run(self, dados_input: Dict[str, Any], quality_report: Optional[DataQualityReport]) -> str:
         try:
-            try:
-                ano = self.config.ANO_DO_RELATORIO
-                mes = self.config.MES_DO_RELATORIO
-                data_inicio = datetime(ano, mes, 1).date()
-                _, ultimo_dia = calendar.monthrange(ano, mes)
-                data_fim = datetime(ano, mes, ultimo_dia).date()
-                
-                self.config.DATA_INICIO_GERAL = data_inicio.strftime('%Y-%m-%d')
-                self.config.DATA_FIM_GERAL = data_fim.strftime('%Y-%m-%d')
-            except Exception as e:
-                log.error(f"Falha ao calcular datas do relatório: {e}")
-                raise
+            log.info(f"Pipeline: Período {self.config.DATA_INICIO_GERAL} a {self.config.DATA_FIM_GERAL}.")
 
             if dados_input:
                 log.info("Pipeline: Usando dados já carregados (Validação). Pulei o download.")
                 all_data = dados_input
             else:
                 log.info("Leitura: Carregando fontes de dados (XMLs e Planilhas)...")
-                all_data = self.data_reader.load_all_sources()
-            
-            log.info("Processamento: Limpando e preparando dados brutos...")
-            tenures = self.tenure_factory.create_tenures_from_df(all_data['io_alunos'])
-            
-            processor_service = AttendanceTransformer(all_data, self.config)
-            processed_data = processor_service.run()
-            processed_data['justificativas'] = all_data['justificativas']
+                with self.metrics.stage('leitura'):
+                    all_data = self.data_reader.load_all_sources()
 
-            log.info("Construção: Gerando relatório base semanal...")
-            
-            df_cadastro_completo = processed_data['cadastro']
-            
-            ids_com_contrato = list(tenures.keys())
-            
-            if ids_com_contrato:
-                df_cadastro_completo[schema.COL_ID_STONELAB] = df_cadastro_completo[schema.COL_ID_STONELAB].astype(str).str.strip()
-                ids_com_contrato = [str(i).strip() for i in ids_com_contrato]
-                
-                df_alunos_ativos_para_relatorio = df_cadastro_completo[
-                    df_cadastro_completo[schema.COL_ID_STONELAB].isin(ids_com_contrato)
-                ].copy()
-                
-                log.info(f"Pipeline: Selecionados {len(df_alunos_ativos_para_relatorio)} alunos com contrato ativo para o relatório.")
-            else:
-                log.warning("Nenhum contrato (Tenure) encontrado. O relatório base estará vazio.")
-                df_alunos_ativos_para_relatorio = pd.DataFrame(columns=df_cadastro_completo.columns)
-            
-            base_builder = BaseReportBuilder(self.config)
-            base_report = base_builder.build(
-                active_students=df_alunos_ativos_para_relatorio,
-                tenures=tenures
-            )
+            # Antes da normalização de tipos: o relatório descreve as fontes como chegaram.
+            if quality_report is None:
+                with self.metrics.stage('validacao'):
+                    quality_report = InputValidator().validate(all_data)
 
-            enhancer = WeeklyReportEnhancer()
-            weekly_report = enhancer.enhance(
-                base_report=base_report,
-                attendance=processed_data['registros_final'],
-                student_info=processed_data['cadastro'],
-                holidays_df=processed_data['feriados'],
-                justifications_df=processed_data['justificativas'], 
-                tenures=tenures
-            )
-            
-            calculator = KpiCalculatorPadrao(weekly_report, processed_data, self.config)
-            report_with_kpis = calculator.calculate()
-            
-            log.info("Cálculo de KPI: Status de atingimento concluído.")
-            log.info("Geração de Abas: Formatando relatórios de saída...")
-            
-            action_gen = ActionSheetGenerator(processed_data, self.config)
+            all_data = self.dtype_policy.apply_to_sources(all_data)
+            all_data = self.key_registry.apply_to_sources(all_data)
+            all_data = self.name_vocabulary.apply_to_sources(all_data)
+            # Batidas como lidas dos XMLs, antes da limpeza: é o que vai para o arquivo de batidas.
+            registros_lidos = all_data.get('registros_brutos')
             
-            summary_gen = SummarySheetGenerator(report_with_kpis, self.config)
-            summary_tabs = summary_gen.generate()
+            plan = self.tab_plan
+            log.info(f"Plano de Abas: etapas {plan.stages}.")
 
-            pivot_gen = UnifiedPivotSheetGenerator(report_with_kpis, summary_tabs)
-            pivot_tabs = pivot_gen.generate()
+            log.info("Processamento: Limpando e preparando dados brutos...")
+            with self.metrics.stage('processamento'):
+                # O transformer pede as mesmas jornadas ao provider compartilhado e recebe esta tabela.
+                tenures = self.tenure_provider.get(all_data['io_alunos'])
+                log.info(f"Processamento: {len(tenures)} jornadas lidas do IO.")
+                processor_service = AttendanceTransformer(all_data, self.config, self.tenure_provider,
+                                                          daily_spans=plan.needs('dwell'))
+                processed_data = ProcessedData(self.dtype_policy.apply_to_processed(processor_service.run()))
 
-            debtors_gen = DebtorsSheetGenerator(summary_tabs)
-            debtors_tabs = debtors_gen.generate()
+            report_with_kpis = pd.DataFrame()
+            if plan.needs('base'):
+                weekly_report = self._build_weekly_report(processed_data)
 
-            kpi_gen = KpiSheetGenerator(report_with_kpis)
-            inactivity_gen = InactivitySheetGenerator(processed_data, self.config)
-            cleanup_gen = BiometryCleanupSheetGenerator(processed_data, self.config)
+            if plan.needs('kpi'):
+                calculator = KpiCalculatorPadrao(weekly_report, processed_data, self.config)
+                report_with_kpis = self.dtype_policy.apply_to_report(calculator.calculate())
+                log.info("Cálculo de KPI: Status de atingimento concluído.")
 
-            alunos_na_base = report_with_kpis[schema.COL_NAME].nunique()
-            alunos_no_resumo = summary_tabs[schema.ABA_RESUMO_POR_ALUNO]['Nome do Aluno'].nunique()
-            
-            if alunos_na_base == alunos_no_resumo:
-                log.info(f"✅ AUDITORIA OK: Todos os {alunos_na_base} alunos foram mapeados nos relatórios finais. Ninguém se perdeu.")
-            else:
-                log.error(f"❌ ALERTA DE PERDA DE DADOS: Temos {alunos_na_base} alunos na base, mas apenas {alunos_no_resumo} no resumo!")
+            log.info("Geração de Abas: Formatando relatórios de saída...")
+            rollup = AttainmentRollup(report_with_kpis) if plan.needs('rollup') else None
+
+            # Cada etapa de aba é montada só se o plano pedir; 'debtors' reaproveita o resumo.
+            stage_tabs: Dict[str, Dict[str, pd.DataFrame]] = {}
+            builders = {
+                'summary': lambda: SummarySheetGenerator(report_with_kpis, self.config, rollup).generate(),
+                'pivot': lambda: UnifiedPivotSheetGenerator(report_with_kpis, rollup).generate(),
+                'debtors': lambda: DebtorsSheetGenerator(stage_tabs['summary']).generate(),
+                'report_raw': lambda: KpiSheetGenerator(report_with_kpis, rollup).generate([schema.ABA_REPORT_RAW]),
+                'kpi_geral': lambda: KpiSheetGenerator(report_with_kpis, rollup).generate([schema.ABA_KPI_GERAL]),
+                'dwell': lambda: DwellTimeSheetGenerator(processed_data, self.config).generate(),
+                'actions': lambda: ActionSheetGenerator(processed_data, self.config).generate([schema.ABA_ACOES_CADASTRO]),
+                'raw_data': lambda: ActionSheetGenerator(processed_data, self.config).generate(
+                    [schema.ABA_XML_EXPORT, schema.ABA_RAW_PRESENCE, schema.ABA_IGNORAR]),
+                'inactivity': lambda: InactivitySheetGenerator(processed_data, self.config, self.history).generate(),
+                'inactivity_trend': lambda: InactivityTrendSheetGenerator(
+                    stage_tabs['inactivity'].get(schema.ABA_INATIVIDADE), self.config, self.history).generate(),
+                'cleanup': lambda: BiometryCleanupSheetGenerator(processed_data, self.config, self.history).generate(),
+                'quality': lambda: {schema.ABA_QUALIDADE_DADOS: quality_report.to_frame()},
+            }
+            for stage in ['summary'] + plan.stages:
+                if stage in builders and plan.needs(stage) and stage not in stage_tabs:
+                    stage_tabs[stage] = builders[stage]()
+
+            if 'summary' in stage_tabs:
+                self._audit_summary(report_with_kpis, stage_tabs['summary'])
 
+            # Ordem do relatório: gestão e ação, base analítica e KPIs, listas de controle no final.
             final_tabs = {}
-            
-            # 1. Visão de Gestão e Ação 
-            final_tabs.update(pivot_tabs)      
-            final_tabs.update(debtors_tabs)    
-            final_tabs.update(summary_tabs)    
-            
-            # 2. Base Analítica Tratada e KPIs 
-            final_tabs.update(kpi_gen.generate()) 
-            
-            # 3. Listas de Controle, Limpeza e Dados Sem Tratamento (Ficam no final)
-            final_tabs.update(action_gen.generate())     
-            final_tabs.update(inactivity_gen.generate()) 
-            final_tabs.update(cleanup_gen.generate())    
+            for stage in plan.stages:
+                final_tabs.update(stage_tabs.get(stage, {}))
             
             log.info(f"Geração de Abas: {len(final_tabs)} abas criadas e ordenadas.")
-            log.info("Escrita 1/2: Salvando Relatório Mensal (Histórico)...")
-            output_file_path = self.data_writer.save_report_to_excel(
-                report_tabs=final_tabs,
-                base_filename="relatorio_presenca_stonelab"
-            )
-            
             db_master_id = getattr(self.config, 'ID_PLANILHA_MESTRA', None)
             if not db_master_id:
                 path_key = 'local' if self.config.MODO_EXECUCAO == 'local' else 'colab'
                 db_master_id = self.config.CAMINHOS.get(path_key, {}).get('ID_PLANILHA_MESTRA')
 
-            if db_master_id or self.config.MODO_EXECUCAO == 'local':
-                log.info("Escritor 2/2: Atualizando Banco de Dados Mestre (Dashboard)...")
-                
-                if schema.ABA_REPORT_RAW in final_tabs:
-                    self.data_writer.update_master_database(
-                        final_tabs[schema.ABA_REPORT_RAW], 
-                        db_master_id if db_master_id else "", 
-                        schema.ABA_DB_HISTORICO
-                    )
+            # Upload do Excel e atualização da base mestra são independentes: no modo
+            # colab rodam em paralelo; no local, em sequência como sempre.
+            escritas = {}
+            if plan.write_excel:
+                report_tabs = plan.select(final_tabs)
+                escritas['excel'] = lambda: self._save_report(report_tabs)
+            else:
+                log.info("Escrita 1/2: Nenhuma aba do Excel pedida. Pulando renderização do relatório.")
+
+            if not plan.update_dashboard:
+                log.info("Escritor 2/2: report_raw não pedido neste plano. Base histórica não atualizada.")
+            elif db_master_id or self.config.MODO_EXECUCAO == 'local':
+                escritas['dashboard'] = lambda: self._update_dashboard(final_tabs, stage_tabs, processed_data, db_master_id, registros_lidos)
             else:
                 log.info("Config 'ID_PLANILHA_MESTRA' não encontrada em nenhum lugar. Pulando atualização do Dashboard.")
+
+            with self.metrics.stage('escrita'):
+                resultados = self.io.gather(escritas)
+            output_file_path = resultados.get('excel', "")
+            db_destino = resultados.get('dashboard', "")
+
+            self.data_writer.save_presence_cube(processed_data['presence_cube'], processed_data.get('student_keys'))
+            self.data_writer.save_quality_report(quality_report)
             
+            self.metrics.log_summary()
             log.info("Sucesso: Pipeline concluído.")
-            log.info(f"Arquivo final salvo em: {output_file_path}")
-            
-            return output_file_path
+            if plan.write_excel:
+                log.info(f"Arquivo final salvo em: {output_file_path}")
+                return output_file_path
+
+            log.info(f"Base histórica atualizada em: {db_destino}")
+            return db_destino or ""
 
         except Exception as e:
             log.error(f"Falha no Pipeline: {e}", exc_info=True)
-            return ""
\ No newline at end of file
+            return ""
+
+    @property
+    def io(self) -> IoOrchestrator:
+        """Orquestrador das escritas em nuvem; no modo local, sequencial."""
+        limite = self.config.io_concurrency if self.config.MODO_EXECUCAO != 'local' else 1
+        return IoOrchestrator(limite)
+
+    def _save_report(self, report_tabs: Dict[str, pd.DataFrame]) -> str:
+        log.info("Escrita 1/2: Salvando Relatório Mensal (Histórico)...")
+        return self.data_writer.save_report_to_excel(
+            report_tabs=report_tabs,
+            base_filename="relatorio_presenca_stonelab"
+        )
+
+    def _update_dashboard(self, final_tabs: Dict[str, pd.DataFrame], stage_tabs: Dict[str, Dict[str, pd.DataFrame]],
+                          processed_data: ProcessedData, db_master_id: str, registros_lidos: pd.DataFrame) -> str:
+        """Base mestra (report_raw), histórico local, arquivo de batidas e foto de risco. Retorna o destino da base mestra."""
+        log.info("Escritor 2/2: Atualizando Banco de Dados Mestre (Dashboard)...")
+        db_destino = ""
+        if schema.ABA_REPORT_RAW in final_tabs:
+            db_destino = self.data_writer.update_master_database(
+                final_tabs[schema.ABA_REPORT_RAW],
+                db_master_id if db_master_id else "",
+                schema.ABA_DB_HISTORICO
+            )
+            self.history.record_report(final_tabs[schema.ABA_REPORT_RAW])
+            self.history.record_daily_presence(processed_data.get('registros_brutos'))
+            arquivo = build_punch_archive(self.config)
+            if arquivo is not None:
+                arquivo.append_month(registros_lidos, self.config.data_inicio)
+            self.history.update_last_seen(
+                pd.Timestamp(self.config.DATA_FIM_GERAL).date(),
+                ids_last_seen(processed_data.get('presence_cube'), processed_data.get('student_keys'),
+                              final_tabs[schema.ABA_REPORT_RAW]),
+                processed_data.get('registros_brutos'),
+                final_tabs[schema.ABA_REPORT_RAW],
+            )
+        if 'inactivity_trend' in stage_tabs:
+            self._record_risk_snapshot(stage_tabs['inactivity_trend'][schema.ABA_TRANSICOES_INATIVIDADE],
+                                       db_master_id)
+        return db_destino
+
+    @property
+    def history(self) -> HistoryRepository:
+        """Repositório do histórico, aberto só quando alguma etapa precisa dele."""
+        if self._history is None:
+            self._history = build_history_repository(self.config)
+        return self._history
+
+    def _record_risk_snapshot(self, trend: pd.DataFrame, db_master_id: str):
+        """Foto de risco da execução: partição no histórico e, fora do modo local, aba ABA_DB_INATIVIDADE da planilha mestra."""
+        snapshot = InactivityTrendSheetGenerator.snapshot(trend)
+        self.history.record_risk_snapshot(snapshot, pd.Timestamp(self.config.DATA_FIM_GERAL).date())
+        if self.config.MODO_EXECUCAO != 'local' and db_master_id and not snapshot.empty:
+            self.data_writer.update_master_database(snapshot, db_master_id, schema.ABA_DB_INATIVIDADE)
+
+    def _build_weekly_report(self, processed_data: ProcessedData) -> pd.DataFrame:
+        log.info("Construção: Gerando relatório base semanal...")
+        tenures = processed_data['tenures']
+        df_cadastro_completo = processed_data['cadastro']
+        
+        if len(tenures) > 0:
+            df_alunos_ativos_para_relatorio = df_cadastro_completo[
+                df_cadastro_completo[schema.COL_STUDENT_KEY].isin(tenures.student_keys)
+            ]
+            
+            log.info(f"Pipeline: Selecionados {len(df_alunos_ativos_para_relatorio)} alunos com contrato ativo para o relatório.")
+        else:
+            log.warning("Nenhum contrato (Tenure) encontrado. O relatório base estará vazio.")
+            df_alunos_ativos_para_relatorio = pd.DataFrame(columns=df_cadastro_completo.columns)
+        
+        base_builder = BaseReportBuilder(self.config)
+        base_report = base_builder.build(
+            active_students=df_alunos_ativos_para_relatorio,
+            tenures=tenures
+        )
+        base_report = self.dtype_policy.apply_to_report(base_report)
+
+        enhancer = WeeklyReportEnhancer()
+        return enhancer.enhance(
+            base_report=base_report,
+            attendance=processed_data['registros_final'],
+            student_info=processed_data['cadastro'],
+            holidays_df=processed_data['feriados'],
+            justifications_df=processed_data['justificativas'], 
+            tenures=tenures,
+            presence_cube=processed_data['presence_cube']
+        )
+
+    @staticmethod
+    def _audit_summary(report_with_kpis: pd.DataFrame, summary_tabs: Dict[str, pd.DataFrame]):
+        alunos_na_base = report_with_kpis[schema.COL_NAME].nunique()
+        alunos_no_resumo = summary_tabs[schema.ABA_RESUMO_POR_ALUNO]['Nome do Aluno'].nunique()
+        
+        if alunos_na_base == alunos_no_resumo:
+            log.info(f"✅ AUDITORIA OK: Todos os {alunos_na_base} alunos foram mapeados nos relatórios finais. Ninguém se perdeu.")
+        else:
+            log.error(f"❌ ALERTA DE PERDA DE DADOS: Temos {alunos_na_base} alunos na base, mas apenas {alunos_no_resumo} no resumo!")
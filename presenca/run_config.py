@@ -0,0 +1,127 @@
+import calendar
+import importlib
+import logging
+from dataclasses import dataclass, field, replace
+from datetime import date
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+MODOS_EXECUCAO = ('local', 'colab')
+
+def load_settings(profile: Optional[str] = None) -> Tuple[str, Any]:
+    """
+    Importa o módulo configs.settings_<profile>. Sem perfil, mantém a detecção
+    de sempre: 'local' se configs/settings_local.py existir, senão 'colab'.
+    """
+    if profile:
+        return profile, importlib.import_module(f"configs.settings_{profile}")
+    try:
+        return 'local', importlib.import_module("configs.settings_local")
+    except ImportError:
+        return 'colab', importlib.import_module("configs.settings_colab")
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+@dataclass(frozen=True)
+class RunConfig:
+    """
+    Configuração imutável de uma execução (um período, um modo).
+
+    Tira uma cópia congelada (dicts viram mappingproxy, listas viram tuplas)
+    dos valores do módulo de settings no momento da criação;
+    o pipeline não escreve mais no módulo, então vários períodos podem rodar
+    em processos paralelos sem interferência. Os nomes antigos em maiúsculas
+    (ANO_DO_RELATORIO, DATA_INICIO_GERAL, CAMINHOS...) continuam legíveis
+    como atributos, para os componentes que recebem `config`.
+    """
+
+    year: int
+    month: int
+    mode: str = 'local'
+    workers: int = 1
+    io_concurrency: int = 4
+    cache_dir: Optional[str] = None
+    profile: str = ''
+    only_tabs: Tuple[str, ...] = ()
+    settings: Mapping[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.mode not in MODOS_EXECUCAO:
+            raise ValueError(f"Modo de execução inválido: '{self.mode}'. Use {MODOS_EXECUCAO}.")
+        if not 1 <= int(self.month) <= 12:
+            raise ValueError(f"Mês inválido: {self.month}.")
+        if int(self.workers) < 1:
+            raise ValueError(f"Número de workers inválido: {self.workers}.")
+        if int(self.io_concurrency) < 1:
+            raise ValueError(f"Limite de I/O concorrente inválido: {self.io_concurrency}.")
+        object.__setattr__(self, 'year', int(self.year))
+        object.__setattr__(self, 'month', int(self.month))
+        object.__setattr__(self, 'workers', int(self.workers))
+        object.__setattr__(self, 'io_concurrency', int(self.io_concurrency))
+        object.__setattr__(self, 'only_tabs', tuple(self.only_tabs or ()))
+        object.__setattr__(self, 'settings', _freeze(self.settings))
+
+    @classmethod
+    def from_settings(cls, settings: Any, **overrides) -> 'RunConfig':
+        """Monta a configuração a partir de um módulo/namespace de settings; `overrides` vencem."""
+        if isinstance(settings, RunConfig):
+            return replace(settings, **overrides) if overrides else settings
+
+        valores = {k: v for k, v in vars(settings).items() if k.isupper()}
+        overrides = {k: v for k, v in overrides.items() if v is not None}
+        year = overrides.pop('year', valores.get('ANO_DO_RELATORIO'))
+        month = overrides.pop('month', valores.get('MES_DO_RELATORIO'))
+        if year is None or month is None:
+            raise ValueError("Configuração de ANO ou MES não encontrada.")
+
+        overrides.setdefault('mode', valores.get('MODO_EXECUCAO', 'local'))
+        overrides.setdefault('io_concurrency', valores.get('IO_CONCORRENCIA', 4))
+        return cls(year=year, month=month, settings=valores, **overrides)
+
+    @property
+    def data_inicio(self) -> date:
+        return date(self.year, self.month, 1)
+
+    @property
+    def data_fim(self) -> date:
+        return date(self.year, self.month, calendar.monthrange(self.year, self.month)[1])
+
+    @property
+    def path_key(self) -> str:
+        return 'local' if self.mode == 'local' else 'colab'
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        legado = {
+            'ANO_DO_RELATORIO': lambda: self.year,
+            'MES_DO_RELATORIO': lambda: self.month,
+            'MODO_EXECUCAO': lambda: self.mode,
+            'DATA_INICIO_GERAL': lambda: self.data_inicio.strftime('%Y-%m-%d'),
+            'DATA_FIM_GERAL': lambda: self.data_fim.strftime('%Y-%m-%d'),
+        }
+        if name in legado:
+            return legado[name]()
+        settings = self.__dict__.get('settings', {})
+        if name in settings:
+            return settings[name]
+        raise AttributeError(f"'RunConfig' não tem a configuração '{name}'")
+
+    def __reduce__(self):
+        # MappingProxyType não é serializável; reconstrói a partir de dicts comuns.
+        return (self.__class__, (self.year, self.month, self.mode, self.workers, self.io_concurrency, self.cache_dir,
+                                 self.profile, self.only_tabs, _thaw(self.settings)))
@@ -0,0 +1,103 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import pandas as pd
+import schema
+
+log = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Stage:
+    """Etapa do pipeline: as abas que ela produz e as etapas de que depende."""
+    name: str
+    tabs: Tuple[str, ...] = ()
+    requires: Tuple[str, ...] = ()
+
+# Em ordem de saída no Excel. O processamento (transformer) é sempre executado.
+STAGES: Tuple[Stage, ...] = (
+    Stage('base'),
+    Stage('kpi', requires=('base',)),
+    Stage('rollup', requires=('kpi',)),
+    Stage('pivot', (schema.ABA_PAINEL_COORDENADORES,), ('rollup',)),
+    Stage('debtors', (schema.ABA_ACAO_COBRANCA,), ('summary',)),
+    Stage('summary', (schema.ABA_RESUMO_POR_ALUNO,), ('rollup',)),
+    Stage('report_raw', (schema.ABA_REPORT_RAW,), ('kpi',)),
+    Stage('kpi_geral', (schema.ABA_KPI_GERAL,), ('rollup',)),
+    Stage('dwell', (schema.ABA_PERMANENCIA, schema.ABA_PERMANENCIA_COORDENADORES)),
+    Stage('actions', (schema.ABA_ACOES_CADASTRO,)),
+    Stage('raw_data', (schema.ABA_XML_EXPORT, schema.ABA_RAW_PRESENCE, schema.ABA_IGNORAR)),
+    Stage('inactivity', (schema.ABA_INATIVIDADE,)),
+    Stage('inactivity_trend', (schema.ABA_TRANSICOES_INATIVIDADE,), ('inactivity',)),
+    Stage('cleanup', (schema.ABA_LIMPEZA_BIOMETRIA,)),
+    Stage('quality', (schema.ABA_QUALIDADE_DADOS,)),
+)
+
+_STAGES_BY_NAME: Dict[str, Stage] = {stage.name: stage for stage in STAGES}
+_STAGE_BY_TAB: Dict[str, str] = {tab: stage.name for stage in STAGES for tab in stage.tabs}
+
+def available_targets() -> List[str]:
+    return [schema.ALVO_DASHBOARD] + list(_STAGE_BY_TAB)
+
+class TabPlan:
+    """
+    Plano de execução para um subconjunto de abas.
+
+    Sem alvos, todas as etapas rodam e o Excel sai completo (comportamento
+    padrão). Com alvos (nomes de aba ou 'dashboard'), só as etapas
+    necessárias e suas dependências são executadas: pedir `report_raw`, por
+    exemplo, roda base + enhancer + KPI e pula rollup, abas de XML bruto,
+    leituras de histórico (inatividade, limpeza de biometria) e permanência.
+    O alvo 'dashboard' produz o report_raw só para a base histórica, sem
+    renderizar o Excel.
+    """
+
+    def __init__(self, targets: Iterable[str] = ()):
+        self.targets = tuple(targets or ())
+        self.dashboard = schema.ALVO_DASHBOARD in self.targets
+        self.unknown = [t for t in self.targets if t != schema.ALVO_DASHBOARD and t not in _STAGE_BY_TAB]
+        self.excel_tabs: Optional[Set[str]] = (
+            {t for t in self.targets if t in _STAGE_BY_TAB} if self.targets else None
+        )
+
+        if not self.targets:
+            self.required = set(_STAGES_BY_NAME)
+        else:
+            wanted = {_STAGE_BY_TAB[t] for t in self.excel_tabs}
+            if self.dashboard:
+                wanted.add(_STAGE_BY_TAB[schema.ABA_REPORT_RAW])
+            self.required = self._with_dependencies(wanted)
+
+        if self.unknown:
+            log.warning(f"Plano de Abas: alvos desconhecidos ignorados: {self.unknown}")
+
+    @staticmethod
+    def _with_dependencies(names: Iterable[str]) -> Set[str]:
+        required, pending = set(), list(names)
+        while pending:
+            name = pending.pop()
+            if name not in required:
+                required.add(name)
+                pending.extend(_STAGES_BY_NAME[name].requires)
+        return required
+
+    def needs(self, stage: str) -> bool:
+        return stage in self.required
+
+    @property
+    def stages(self) -> List[str]:
+        """Etapas necessárias, na ordem de saída do relatório."""
+        return [stage.name for stage in STAGES if stage.name in self.required]
+
+    @property
+    def write_excel(self) -> bool:
+        return self.excel_tabs is None or bool(self.excel_tabs)
+
+    @property
+    def update_dashboard(self) -> bool:
+        return self.excel_tabs is None or self.dashboard or schema.ABA_REPORT_RAW in self.excel_tabs
+
+    def select(self, tabs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Abas que vão para o Excel, na ordem em que foram geradas."""
+        if self.excel_tabs is None:
+            return tabs
+        return {name: df for name, df in tabs.items() if name in self.excel_tabs}
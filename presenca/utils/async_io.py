@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping
+
+log = logging.getLogger(__name__)
+
+class IoOrchestrator:
+    """
+    Executa chamadas de I/O bloqueantes (clientes gspread/Drive, leitura de
+    pastas montadas) em paralelo, com asyncio e threads.
+
+    Cada tarefa é uma função síncrona; ela roda numa thread
+    (`asyncio.to_thread`) e um semáforo limita quantas ficam em voo ao mesmo
+    tempo. Com limite 1 as tarefas rodam em sequência, na ordem recebida,
+    como sem o orquestrador.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        if int(max_concurrency) < 1:
+            raise ValueError(f"Limite de concorrência inválido: {max_concurrency}.")
+        self.max_concurrency = int(max_concurrency)
+
+    def gather(self, tasks: Mapping[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Roda as tarefas e devolve {nome: resultado}. A primeira exceção é propagada depois que todas terminam."""
+        if self.max_concurrency == 1 or len(tasks) <= 1:
+            return {name: fn() for name, fn in tasks.items()}
+        return run_coroutine(self._gather(tasks))
+
+    async def _gather(self, tasks: Mapping[str, Callable[[], Any]]) -> Dict[str, Any]:
+        limiter = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(name: str, fn: Callable[[], Any]) -> Any:
+            async with limiter:
+                inicio = time.perf_counter()
+                try:
+                    return await asyncio.to_thread(fn)
+                finally:
+                    log.info(f"I/O: '{name}' concluída em {time.perf_counter() - inicio:.2f}s.")
+
+        names = list(tasks)
+        results = await asyncio.gather(*(run(n, tasks[n]) for n in names), return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                log.error(f"I/O: '{name}' falhou: {result}")
+                raise result
+        return dict(zip(names, results))
+
+def run_coroutine(coro: Awaitable[Any]) -> Any:
+    """
+    asyncio.run que também funciona dentro do Colab/Jupyter, onde já há um
+    loop rodando na thread principal: nesse caso a corrotina roda num loop
+    próprio, em outra thread, e esta espera o resultado.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    box: Dict[str, Any] = {}
+
+    def target():
+        try:
+            box['result'] = asyncio.run(coro)
+        except BaseException as e:
+            box['error'] = e
+
+    thread = threading.Thread(target=target, name='io-orchestrator')
+    thread.start()
+    thread.join()
+    if 'error' in box:
+        raise box['error']
+    return box['result']
@@ -0,0 +1,345 @@
+import json
+import logging
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import schema
+from .student_keys import StudentKeyRegistry
+
+log = logging.getLogger(__name__)
+
+MAX_EXEMPLOS = 3
+
+@dataclass(frozen=True)
+class Finding:
+    """Resultado de uma regra: quantas linhas de uma fonte a violam e algumas delas como exemplo."""
+    source: str
+    column: str
+    rule: str
+    severity: str
+    message: str
+    rows: int
+    total: int
+    samples: List[dict] = field(default_factory=list)
+
+class DataQualityReport:
+    """Relatório de qualidade dos inputs, exportável como JSON e como aba (Qualidade_Dados)."""
+
+    COLUMNS = {
+        'source': schema.OUT_COL_QD_FONTE,
+        'column': schema.OUT_COL_QD_COLUNA,
+        'rule': schema.OUT_COL_QD_REGRA,
+        'severity': schema.OUT_COL_QD_SEVERIDADE,
+        'message': schema.OUT_COL_QD_DESCRICAO,
+        'rows': schema.OUT_COL_QD_LINHAS,
+        'total': schema.OUT_COL_QD_TOTAL,
+        'samples': schema.OUT_COL_QD_EXEMPLOS,
+    }
+
+    def __init__(self, findings: List[Finding], elapsed_ms: float = 0.0):
+        self.findings = findings
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def has_errors(self) -> bool:
+        return any(f.severity == schema.SEVERIDADE_ERRO for f in self.findings)
+
+    def count(self, severity: str) -> int:
+        return sum(1 for f in self.findings if f.severity == severity)
+
+    def to_dict(self) -> dict:
+        return {
+            'ok': not self.has_errors,
+            'tempo_ms': round(self.elapsed_ms, 2),
+            'resumo': {sev: self.count(sev) for sev in schema.SEVERIDADES},
+            'achados': [asdict(f) for f in self.findings],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent, default=str)
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame([asdict(f) for f in self.findings], columns=list(self.COLUMNS))
+        df['samples'] = df['samples'].map(lambda s: json.dumps(s, ensure_ascii=False, default=str) if s else '')
+        ordem = {sev: i for i, sev in enumerate(schema.SEVERIDADES)}
+        df = df.sort_values(by=['severity', 'rows'], key=lambda c: c.map(ordem) if c.name == 'severity' else -c,
+                            kind='stable')
+        return df.rename(columns=self.COLUMNS).reset_index(drop=True)
+
+class _Frame:
+    """Fonte com cabeçalhos sem espaços nas pontas e conversões memorizadas: cada coluna é convertida uma vez."""
+
+    def __init__(self, name: str, df: pd.DataFrame):
+        self.name = name
+        self.df = df.set_axis(df.columns.astype(str).str.strip(), axis=1)
+        self._cache: Dict[tuple, pd.Series] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def has(self, col: Optional[str]) -> bool:
+        return col is not None and col in self.df.columns
+
+    def _memo(self, kind: str, col: str, build: Callable[[], pd.Series]) -> pd.Series:
+        if (kind, col) not in self._cache:
+            self._cache[(kind, col)] = build()
+        return self._cache[(kind, col)]
+
+    def _factorized(self, col: str):
+        if ('codes', col) not in self._cache:
+            self._cache[('codes', col)] = pd.factorize(self.df[col])
+        return self._cache[('codes', col)]
+
+    def _by_value(self, col: str, fn: Callable[[pd.Series], pd.Series], missing) -> pd.Series:
+        """Aplica fn aos valores distintos da coluna e espalha o resultado pelas linhas (nulos viram `missing`)."""
+        codes, uniques = self._factorized(col)
+        per_value = pd.Series(fn(pd.Series(uniques, dtype=object))).to_numpy()
+        out = pd.Series(per_value.take(codes), index=self.df.index)
+        return out.where(codes >= 0, missing)
+
+    def filled(self, col: str) -> pd.Series:
+        """Célula preenchida (não nula e com texto além de espaços)."""
+        return self._memo('filled', col, lambda: self._by_value(
+            col, lambda u: u.astype(str).str.strip() != '', False).astype(bool))
+
+    def dates(self, col: str, mixed: bool = False, dayfirst: bool = True) -> pd.Series:
+        """
+        Datas como o pipeline as lê. Convertidas pelos valores distintos;
+        mixed=True interpreta cada valor isoladamente, como nas justificativas.
+        """
+        def parse(uniques: pd.Series) -> pd.Series:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                kwargs = {'format': 'mixed'} if mixed else {}
+                return pd.to_datetime(uniques, dayfirst=dayfirst, errors='coerce', **kwargs)
+
+        def build():
+            s = self.df[col]
+            if pd.api.types.is_datetime64_any_dtype(s):
+                return s
+            return self._by_value(col, parse, pd.NaT).astype('datetime64[ns]')
+        return self._memo(f'dates{mixed}{dayfirst}', col, build)
+
+    def invalid_dates(self, col: str, mixed: bool = False, dayfirst: bool = True) -> pd.Series:
+        return self.filled(col) & self.dates(col, mixed, dayfirst).isna()
+
+    def non_integer(self, col: str, allowed: tuple = ()) -> pd.Series:
+        """Preenchida mas não é inteiro (nem um dos textos aceitos, ex. 'Saiu')."""
+        def accepted(uniques: pd.Series) -> pd.Series:
+            text = uniques.astype(str).str.strip()
+            ok = text.str.fullmatch(r'\d+(\.0+)?', na=False)
+            for word in allowed:
+                ok |= text.str.contains(word, case=False, na=False)
+            return ok
+
+        def build():
+            s = self.df[col]
+            if pd.api.types.is_numeric_dtype(s):
+                return s.notna() & ~np.isfinite(pd.to_numeric(s, errors='coerce'))
+            return self.filled(col) & ~self._by_value(col, accepted, True).astype(bool)
+        return self._memo('non_integer', col, build)
+
+    def ids(self, col: str) -> pd.Series:
+        return self._memo('ids', col, lambda: self._by_value(col, StudentKeyRegistry.canonicalize, np.nan))
+
+    def find(self, *candidates: str) -> Optional[str]:
+        for col in candidates:
+            if col in self.df.columns:
+                return col
+        return None
+
+@dataclass(frozen=True)
+class Rule:
+    """Regra vetorizada: devolve a máscara das linhas que a violam (None se a regra não se aplica)."""
+    source: str
+    column: str
+    rule: str
+    severity: str
+    message: str
+    check: Callable[[_Frame, 'InputValidator'], Optional[pd.Series]]
+    sample_columns: tuple = ()
+
+def _io_id(f: _Frame) -> Optional[str]:
+    return f.find(schema.IO_COL_ID_RAW, schema.COL_ID_STONELAB) or next(
+        (c for c in f.df.columns if 'id' in c.lower() and 'stonelab' in c.lower()), None)
+
+def _date_before(f: _Frame, fim: str, inicio: str, mixed: bool = False) -> Optional[pd.Series]:
+    if not (f.has(fim) and f.has(inicio)):
+        return None
+    return f.dates(fim, mixed) < f.dates(inicio, mixed)
+
+def _orphan_ids(f: _Frame, v: 'InputValidator', col: Optional[str]) -> Optional[pd.Series]:
+    if col is None or not f.has(col) or v.cadastro_ids is None:
+        return None
+    ids = f.ids(col)
+    return ids.notna() & ~ids.isin(v.cadastro_ids)
+
+def _duplicated_ids(f: _Frame, col: Optional[str]) -> Optional[pd.Series]:
+    if col is None or not f.has(col):
+        return None
+    ids = f.ids(col)
+    return ids.notna() & ids.duplicated(keep=False)
+
+def _missing(f: _Frame, col: Optional[str]) -> Optional[pd.Series]:
+    return ~f.filled(col) if col is not None and f.has(col) else None
+
+ERRO, AVISO, INFO = schema.SEVERIDADE_ERRO, schema.SEVERIDADE_AVISO, schema.SEVERIDADE_INFO
+_JUST_ID = (schema.JUSTIFICATIVA_ID_STONELAB, schema.COL_ID_STONELAB)
+
+RULES: List[Rule] = [
+    # --- Cadastro ---
+    Rule('cadastro', schema.CADASTRO_ID_STONELAB, 'id_vazio', AVISO,
+         "ID StoneLab vazio: a pessoa não entra em nenhum relatório.",
+         lambda f, v: _missing(f, schema.CADASTRO_ID_STONELAB), (schema.CADASTRO_NOME_COMPLETO,)),
+    Rule('cadastro', schema.CADASTRO_ID_STONELAB, 'id_duplicado', AVISO,
+         "ID StoneLab repetido no cadastro.",
+         lambda f, v: _duplicated_ids(f, schema.CADASTRO_ID_STONELAB),
+         (schema.CADASTRO_ID_STONELAB, schema.CADASTRO_NOME_COMPLETO)),
+    Rule('cadastro', schema.CADASTRO_NOME_COMPLETO, 'nome_vazio', AVISO,
+         "Nome completo vazio.",
+         lambda f, v: _missing(f, schema.CADASTRO_NOME_COMPLETO), (schema.CADASTRO_ID_STONELAB,)),
+    # --- IO Alunos (jornadas) ---
+    Rule('io_alunos', schema.IO_COL_ID_RAW, 'id_vazio', AVISO,
+         "ID StoneLab vazio: a linha é descartada ao montar as jornadas.",
+         lambda f, v: _missing(f, _io_id(f)), (schema.IO_COL_START_RAW,)),
+    Rule('io_alunos', schema.IO_COL_ID_RAW, 'id_sem_cadastro', AVISO,
+         "ID StoneLab que não existe no cadastro.",
+         lambda f, v: _orphan_ids(f, v, _io_id(f)), (schema.IO_COL_ID_RAW,)),
+    Rule('io_alunos', schema.IO_COL_ID_RAW, 'id_repetido', INFO,
+         "Mais de uma resposta para o mesmo ID: vale a de data de referência mais recente.",
+         lambda f, v: _duplicated_ids(f, _io_id(f)), (schema.IO_COL_ID_RAW, schema.IO_COL_START_RAW)),
+    Rule('io_alunos', schema.IO_COL_START_RAW, 'data_vazia', AVISO,
+         "Data de referência vazia: a linha é descartada ao montar as jornadas.",
+         lambda f, v: _missing(f, schema.IO_COL_START_RAW), (schema.IO_COL_ID_RAW,)),
+    Rule('io_alunos', schema.IO_COL_START_RAW, 'data_invalida', AVISO,
+         "Data de referência ilegível (vira vazia e a linha é descartada).",
+         lambda f, v: f.invalid_dates(schema.IO_COL_START_RAW) if f.has(schema.IO_COL_START_RAW) else None,
+         (schema.IO_COL_ID_RAW, schema.IO_COL_START_RAW)),
+    Rule('io_alunos', schema.IO_COL_END1_RAW, 'data_invalida', AVISO,
+         "Data de fim ilegível (a jornada fica sem fim).",
+         lambda f, v: f.invalid_dates(schema.IO_COL_END1_RAW) if f.has(schema.IO_COL_END1_RAW) else None,
+         (schema.IO_COL_ID_RAW, schema.IO_COL_END1_RAW)),
+    Rule('io_alunos', schema.IO_COL_END2_RAW, 'data_invalida', AVISO,
+         "Segunda data de fim ilegível.",
+         lambda f, v: f.invalid_dates(schema.IO_COL_END2_RAW) if f.has(schema.IO_COL_END2_RAW) else None,
+         (schema.IO_COL_ID_RAW, schema.IO_COL_END2_RAW)),
+    Rule('io_alunos', schema.IO_COL_END1_RAW, 'fim_antes_do_inicio', AVISO,
+         "Data de fim anterior à data de referência.",
+         lambda f, v: _date_before(f, schema.IO_COL_END1_RAW, schema.IO_COL_START_RAW),
+         (schema.IO_COL_ID_RAW, schema.IO_COL_START_RAW, schema.IO_COL_END1_RAW)),
+    Rule('io_alunos', schema.IO_COL_FREQ1_RAW, 'frequencia_nao_numerica', AVISO,
+         "Frequência esperada não numérica (vira 0: a pessoa deixa de ser cobrada).",
+         lambda f, v: f.non_integer(schema.IO_COL_FREQ1_RAW, ('Saiu',)) if f.has(schema.IO_COL_FREQ1_RAW) else None,
+         (schema.IO_COL_ID_RAW, schema.IO_COL_FREQ1_RAW)),
+    Rule('io_alunos', schema.IO_COL_FREQ2_RAW, 'frequencia_nao_numerica', AVISO,
+         "Segunda frequência não numérica (vira 0).",
+         lambda f, v: f.non_integer(schema.IO_COL_FREQ2_RAW) if f.has(schema.IO_COL_FREQ2_RAW) else None,
+         (schema.IO_COL_ID_RAW, schema.IO_COL_FREQ2_RAW)),
+    # --- Justificativas ---
+    Rule('justificativas', schema.JUSTIFICATIVA_ID_STONELAB, 'id_sem_cadastro', AVISO,
+         "ID StoneLab que não existe no cadastro: a justificativa é ignorada.",
+         lambda f, v: _orphan_ids(f, v, f.find(*_JUST_ID)), (schema.JUSTIFICATIVA_ID_STONELAB,)),
+    Rule('justificativas', schema.JUSTIFICATIVA_INICIO, 'data_invalida', AVISO,
+         "Início da ausência ilegível: a justificativa é ignorada.",
+         lambda f, v: f.invalid_dates(schema.JUSTIFICATIVA_INICIO, True) if f.has(schema.JUSTIFICATIVA_INICIO) else None,
+         (schema.JUSTIFICATIVA_ID_STONELAB, schema.JUSTIFICATIVA_INICIO)),
+    Rule('justificativas', schema.JUSTIFICATIVA_FIM, 'data_invalida', AVISO,
+         "Fim da ausência ilegível: a justificativa é ignorada.",
+         lambda f, v: f.invalid_dates(schema.JUSTIFICATIVA_FIM, True) if f.has(schema.JUSTIFICATIVA_FIM) else None,
+         (schema.JUSTIFICATIVA_ID_STONELAB, schema.JUSTIFICATIVA_FIM)),
+    Rule('justificativas', schema.JUSTIFICATIVA_FIM, 'fim_antes_do_inicio', AVISO,
+         "Fim da ausência anterior ao início: nenhum dia é justificado.",
+         lambda f, v: _date_before(f, schema.JUSTIFICATIVA_FIM, schema.JUSTIFICATIVA_INICIO, mixed=True),
+         (schema.JUSTIFICATIVA_ID_STONELAB, schema.JUSTIFICATIVA_INICIO, schema.JUSTIFICATIVA_FIM)),
+    # --- Feriados (lidos como no calendário de dias úteis) ---
+    Rule('feriados', schema.FERIADOS_DATA, 'data_invalida', AVISO,
+         "Data de feriado ilegível: o dia não é descontado.",
+         lambda f, v: f.invalid_dates(schema.FERIADOS_DATA, dayfirst=False) if f.has(schema.FERIADOS_DATA) else None,
+         (schema.FERIADOS_DATA,)),
+    # --- Batidas da catraca ---
+    Rule('registros_brutos', 'Name', 'nome_vazio', AVISO,
+         "Batida sem nome: é descartada.",
+         lambda f, v: _missing(f, 'Name'), ('Datetime',)),
+    Rule('registros_brutos', 'Datetime', 'data_invalida', AVISO,
+         "Horário ilegível: a batida é descartada.",
+         lambda f, v: f.df['Datetime'].isna() if f.has('Datetime') else None, ('Name',)),
+]
+
+# Fontes sem as quais o pipeline não roda e colunas obrigatórias por fonte.
+REQUIRED_SOURCES = ['cadastro', 'io_alunos']
+REQUIRED_COLUMNS = {'cadastro': schema.COLUNAS_OBRIGATORIAS_CADASTRO}
+
+class InputValidator:
+    """
+    Valida todas as fontes de entrada numa passada, com regras vetorizadas
+    por coluna (RULES). Fonte obrigatória ausente ou sem colunas obrigatórias
+    é erro e interrompe o pipeline; problemas de linha (datas ilegíveis,
+    frequências não numéricas, IDs repetidos ou sem cadastro, intervalos
+    invertidos) são avisos que mostram o que o pipeline vai descartar ou
+    converter em silêncio mais adiante.
+    """
+
+    def __init__(self, rules: Optional[List[Rule]] = None, max_samples: int = MAX_EXEMPLOS):
+        self.rules = RULES if rules is None else rules
+        self.max_samples = max_samples
+        self.cadastro_ids: Optional[pd.Series] = None
+
+    def validate(self, data_frames: Dict[str, pd.DataFrame]) -> DataQualityReport:
+        inicio = time.perf_counter()
+        frames = {name: _Frame(name, df) for name, df in data_frames.items()
+                  if isinstance(df, pd.DataFrame) and not df.empty}
+        findings = self._structural_findings(data_frames, frames)
+
+        cadastro = frames.get('cadastro')
+        self.cadastro_ids = (cadastro.ids(schema.CADASTRO_ID_STONELAB).dropna().unique()
+                             if cadastro is not None and cadastro.has(schema.CADASTRO_ID_STONELAB) else None)
+
+        for rule in self.rules:
+            frame = frames.get(rule.source)
+            if frame is None:
+                continue
+            mask = rule.check(frame, self)
+            if mask is None:
+                continue
+            mask = mask.fillna(False).astype(bool)
+            rows = int(mask.sum())
+            if rows:
+                findings.append(Finding(rule.source, rule.column, rule.rule, rule.severity, rule.message,
+                                        rows, len(frame), self._samples(frame, mask, rule)))
+
+        report = DataQualityReport(findings, (time.perf_counter() - inicio) * 1000)
+        log.info(f"Qualidade dos Dados: {report.count(schema.SEVERIDADE_ERRO)} erros, "
+                 f"{report.count(schema.SEVERIDADE_AVISO)} avisos, {report.count(schema.SEVERIDADE_INFO)} informativos "
+                 f"em {report.elapsed_ms:.1f} ms.")
+        return report
+
+    @staticmethod
+    def _structural_findings(data_frames: Dict[str, pd.DataFrame], frames: Dict[str, _Frame]) -> List[Finding]:
+        findings = []
+        for source in REQUIRED_SOURCES:
+            if source not in frames:
+                findings.append(Finding(source, '', 'fonte_vazia', ERRO,
+                                        f"Fonte '{source}' não foi carregada ou está vazia.", 0, 0))
+        for source, columns in REQUIRED_COLUMNS.items():
+            frame = frames.get(source)
+            if frame is None:
+                continue
+            for col in columns:
+                if not frame.has(col):
+                    findings.append(Finding(source, col, 'coluna_obrigatoria', ERRO,
+                                            "Coluna obrigatória ausente.", len(frame), len(frame)))
+        if 'feriados' not in frames:
+            findings.append(Finding('feriados', '', 'fonte_vazia', AVISO,
+                                    "Feriados não carregados: nenhum feriado será descontado.", 0, 0))
+        return findings
+
+    def _samples(self, frame: _Frame, mask: pd.Series, rule: Rule) -> List[dict]:
+        cols = [c for c in dict.fromkeys((rule.column,) + rule.sample_columns) if frame.has(c)]
+        posicoes = np.flatnonzero(mask.to_numpy())[:self.max_samples]
+        amostra = frame.df.iloc[posicoes][cols].astype(object)
+        amostra = amostra.where(amostra.notna(), None)
+        # Linha como na planilha: cabeçalho na linha 1.
+        return [{'linha': int(p) + 2, **row} for p, row in zip(posicoes, amostra.to_dict('records'))]
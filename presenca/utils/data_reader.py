@@ -1,10 +1,13 @@
 import os
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from datetime import datetime
 import pandas as pd
-import gspread
 import logging
 import schema
+from .async_io import IoOrchestrator
+from .punch_datetime import PunchDatetimeParser
 
 log = logging.getLogger(__name__)
 
@@ -13,6 +16,7 @@ class DataReader:
     def __init__(self, config, gspread_client=None):
         self.config = config
         self.gc = gspread_client
+        self.datetime_parser = PunchDatetimeParser()
         log.info("Leitor de Dados: Inicializado.")
 
     def load_all_sources(self) -> dict:
@@ -79,7 +83,13 @@ class DataReader:
             return pd.DataFrame()
 
         log.info(f"Leitor de Dados: Encontrados {len(files_to_load)} arquivos XML válidos.")
-        df_list = [self._extract_from_xml(f) for f in files_to_load]
+        workers = min(int(getattr(self.config, 'workers', 1) or 1), len(files_to_load))
+        if workers > 1:
+            log.info(f"Leitor de Dados: Lendo XMLs em {workers} processos.")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                df_list = list(pool.map(read_punch_xml, files_to_load, [self.datetime_parser] * len(files_to_load)))
+        else:
+            df_list = [self._extract_from_xml(f) for f in files_to_load]
         
         if not df_list:
              return pd.DataFrame()
@@ -87,40 +97,8 @@ class DataReader:
         return pd.concat(df_list, ignore_index=True)
 
     def _extract_from_xml(self, file_path: str) -> pd.DataFrame:
-        try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            data = []
-            ns = {'ss': 'urn:schemas-microsoft-com:office:spreadsheet'}
-            rows = root.findall(".//ss:Row", ns)
-
-            header_row_idx = next(
-                (i for i, r in enumerate(rows) if 'Nome' in
-                 [c.text for c in r.findall(".//ss:Data", ns)]), -1
-            )
-            if header_row_idx == -1:
-                log.warning(f"Leitor de Dados: Cabeçalho 'Nome' não encontrado em {os.path.basename(file_path)}. Pulando.")
-                return pd.DataFrame()
-            
-            header = [c.text for c in rows[header_row_idx].findall(".//ss:Data", ns)]
-            try:
-                nome_idx = header.index('Nome')
-                horario_idx = header.index('Horário')
-            except ValueError:
-                log.warning(f"Leitor de Dados: Colunas obrigatórias ausentes em {os.path.basename(file_path)}. Pulando.")
-                return pd.DataFrame()
-            
-            for row in rows[header_row_idx + 1:]:
-                cells = [c.text for c in row.findall(".//ss:Data", ns)]
-                if len(cells) > nome_idx and len(cells) > horario_idx:
-                    nome, horario = cells[nome_idx], cells[horario_idx]
-                    if nome and horario:
-                        data.append({'Name': nome.strip(), 'Datetime': horario})
-            return pd.DataFrame(data)
-        except ET.ParseError:
-            log.error(f"Leitor de Dados: XML corrompido: {file_path}")
-            return pd.DataFrame()
-    
+        return read_punch_xml(file_path, self.datetime_parser)
+
     def _load_colab_sources(self) -> dict:
         log.info("Leitor de Dados: Carregando fontes de dados online (Colab)...")
         
@@ -131,25 +109,21 @@ class DataReader:
             ano_feriado_str = str(datetime.now().year)
 
         presenca_path = self.config.CAMINHOS['colab'].get('dados_presenca', 'raw_data')
-        
-        return {
-            "cadastro": self._read_sheet_online(
-                schema.PLANILHA_CADASTRO, schema.ABA_CADASTRO_PRINCIPAL
-            ),
-            "io_alunos": self._read_sheet_online(
-                schema.PLANILHA_IO_ALUNOS, schema.ABA_IO_ALUNOS
-            ),
-            "ignorar": self._read_sheet_online(
-                schema.PLANILHA_CADASTRO, schema.ABA_NOMES_IGNORAR
-            ),
-            "feriados": self._read_sheet_online(
-                schema.PLANILHA_FERIADOS, ano_feriado_str
-            ),
-            "justificativas": self._read_sheet_online(
-                schema.PLANILHA_JUSTIFICATIVAS, schema.ABA_JUSTIFICATIVAS
-            ),
-            "registros_brutos": self._load_all_xmls(presenca_path),
+
+        # As cinco planilhas e a varredura dos XMLs no Drive montado são independentes:
+        # rodam em paralelo, até io_concurrency chamadas ao mesmo tempo.
+        planilhas = {
+            "cadastro": (schema.PLANILHA_CADASTRO, schema.ABA_CADASTRO_PRINCIPAL),
+            "io_alunos": (schema.PLANILHA_IO_ALUNOS, schema.ABA_IO_ALUNOS),
+            "ignorar": (schema.PLANILHA_CADASTRO, schema.ABA_NOMES_IGNORAR),
+            "feriados": (schema.PLANILHA_FERIADOS, ano_feriado_str),
+            "justificativas": (schema.PLANILHA_JUSTIFICATIVAS, schema.ABA_JUSTIFICATIVAS),
         }
+        tarefas = {"registros_brutos": lambda: self._load_all_xmls(presenca_path)}
+        tarefas.update({fonte: partial(self._read_sheet_online, *aba) for fonte, aba in planilhas.items()})
+        orquestrador = IoOrchestrator(getattr(self.config, 'io_concurrency', 1))
+        fontes = orquestrador.gather(tarefas)
+        return {fonte: fontes[fonte] for fonte in list(planilhas) + ["registros_brutos"]}
 
     def _read_sheet_online(self, s_name: str, a_name: str) -> pd.DataFrame:
         if not self.gc:
@@ -161,4 +135,44 @@ class DataReader:
         rows = worksheet.get_all_values()
         df = pd.DataFrame.from_records(rows[1:], columns=rows[0])
         log.info(f"Leitor de Dados: Leitura online de '{s_name}' concluída.")
-        return df
\ No newline at end of file
+        return df
+
+def read_punch_xml(file_path: str, datetime_parser: PunchDatetimeParser) -> pd.DataFrame:
+    """Lê as batidas (Nome, Horário) de um XML da catraca. Função de módulo para rodar em subprocessos."""
+    try:
+        tree = ET.parse(file_path)
+        root = tree.getroot()
+        data = []
+        ns = {'ss': 'urn:schemas-microsoft-com:office:spreadsheet'}
+        rows = root.findall(".//ss:Row", ns)
+
+        header_row_idx = next(
+            (i for i, r in enumerate(rows) if 'Nome' in
+             [c.text for c in r.findall(".//ss:Data", ns)]), -1
+        )
+        if header_row_idx == -1:
+            log.warning(f"Leitor de Dados: Cabeçalho 'Nome' não encontrado em {os.path.basename(file_path)}. Pulando.")
+            return pd.DataFrame()
+
+        header = [c.text for c in rows[header_row_idx].findall(".//ss:Data", ns)]
+        try:
+            nome_idx = header.index('Nome')
+            horario_idx = header.index('Horário')
+        except ValueError:
+            log.warning(f"Leitor de Dados: Colunas obrigatórias ausentes em {os.path.basename(file_path)}. Pulando.")
+            return pd.DataFrame()
+
+        for row in rows[header_row_idx + 1:]:
+            cells = [c.text for c in row.findall(".//ss:Data", ns)]
+            if len(cells) > nome_idx and len(cells) > horario_idx:
+                nome, horario = cells[nome_idx], cells[horario_idx]
+                if nome and horario:
+                    data.append({'Name': nome.strip(), 'Datetime': horario})
+
+        df = pd.DataFrame(data)
+        if not df.empty:
+            df['Datetime'] = datetime_parser.parse(df['Datetime'], os.path.basename(file_path))
+        return df
+    except ET.ParseError:
+        log.error(f"Leitor de Dados: XML corrompido: {file_path}")
+        return pd.DataFrame()
@@ -4,20 +4,7 @@ import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, Optional
 import schema
-from googleapiclient.http import MediaFileUpload
-import gspread
-
-try:
-    from google.colab import files
-    HAS_COLAB = True
-except ImportError:
-    HAS_COLAB = False
-
-try:
-    from gspread_dataframe import set_with_dataframe, get_as_dataframe
-    HAS_GSPREAD_DF = True
-except ImportError:
-    HAS_GSPREAD_DF = False
+from . import google_clients
 
 log = logging.getLogger(__name__)
 
@@ -53,11 +40,61 @@ class DataWriter:
         else:
             return self._save_to_drive(report_tabs, filename, self.output_path)
 
-    def update_master_database(self, df_new: pd.DataFrame, spreadsheet_id: str, tab_name: str):
+    def update_master_database(self, df_new: pd.DataFrame, spreadsheet_id: str, tab_name: str) -> str:
+        """Atualiza a base histórica; retorna o caminho do CSV (local) ou o ID da planilha, '' em caso de falha."""
         if self.mode == 'local':
-            self._update_local_master_db_csv(df_new)
+            return self._update_local_master_db_csv(df_new)
         else:
-            self._update_google_sheets_master(df_new, spreadsheet_id, tab_name)
+            return self._update_google_sheets_master(df_new, spreadsheet_id, tab_name)
+
+    def _artifact_dir(self, artefato: str) -> str:
+        """Pasta dos artefatos da execução: a de cache, se houver; senão a do dashboard (só no modo local)."""
+        cache_dir = getattr(self.config, 'cache_dir', None)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            return cache_dir
+        if self.mode == 'local':
+            return self.dashboard_local_path
+        log.info(f"Escritor: {artefato} só é persistido no modo local ou com pasta de cache. Pulando.")
+        return ""
+
+    def save_presence_cube(self, presence_cube, key_registry=None) -> str:
+        """
+        Grava o cubo de presença do período (.npz) na pasta de cache da
+        execução. Nenhuma etapa relê o cubo: sem pasta de cache, não é gravado.
+        """
+        pasta = getattr(self.config, 'cache_dir', None)
+        if not pasta:
+            log.info("Escritor: Cubo de presença só é persistido com pasta de cache. Pulando.")
+            return ""
+        os.makedirs(pasta, exist_ok=True)
+
+        data_fim = getattr(self.config, 'DATA_FIM_GERAL', datetime.now().strftime("%Y-%m-%d"))
+        full_path = os.path.join(pasta, schema.ARQUIVO_CUBO_PRESENCA.format(data_fim=data_fim))
+        try:
+            presence_cube.to_npz(full_path, key_registry)
+            log.info(f"Escritor: Cubo de presença salvo em {full_path}")
+            return full_path
+        except Exception as e:
+            log.error(f"Escritor: Erro ao salvar cubo de presença: {e}")
+            return ""
+
+    def save_quality_report(self, report) -> str:
+        """Grava o relatório de qualidade dos inputs (.json) na pasta de cache ou, no modo local, na do dashboard."""
+        pasta = self._artifact_dir("Relatório de qualidade")
+        if not pasta:
+            return ""
+
+        data_fim = getattr(self.config, 'DATA_FIM_GERAL', datetime.now().strftime("%Y-%m-%d"))
+        full_path = os.path.join(pasta, schema.ARQUIVO_QUALIDADE_DADOS.format(data_fim=data_fim))
+        try:
+            with open(full_path, 'w', encoding='utf-8') as f:
+                f.write(report.to_json())
+            log.info(f"Escritor: Relatório de qualidade salvo em {full_path}")
+            return full_path
+        except Exception as e:
+            log.error(f"Escritor: Erro ao salvar relatório de qualidade: {e}")
+            return ""
 
     def _identify_date_column(self, df: pd.DataFrame) -> Optional[str]:
         if schema.DB_HIST_COL_DATE in df.columns:
@@ -68,25 +105,23 @@ class DataWriter:
             return schema.OUT_COL_ULTIMA_PRESENCA
         return None
 
-    def _update_google_sheets_master(self, df_new: pd.DataFrame, spreadsheet_id: str, tab_name: str):
+    def _update_google_sheets_master(self, df_new: pd.DataFrame, spreadsheet_id: str, tab_name: str) -> str:
         log.info(f"Escritor: Atualizando DB Mestra no Google Sheets ({tab_name})...")
 
         if not self.gc:
             log.warning("Escritor: Cliente GSpread não disponível.")
-            return
+            return ""
         
-        if not HAS_GSPREAD_DF:
+        gspread_df = google_clients.gspread_dataframe()
+        if gspread_df is None:
             log.error("Escritor: 'gspread-dataframe' ausente.")
-            return
+            return ""
 
         try:
             sh = self.gc.open_by_key(spreadsheet_id)
-            try:
-                worksheet = sh.worksheet(tab_name)
-            except gspread.WorksheetNotFound:
-                worksheet = sh.add_worksheet(title=tab_name, rows=1000, cols=20)
+            worksheet = google_clients.open_or_create_worksheet(sh, tab_name)
 
-            df_old = get_as_dataframe(worksheet, evaluate_formulas=True, parse_dates=True)
+            df_old = gspread_df.get_as_dataframe(worksheet, evaluate_formulas=True, parse_dates=True)
             df_old = df_old.dropna(how='all', axis=0).dropna(how='all', axis=1)
 
             date_col = self._identify_date_column(df_new)
@@ -94,21 +129,22 @@ class DataWriter:
             if not df_old.empty and date_col and date_col in df_old.columns:
                 new_dates = df_new[date_col].astype(str).unique()
                 df_old[date_col] = df_old[date_col].astype(str)
-                df_history_clean = df_old[~df_old[date_col].isin(new_dates)].copy()
+                df_history_clean = df_old[~df_old[date_col].isin(new_dates)]
                 
                 df_final = pd.concat([df_history_clean, df_new], ignore_index=True)
             else:
                 df_final = df_new
 
-            set_with_dataframe(worksheet, df_final, resize=True)
+            gspread_df.set_with_dataframe(worksheet, df_final, resize=True)
             log.info("Escritor: DB Mestra (Nuvem) atualizada.")
+            return spreadsheet_id
 
         except Exception as e:
             log.error(f"Escritor: Erro na atualização nuvem: {e}", exc_info=True)
+            return ""
 
-    def _update_local_master_db_csv(self, df_new: pd.DataFrame):
-        db_filename = "STONE_LAB_DATABASE_HISTORICO.csv"
-        full_path = os.path.join(self.dashboard_local_path, db_filename)
+    def _update_local_master_db_csv(self, df_new: pd.DataFrame) -> str:
+        full_path = os.path.join(self.dashboard_local_path, schema.ARQUIVO_DB_HISTORICO)
         
         log.info(f"Escritor: Atualizando Base Histórica (CSV) em {full_path}...")
         
@@ -121,7 +157,7 @@ class DataWriter:
                 
                 if date_col and date_col in df_old.columns:
                     new_dates = df_new_str[date_col].unique()
-                    df_history_clean = df_old[~df_old[date_col].isin(new_dates)].copy()
+                    df_history_clean = df_old[~df_old[date_col].isin(new_dates)]
                     
                     df_final = pd.concat([df_history_clean, df_new_str], ignore_index=True)
                 else:
@@ -132,16 +168,18 @@ class DataWriter:
             df_final.to_csv(full_path, index=False)
             
             log.info(f"Escritor: Base Histórica (CSV) atualizada. Total registros: {len(df_final)}")
+            return full_path
             
         except Exception as e:
              log.error(f"Escritor: Erro ao atualizar CSV local: {e}")
+             return ""
 
     def _write_excel_content(self, writer, report_tabs: Dict[str, pd.DataFrame]):
         for sheet_name, df in report_tabs.items():
             if isinstance(df, pd.DataFrame):
                 df.to_excel(writer, sheet_name=sheet_name, index=False)
                 
-                if sheet_name == schema.ABA_INATIVIDADE:
+                if sheet_name in (schema.ABA_INATIVIDADE, schema.ABA_TRANSICOES_INATIVIDADE):
                     self._apply_generic_formatting(
                         writer, sheet_name, df, 
                         schema.OUT_COL_RISCO, 
@@ -207,11 +245,11 @@ class DataWriter:
 
         temp_path = ""
         try:
-            temp_path = f"/content/{filename}" if HAS_COLAB else filename
+            temp_path = f"/content/{filename}" if google_clients.is_colab_runtime() else filename
             
             with pd.ExcelWriter(temp_path, engine='xlsxwriter') as writer:
                 self._write_excel_content(writer, report_tabs)
-            media = MediaFileUpload(temp_path, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            media = google_clients.media_upload(temp_path)
             query = f"name = '{filename}' and '{folder_id}' in parents and trashed = false"
             
             results = self.gdrive_service.files().list(
@@ -0,0 +1,108 @@
+import logging
+from typing import Dict, Iterable
+import pandas as pd
+import schema
+
+log = logging.getLogger(__name__)
+
+class DtypePolicy:
+    """
+    Centraliza os tipos compactos usados nos DataFrames do pipeline:
+    rótulos repetidos viram 'category', datas viram datetime64 normalizado
+    (meia-noite) e contadores viram inteiros pequenos.
+    """
+
+    LABEL_COLUMNS = [
+        schema.COL_NAME,
+        schema.COL_NOME_ENTRADA,
+        schema.COL_FUNCTION,
+        schema.COL_COORDINATOR,
+        schema.OUT_COL_SITUACAO,
+        schema.OUT_COL_RISCO,
+    ]
+
+    COUNTER_COLUMNS = [
+        'observed_frequency',
+        'expected_frequency',
+        'workdays',
+        'vacation_days',
+        'justified_days',
+        'meta_dinamica',
+    ]
+
+    HISTORY_LABEL_COLUMNS = [
+        schema.DB_HIST_COL_NOME,
+        schema.DB_HIST_COL_FUNCAO,
+        schema.DB_HIST_COL_COORDENADOR,
+        schema.DB_HIST_COL_SITUACAO,
+    ]
+
+    def apply_to_sources(self, data_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Aplica a política logo após o DataReader (colunas ainda com nomes brutos), num novo dicionário."""
+        data_frames = dict(data_frames)
+        df_registros = data_frames.get('registros_brutos')
+        if df_registros is not None and not df_registros.empty:
+            data_frames['registros_brutos'] = self.to_category(df_registros, ['Name'])
+        return data_frames
+
+    def apply_to_processed(self, processed_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Aplica a política às tabelas produzidas pelo AttendanceTransformer."""
+        for key in ('registros_brutos', 'registros_final', 'cadastro'):
+            df = processed_data.get(key)
+            if df is None or df.empty:
+                continue
+            df = self.to_category(df, self.LABEL_COLUMNS)
+            df = self.to_day(df, [schema.COL_XML_DATE])
+            processed_data[key] = df
+        return processed_data
+
+    def apply_to_report(self, report: pd.DataFrame) -> pd.DataFrame:
+        """Aplica a política ao relatório semanal (base, enriquecido ou com KPIs)."""
+        if report.empty:
+            return report
+        report = self.to_category(report, self.LABEL_COLUMNS)
+        report = self.to_day(report, [schema.COL_DATE])
+        return self.to_small_int(report, self.COUNTER_COLUMNS)
+
+    def apply_to_history(self, history: pd.DataFrame) -> pd.DataFrame:
+        """Aplica a política ao histórico lido do banco mestre (CSV)."""
+        if history.empty:
+            return history
+        return self.to_category(history, self.HISTORY_LABEL_COLUMNS)
+
+    # As conversões devolvem um novo DataFrame (cópia rasa): o frame do chamador não é alterado.
+
+    @staticmethod
+    def to_category(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        df = df.copy(deep=False)
+        for col in columns:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        return df
+
+    @staticmethod
+    def to_day(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        df = df.copy(deep=False)
+        for col in columns:
+            if col in df.columns:
+                values = pd.to_datetime(df[col], errors='coerce')
+                invalidas = int((values.isna() & df[col].notna()).sum())
+                if invalidas:
+                    log.warning(f"Tipos: {invalidas} valores de '{col}' não são datas e viraram vazios (NaT).")
+                df[col] = values.dt.normalize()
+        return df
+
+    @staticmethod
+    def to_small_int(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        df = df.copy(deep=False)
+        for col in columns:
+            if col in df.columns:
+                values = pd.to_numeric(df[col], errors='coerce')
+                nao_numericos = int((values.isna() & df[col].notna()).sum())
+                vazios = int(df[col].isna().sum())
+                if nao_numericos:
+                    log.warning(f"Tipos: {nao_numericos} valores não numéricos em '{col}' viraram 0.")
+                if vazios:
+                    log.info(f"Tipos: {vazios} valores vazios em '{col}' viraram 0.")
+                df[col] = pd.to_numeric(values.fillna(0).astype('int64'), downcast='integer')
+        return df
@@ -0,0 +1,49 @@
+import importlib.util
+import logging
+from typing import Any, Tuple
+
+log = logging.getLogger(__name__)
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def is_colab_runtime() -> bool:
+    """Indica se o código roda dentro do Google Colab, sem importar o pacote."""
+    try:
+        return importlib.util.find_spec('google.colab') is not None
+    except (ImportError, ValueError):
+        return False
+
+def authenticate_colab() -> Tuple[Any, Any]:
+    """
+    Autentica a sessão do Colab e devolve (cliente gspread, serviço do Drive).
+
+    As bibliotecas do Google são importadas só aqui: no modo local nenhuma
+    delas é carregada, e o import de main.py fica restrito a pandas/numpy.
+    """
+    from google.colab import auth
+    from google.auth import default
+    from googleapiclient.discovery import build
+    import gspread
+
+    auth.authenticate_user()
+    creds, _ = default()
+    return gspread.authorize(creds), build('drive', 'v3', credentials=creds)
+
+def media_upload(path: str, mimetype: str = XLSX_MIMETYPE) -> Any:
+    from googleapiclient.http import MediaFileUpload
+    return MediaFileUpload(path, mimetype=mimetype)
+
+def open_or_create_worksheet(spreadsheet: Any, tab_name: str, rows: int = 1000, cols: int = 20) -> Any:
+    import gspread
+    try:
+        return spreadsheet.worksheet(tab_name)
+    except gspread.WorksheetNotFound:
+        return spreadsheet.add_worksheet(title=tab_name, rows=rows, cols=cols)
+
+def gspread_dataframe() -> Any:
+    """Módulo gspread_dataframe, ou None se não estiver instalado."""
+    try:
+        import gspread_dataframe
+        return gspread_dataframe
+    except ImportError:
+        return None
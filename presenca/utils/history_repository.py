@@ -0,0 +1,567 @@
+import logging
+import os
+import sqlite3
+import unicodedata
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterable, Iterator, List, Optional
+import pandas as pd
+import schema
+from .dtype_policy import DtypePolicy
+from .student_keys import StudentKeyRegistry
+
+log = logging.getLogger(__name__)
+
+LAST_SEEN_COLUMNS = ['nome_norm', 'Nome', 'Data']
+TABELA_COLUMNS = ['tipo', 'chave', 'nome', 'data']
+TIPO_ID, TIPO_PERIODO, TIPO_SEMEADO = 'id', '_periodo', '_semeado'
+# Nomes de origens diferentes não se misturam: nome do relatório semanal (nome
+# completo do cadastro) em semanas com presença ou justificativa, o mesmo nome
+# em qualquer semana listada, e nome biométrico das batidas.
+TIPO_NOME_PRESENTE = 'nome_relatorio'
+TIPO_NOME_LISTADO = 'nome_relatorio_listado'
+TIPO_NOME_BIOMETRIA = 'nome_biometria'
+_FIM_DOS_TEMPOS = date(2262, 4, 1)
+
+def normalize_name(series: pd.Series) -> pd.Series:
+    """Maiúsculas, sem espaços nas pontas, sem '.0' final e sem acentos (feito uma vez por valor distinto)."""
+    s = series.astype(str).str.upper().str.strip().str.replace(r'\.0$', '', regex=True)
+    uniques = pd.unique(s)
+    sem_acento = [''.join(c for c in unicodedata.normalize('NFD', x) if unicodedata.category(c) != 'Mn')
+                  for x in uniques]
+    return s.map(dict(zip(uniques, sem_acento)))
+
+def punch_days(punches: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Dias distintos com batida por nome biométrico: colunas nome, nome_norm e data ('YYYY-MM-DD')."""
+    col_nome = 'Name' if punches is not None and 'Name' in punches.columns else schema.COL_NOME_ENTRADA
+    if punches is None or punches.empty or col_nome not in punches.columns:
+        return pd.DataFrame(columns=['nome', 'nome_norm', 'data'])
+
+    dias = pd.DataFrame({
+        'nome': punches[col_nome].astype(str),
+        'data': pd.to_datetime(punches['Datetime'], errors='coerce').dt.strftime('%Y-%m-%d'),
+    }).dropna().drop_duplicates()
+    dias['nome_norm'] = normalize_name(dias['nome'])
+    return dias.drop_duplicates(['nome_norm', 'data'])[['nome', 'nome_norm', 'data']]
+
+def ids_last_seen(presence_cube, key_registry: Optional[StudentKeyRegistry],
+                  report_raw: Optional[pd.DataFrame] = None) -> pd.Series:
+    """
+    Último dia visto no período por ID StoneLab: o último dia com presença no
+    cubo e, para semanas justificadas do report_raw, a própria semana (mesma
+    regra de "visto" das consultas ao histórico).
+    """
+    partes = []
+    if presence_cube is not None and key_registry is not None and len(presence_cube):
+        ultimos = presence_cube.last_presence()
+        partes.append(pd.Series(ultimos.to_numpy(), index=key_registry.decode(ultimos.index)))
+
+    if report_raw is not None and not report_raw.empty and {
+            schema.DB_HIST_COL_ID, schema.DB_HIST_COL_DATE, schema.DB_HIST_COL_SITUACAO} <= set(report_raw.columns):
+        just = report_raw[report_raw[schema.DB_HIST_COL_SITUACAO].astype(str).str.strip() == schema.STATUS_JUSTIFICADO]
+        partes.append(pd.Series(pd.to_datetime(just[schema.DB_HIST_COL_DATE], errors='coerce').to_numpy(),
+                                index=StudentKeyRegistry.canonicalize(just[schema.DB_HIST_COL_ID]).to_numpy()))
+
+    partes = [p[p.notna() & p.index.notna()] for p in partes]
+    if not any(len(p) for p in partes):
+        return pd.Series(dtype='datetime64[ns]')
+    todos = pd.concat([p for p in partes if len(p)])
+    return todos.groupby(level=0).max()
+
+def _find_col(df: pd.DataFrame, options: Iterable[str]) -> Optional[str]:
+    cols_lower = {c.lower(): c for c in df.columns}
+    for opt in options:
+        if opt.lower() in cols_lower:
+            return cols_lower[opt.lower()]
+    return None
+
+def report_rows(df: pd.DataFrame, ref_date: date, present_only: bool) -> pd.DataFrame:
+    """Linhas semanais (<= ref_date) com a data em '_data'; present_only deixa só semanas com presença ou justificativa."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    col_freq_obs = _find_col(df, [schema.DB_HIST_COL_FREQ_OBS])
+    col_situacao = _find_col(df, [schema.DB_HIST_COL_SITUACAO])
+    if present_only and col_freq_obs and col_situacao:
+        freq = pd.to_numeric(df[col_freq_obs], errors='coerce').fillna(0)
+        situacao = df[col_situacao].astype(str).str.strip()
+        df = df[(freq > 0) | (situacao == schema.STATUS_JUSTIFICADO)]
+
+    col_date = _find_col(df, [schema.DB_HIST_COL_DATE, schema.OUT_COL_ULTIMA_PRESENCA, 'Date'])
+    if col_date is None:
+        return pd.DataFrame()
+    df = df.assign(_data=pd.to_datetime(df[col_date], errors='coerce'))
+    return df[df['_data'].notna() & (df['_data'] <= pd.Timestamp(ref_date))]
+
+def report_names_last_seen(rows: pd.DataFrame) -> pd.DataFrame:
+    """Última semana por nome normalizado (LAST_SEEN_COLUMNS) das linhas de report_rows."""
+    col_name = _find_col(rows, [schema.DB_HIST_COL_NOME, 'Nome', 'name']) if not rows.empty else None
+    if col_name is None:
+        return pd.DataFrame(columns=LAST_SEEN_COLUMNS)
+
+    rows = rows[rows[col_name].notna()]
+    names = rows[col_name].astype(str)
+    return pd.DataFrame({'nome_norm': normalize_name(names), 'Nome': names, 'Data': rows['_data']}).groupby(
+        'nome_norm', sort=False).agg(Nome=('Nome', 'first'), Data=('Data', 'max')).reset_index()[LAST_SEEN_COLUMNS]
+
+class HistoryRepository(ABC):
+    """
+    Consultas sobre o histórico de meses anteriores (report_raw semanal).
+
+    As abas de inatividade e de limpeza de biometria só precisam de "última
+    vez visto" por aluno e por nome; o repositório responde isso e esconde se
+    o histórico mora no CSV mestre ou num banco SQLite indexado.
+
+    A resposta vem de uma tabela materializada (tipo, chave, nome, data) com
+    uma linha por ID StoneLab e, separados por tipo, por nome do relatório
+    (com presença ou só listado) e por nome biométrico, atualizada a cada
+    execução com o máximo entre o que já estava gravado e o período
+    (update_last_seen). Cada tipo é semeado uma vez com a varredura da sua
+    origem (histórico semanal ou batidas gravadas) e marcado com uma linha
+    '_semeado'; até a primeira gravação, as consultas varrem o histórico. Uma linha '_periodo' guarda o fim do último período gravado:
+    relatórios de meses anteriores a ele (reprocessamentos) voltam a varrer o
+    histórico, já que a tabela só guarda o máximo.
+    """
+
+    def last_seen_by_key(self, ref_date: date, key_registry: StudentKeyRegistry) -> pd.Series:
+        """Último dia (<= ref_date) com presença ou justificativa, por chave de aluno."""
+        tabela = self.last_seen_table(ref_date)
+        if tabela is None:
+            por_id = self._scan_by_id(ref_date)
+        else:
+            ids = tabela[tabela['tipo'] == TIPO_ID]
+            por_id = pd.Series(pd.to_datetime(ids['data'], errors='coerce').to_numpy(), index=ids['chave'].to_numpy())
+        if por_id.empty:
+            return pd.Series(dtype='datetime64[ns]')
+
+        keys = key_registry.encode(pd.Series(por_id.index), register=False)
+        valid = keys != StudentKeyRegistry.MISSING
+        dates = pd.Series(por_id.to_numpy()[valid])
+        return dates.groupby(keys[valid]).max()
+
+    def last_seen_by_name(self, ref_date: date, present_only: bool = True) -> pd.DataFrame:
+        """
+        Último dia visto (<= ref_date) por nome do relatório semanal, normalizado:
+        colunas nome_norm, Nome, Data. present_only conta só semanas com presença
+        ou justificativa; sem ele, qualquer semana em que o nome foi listado.
+        """
+        tabela = self.last_seen_table(ref_date)
+        if tabela is None:
+            return self._scan_by_name(ref_date, present_only)
+        return self._names(tabela, TIPO_NOME_PRESENTE if present_only else TIPO_NOME_LISTADO)
+
+    def last_punch_by_name(self, ref_date: date) -> pd.DataFrame:
+        """Último dia com batida (<= ref_date) por nome biométrico normalizado (LAST_SEEN_COLUMNS)."""
+        tabela = self.last_seen_table(ref_date)
+        if tabela is None:
+            return self._scan_punches(ref_date)
+        return self._names(tabela, TIPO_NOME_BIOMETRIA)
+
+    def last_seen_table(self, ref_date: date) -> Optional[pd.DataFrame]:
+        """Tabela materializada, ou None se ainda não existe ou se ref_date é anterior ao último período gravado."""
+        tabela = self._read_last_seen()
+        if tabela is None:
+            return None
+        periodo = tabela.loc[tabela['tipo'] == TIPO_PERIODO, 'data']
+        if not periodo.empty and periodo.iloc[0] > str(ref_date):
+            log.info(f"Histórico: {ref_date} é anterior ao último período gravado ({periodo.iloc[0]}). "
+                     "Varrendo o histórico completo.")
+            return None
+        return tabela
+
+    def update_last_seen(self, period_end: date, by_id: pd.Series, punches: Optional[pd.DataFrame] = None,
+                         report_raw: Optional[pd.DataFrame] = None):
+        """Funde (máximo) o último dia visto do período por ID, por nome do relatório e por nome biométrico na tabela."""
+        self._ensure_last_seen()
+        by_id = by_id[by_id.notna()]
+        dias = punch_days(punches)
+        por_nome = pd.DataFrame({'nome_norm': dias['nome_norm'], 'Nome': dias['nome'], 'Data': dias['data']}).groupby(
+            'nome_norm', sort=False).agg(Nome=('Nome', 'first'), Data=('Data', 'max')).reset_index()
+
+        linhas = pd.concat([
+            self._id_rows(by_id),
+            self._name_rows(TIPO_NOME_PRESENTE, report_names_last_seen(report_rows(report_raw, period_end, True))),
+            self._name_rows(TIPO_NOME_LISTADO, report_names_last_seen(report_rows(report_raw, period_end, False))),
+            self._name_rows(TIPO_NOME_BIOMETRIA, por_nome),
+            pd.DataFrame({'tipo': [TIPO_PERIODO], 'chave': [''], 'nome': [''], 'data': [str(period_end)]}),
+        ], ignore_index=True)[TABELA_COLUMNS]
+        self._merge_last_seen(linhas)
+        log.info(f"Histórico: Última presença atualizada ({len(by_id)} IDs, {len(por_nome)} nomes biométricos).")
+
+    def _ensure_last_seen(self):
+        """Semeia, uma única vez, cada tipo da tabela que ainda não foi semeado, pela varredura da sua origem."""
+        tabela = self._read_last_seen()
+        semeados = set() if tabela is None else set(tabela.loc[tabela['tipo'] == TIPO_SEMEADO, 'chave'])
+        sementes = {
+            TIPO_ID: lambda: self._id_rows(self._scan_by_id(_FIM_DOS_TEMPOS)),
+            TIPO_NOME_PRESENTE: lambda: self._name_rows(TIPO_NOME_PRESENTE, self._scan_by_name(_FIM_DOS_TEMPOS, True)),
+            TIPO_NOME_LISTADO: lambda: self._name_rows(TIPO_NOME_LISTADO, self._scan_by_name(_FIM_DOS_TEMPOS, False)),
+            TIPO_NOME_BIOMETRIA: lambda: self._name_rows(TIPO_NOME_BIOMETRIA, self._scan_punches(_FIM_DOS_TEMPOS)),
+        }
+        faltando = [tipo for tipo in sementes if tipo not in semeados]
+        if not faltando:
+            return
+
+        log.info(f"Histórico: Semeando a tabela de última presença ({', '.join(faltando)})...")
+        partes = [sementes[tipo]() for tipo in faltando]
+        partes.append(pd.DataFrame({'tipo': TIPO_SEMEADO, 'chave': faltando, 'nome': '', 'data': ''}))
+        if tabela is None:
+            datas = pd.concat([p['data'] for p in partes[:-1]])
+            datas = datas[datas != '']
+            partes.append(pd.DataFrame({'tipo': [TIPO_PERIODO], 'chave': [''], 'nome': [''],
+                                        'data': [datas.max() if len(datas) else '']}))
+        self._merge_last_seen(pd.concat(partes, ignore_index=True)[TABELA_COLUMNS])
+
+    @staticmethod
+    def _id_rows(by_id: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame({'tipo': TIPO_ID, 'chave': by_id.index.astype(str), 'nome': '',
+                             'data': pd.to_datetime(by_id).dt.strftime('%Y-%m-%d').to_numpy()})
+
+    @staticmethod
+    def _name_rows(tipo: str, nomes: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({'tipo': tipo, 'chave': nomes['nome_norm'].astype(str).to_numpy(),
+                             'nome': nomes['Nome'].astype(str).to_numpy(),
+                             'data': pd.to_datetime(nomes['Data']).dt.strftime('%Y-%m-%d').to_numpy()})
+
+    @staticmethod
+    def _names(tabela: pd.DataFrame, tipo: str) -> pd.DataFrame:
+        nomes = tabela[tabela['tipo'] == tipo]
+        return pd.DataFrame({
+            'nome_norm': nomes['chave'].to_numpy(),
+            'Nome': nomes['nome'].to_numpy(),
+            'Data': pd.to_datetime(nomes['data'], errors='coerce').to_numpy(),
+        })
+
+    @abstractmethod
+    def _scan_by_id(self, ref_date: date) -> pd.Series:
+        """Varredura: semana mais recente (<= ref_date) com presença ou justificativa, por ID canônico."""
+
+    @abstractmethod
+    def _scan_by_name(self, ref_date: date, present_only: bool) -> pd.DataFrame:
+        """Varredura: última semana (<= ref_date) por nome normalizado (LAST_SEEN_COLUMNS)."""
+
+    @abstractmethod
+    def _scan_punches(self, ref_date: date) -> pd.DataFrame:
+        """Varredura: último dia com batida (<= ref_date) por nome biométrico normalizado (LAST_SEEN_COLUMNS)."""
+
+    @abstractmethod
+    def _read_last_seen(self) -> Optional[pd.DataFrame]:
+        """Tabela materializada (TABELA_COLUMNS, datas como texto), ou None se ainda não existe."""
+
+    @abstractmethod
+    def _merge_last_seen(self, linhas: pd.DataFrame):
+        """Grava as linhas mantendo, por (tipo, chave), a maior data e o primeiro nome."""
+
+    @abstractmethod
+    def record_risk_snapshot(self, snapshot: pd.DataFrame, ref_date: Optional[date] = None):
+        """
+        Grava a foto de risco (schema.DB_INATIVIDADE_COLUNAS) na partição da sua
+        Semana (ou de ref_date, se a foto estiver vazia), substituindo-a.
+        """
+
+    @abstractmethod
+    def previous_risk_snapshot(self, ref_date: date) -> Optional[pd.DataFrame]:
+        """Foto de risco da partição mais recente anterior a ref_date; None se não houver nenhuma."""
+
+    @staticmethod
+    def _risk_partition(snapshot: pd.DataFrame, ref_date: Optional[date] = None) -> str:
+        semanas = pd.to_datetime(snapshot[schema.OUT_COL_SEMANA], errors='coerce').dropna().unique()
+        if len(semanas) > 1:
+            raise ValueError(f"Foto de risco com mais de uma Semana: {sorted(map(str, semanas))}")
+        if len(semanas) == 1:
+            return pd.Timestamp(semanas[0]).strftime('%Y-%m-%d')
+        if ref_date is None:
+            raise ValueError("Foto de risco vazia sem Semana de referência.")
+        return str(ref_date)
+
+    @staticmethod
+    def _risk_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Tipos da foto de risco lida do disco: datas e dias ausentes numéricos."""
+        df = df.reindex(columns=schema.DB_INATIVIDADE_COLUNAS)
+        return df.assign(**{
+            schema.OUT_COL_SEMANA: pd.to_datetime(df[schema.OUT_COL_SEMANA], errors='coerce'),
+            schema.OUT_COL_NIVEL_DESDE: pd.to_datetime(df[schema.OUT_COL_NIVEL_DESDE], errors='coerce'),
+            schema.OUT_COL_DIAS_AUSENTE: pd.to_numeric(df[schema.OUT_COL_DIAS_AUSENTE], errors='coerce'),
+        })
+
+    def record_report(self, report_raw: pd.DataFrame):
+        """Grava as linhas semanais do período. O CSV mestre é mantido pelo DataWriter."""
+
+    def record_daily_presence(self, punches: pd.DataFrame):
+        """Grava os dias com batida (nome biométrico e Datetime) do período."""
+
+class CsvHistoryRepository(HistoryRepository):
+    """
+    Histórico no CSV mestre (STONE_LAB_DATABASE_HISTORICO.csv), lido inteiro só
+    nas varreduras; a última presença fica num CSV pequeno ao lado dele e as
+    fotos de risco, uma por arquivo, na pasta Alerta_Inatividade_Historico/.
+    """
+
+    def __init__(self, dashboard_dir: str):
+        self.path = os.path.join(dashboard_dir, schema.ARQUIVO_DB_HISTORICO)
+        self.last_seen_path = os.path.join(dashboard_dir, schema.ARQUIVO_ULTIMA_PRESENCA)
+        self.risk_dir = os.path.join(dashboard_dir, schema.ABA_DB_INATIVIDADE)
+
+    def _read(self, **kwargs) -> pd.DataFrame:
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        try:
+            return DtypePolicy().apply_to_history(pd.read_csv(self.path, **kwargs))
+        except Exception as e:
+            log.warning(f"Histórico: Erro ao ler {self.path}: {e}")
+            return pd.DataFrame()
+
+    def _valid_rows(self, ref_date: date, present_only: bool) -> pd.DataFrame:
+        return report_rows(self._read(dtype=str), ref_date, present_only)
+
+    def _scan_by_id(self, ref_date: date) -> pd.Series:
+        df = self._valid_rows(ref_date, present_only=True)
+        col_key = _find_col(df, [schema.DB_HIST_COL_ID, 'id_stonelab', 'ID']) if not df.empty else None
+        if col_key is None:
+            return pd.Series(dtype='datetime64[ns]')
+
+        ids = StudentKeyRegistry.canonicalize(df[col_key])
+        return df['_data'][ids.notna()].groupby(ids[ids.notna()]).max()
+
+    def _scan_by_name(self, ref_date: date, present_only: bool) -> pd.DataFrame:
+        return report_names_last_seen(self._valid_rows(ref_date, present_only))
+
+    def _scan_punches(self, ref_date: date) -> pd.DataFrame:
+        # O CSV mestre só tem linhas semanais: nomes biométricos entram na tabela a partir das execuções.
+        return pd.DataFrame(columns=LAST_SEEN_COLUMNS)
+
+    def _read_last_seen(self) -> Optional[pd.DataFrame]:
+        if not os.path.exists(self.last_seen_path):
+            return None
+        return pd.read_csv(self.last_seen_path, dtype=str, keep_default_na=False)[TABELA_COLUMNS]
+
+    def _merge_last_seen(self, linhas: pd.DataFrame):
+        atual = self._read_last_seen()
+        tabela = linhas if atual is None else pd.concat([atual, linhas], ignore_index=True)
+        tabela = tabela.groupby(['tipo', 'chave'], sort=False).agg(nome=('nome', 'first'), data=('data', 'max'))
+        os.makedirs(os.path.dirname(os.path.abspath(self.last_seen_path)), exist_ok=True)
+        tabela.reset_index()[TABELA_COLUMNS].to_csv(self.last_seen_path, index=False)
+
+    def _risk_partitions(self) -> List[str]:
+        if not os.path.isdir(self.risk_dir):
+            return []
+        prefixo, sufixo = schema.ARQUIVO_PARTICAO_INATIVIDADE.split('{semana}')
+        return sorted(f[len(prefixo):-len(sufixo)] for f in os.listdir(self.risk_dir)
+                      if f.startswith(prefixo) and f.endswith(sufixo))
+
+    def record_risk_snapshot(self, snapshot: pd.DataFrame, ref_date: Optional[date] = None):
+        semana = self._risk_partition(snapshot, ref_date)
+        os.makedirs(self.risk_dir, exist_ok=True)
+        path = os.path.join(self.risk_dir, schema.ARQUIVO_PARTICAO_INATIVIDADE.format(semana=semana))
+        # Grava ao lado e troca: uma partição nunca fica pela metade.
+        snapshot.reindex(columns=schema.DB_INATIVIDADE_COLUNAS).to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+        log.info(f"Histórico: Foto de risco ({len(snapshot)} alunos) gravada em {path}.")
+
+    def previous_risk_snapshot(self, ref_date: date) -> Optional[pd.DataFrame]:
+        anteriores = [s for s in self._risk_partitions() if s < str(ref_date)]
+        if not anteriores:
+            return None
+        path = os.path.join(self.risk_dir, schema.ARQUIVO_PARTICAO_INATIVIDADE.format(semana=anteriores[-1]))
+        return self._risk_frame(pd.read_csv(path, dtype=str))
+
+class SqliteHistoryRepository(HistoryRepository):
+    """
+    Histórico num banco SQLite embutido, com índices por id, nome e semana.
+
+    Guarda as linhas semanais do report_raw e os dias com batida por nome
+    biométrico; as consultas de última presença e de última batida viram
+    consultas indexadas que devolvem uma linha por pessoa, sem carregar o
+    histórico inteiro em memória.
+    Na primeira abertura importa o CSV mestre, se existir.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS report_semanal (
+            id TEXT, nome TEXT, nome_norm TEXT, coordenador TEXT, semana TEXT NOT NULL,
+            freq_obs REAL, freq_esp REAL, dias_uteis REAL, situacao TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ix_report_id ON report_semanal (id, semana);
+        CREATE INDEX IF NOT EXISTS ix_report_nome ON report_semanal (nome_norm, semana);
+        CREATE INDEX IF NOT EXISTS ix_report_semana ON report_semanal (semana);
+        CREATE TABLE IF NOT EXISTS presenca_diaria (
+            nome_norm TEXT NOT NULL, data TEXT NOT NULL, nome TEXT,
+            PRIMARY KEY (nome_norm, data)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS ix_presenca_data ON presenca_diaria (data);
+        CREATE TABLE IF NOT EXISTS ultima_presenca (
+            tipo TEXT NOT NULL, chave TEXT NOT NULL, nome TEXT NOT NULL, data TEXT NOT NULL,
+            PRIMARY KEY (tipo, chave)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS alerta_inatividade (
+            semana TEXT NOT NULL, nome TEXT, nome_norm TEXT, coordenador TEXT,
+            risco TEXT, dias_ausente INTEGER, desde TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ix_alerta_semana ON alerta_inatividade (semana, nome_norm);
+        CREATE TABLE IF NOT EXISTS alerta_particoes (semana TEXT PRIMARY KEY);
+    """
+
+    REPORT_COLUMNS = {
+        schema.DB_HIST_COL_ID: 'id',
+        schema.DB_HIST_COL_NOME: 'nome',
+        schema.DB_HIST_COL_COORDENADOR: 'coordenador',
+        schema.DB_HIST_COL_DATE: 'semana',
+        schema.DB_HIST_COL_FREQ_OBS: 'freq_obs',
+        schema.DB_HIST_COL_FREQ_ESP: 'freq_esp',
+        schema.DB_HIST_COL_DIAS_UTEIS: 'dias_uteis',
+        schema.DB_HIST_COL_SITUACAO: 'situacao',
+    }
+
+    RISK_COLUMNS = {
+        schema.OUT_COL_SEMANA: 'semana',
+        schema.OUT_COL_NOME: 'nome',
+        schema.OUT_COL_COORDENADOR: 'coordenador',
+        schema.OUT_COL_RISCO: 'risco',
+        schema.OUT_COL_DIAS_AUSENTE: 'dias_ausente',
+        schema.OUT_COL_NIVEL_DESDE: 'desde',
+    }
+
+    def __init__(self, path: str, csv_seed: Optional[str] = None):
+        self.path = path
+        novo = not os.path.exists(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.executescript(self.SCHEMA)
+        if novo and csv_seed and os.path.exists(csv_seed):
+            log.info(f"Histórico: Importando {csv_seed} para {path}...")
+            self.record_report(pd.read_csv(csv_seed, dtype=str))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.path)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        with self._connect() as con:
+            return pd.read_sql_query(sql, con, params=params)
+
+    def record_report(self, report_raw: pd.DataFrame):
+        if report_raw is None or report_raw.empty or schema.DB_HIST_COL_DATE not in report_raw.columns:
+            return
+
+        rows = pd.DataFrame({
+            col: report_raw[src] if src in report_raw.columns else None
+            for src, col in self.REPORT_COLUMNS.items()
+        })
+        rows['semana'] = pd.to_datetime(rows['semana'], errors='coerce').dt.strftime('%Y-%m-%d')
+        rows = rows[rows['semana'].notna()]
+        for col in ('freq_obs', 'freq_esp', 'dias_uteis'):
+            rows[col] = pd.to_numeric(rows[col], errors='coerce')
+        for col in ('id', 'nome', 'coordenador', 'situacao'):
+            rows[col] = rows[col].astype(object).where(rows[col].notna(), None)
+            rows[col] = rows[col].map(lambda v: None if v is None else str(v).strip())
+        rows['nome_norm'] = normalize_name(rows['nome']).where(rows['nome'].notna(), None)
+
+        semanas = [(s,) for s in rows['semana'].unique()]
+        colunas = ['id', 'nome', 'nome_norm', 'coordenador', 'semana', 'freq_obs', 'freq_esp', 'dias_uteis', 'situacao']
+        valores = rows[colunas].astype(object).where(rows[colunas].notna(), None).itertuples(index=False, name=None)
+        with self._connect() as con:
+            # Semanas regravadas substituem as antigas, como no CSV mestre.
+            con.executemany("DELETE FROM report_semanal WHERE semana = ?", semanas)
+            con.executemany(f"INSERT INTO report_semanal ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+                            valores)
+        log.info(f"Histórico: {len(rows)} linhas semanais gravadas em {self.path}.")
+
+    def record_daily_presence(self, punches: pd.DataFrame):
+        dias = punch_days(punches)
+        if dias.empty:
+            return
+
+        with self._connect() as con:
+            con.executemany("INSERT OR IGNORE INTO presenca_diaria (nome_norm, data, nome) VALUES (?, ?, ?)",
+                            dias[['nome_norm', 'data', 'nome']].itertuples(index=False, name=None))
+        log.info(f"Histórico: {len(dias)} dias de presença gravados em {self.path}.")
+
+    def _scan_by_id(self, ref_date: date) -> pd.Series:
+        df = self._query(
+            "SELECT id, MAX(semana) AS semana FROM report_semanal "
+            "WHERE id IS NOT NULL AND semana <= ? AND (freq_obs > 0 OR situacao = ?) GROUP BY id",
+            (str(ref_date), schema.STATUS_JUSTIFICADO))
+        if df.empty:
+            return pd.Series(dtype='datetime64[ns]')
+
+        ids = StudentKeyRegistry.canonicalize(df['id'])
+        dates = pd.to_datetime(df['semana'])
+        return dates[ids.notna()].groupby(ids[ids.notna()]).max()
+
+    def _scan_by_name(self, ref_date: date, present_only: bool) -> pd.DataFrame:
+        filtro = "AND (freq_obs > 0 OR situacao = ?)" if present_only else ""
+        params = (str(ref_date), schema.STATUS_JUSTIFICADO) if present_only else (str(ref_date),)
+        df = self._query(
+            "SELECT nome_norm, nome AS Nome, MAX(semana) AS Data FROM report_semanal "
+            f"WHERE nome_norm IS NOT NULL AND semana <= ? {filtro} GROUP BY nome_norm", params)
+        df['Data'] = pd.to_datetime(df['Data'])
+        return df[LAST_SEEN_COLUMNS]
+
+    def _read_last_seen(self) -> Optional[pd.DataFrame]:
+        df = self._query("SELECT tipo, chave, nome, data FROM ultima_presenca")
+        return None if df.empty else df
+
+    def _merge_last_seen(self, linhas: pd.DataFrame):
+        with self._connect() as con:
+            con.executemany(
+                "INSERT INTO ultima_presenca (tipo, chave, nome, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (tipo, chave) DO UPDATE SET data = MAX(data, excluded.data)",
+                linhas[TABELA_COLUMNS].astype(str).itertuples(index=False, name=None))
+
+    def record_risk_snapshot(self, snapshot: pd.DataFrame, ref_date: Optional[date] = None):
+        semana = self._risk_partition(snapshot, ref_date)
+        rows = snapshot.reindex(columns=list(self.RISK_COLUMNS)).rename(columns=self.RISK_COLUMNS)
+        rows['semana'] = semana
+        rows['desde'] = pd.to_datetime(rows['desde'], errors='coerce').dt.strftime('%Y-%m-%d')
+        rows['dias_ausente'] = pd.to_numeric(rows['dias_ausente'], errors='coerce')
+        rows['nome_norm'] = normalize_name(rows['nome']) if len(rows) else rows['nome']
+
+        colunas = ['semana', 'nome', 'nome_norm', 'coordenador', 'risco', 'dias_ausente', 'desde']
+        valores = rows[colunas].astype(object).where(rows[colunas].notna(), None).itertuples(index=False, name=None)
+        with self._connect() as con:
+            con.execute("DELETE FROM alerta_inatividade WHERE semana = ?", (semana,))
+            con.executemany(f"INSERT INTO alerta_inatividade ({', '.join(colunas)}) "
+                            f"VALUES ({', '.join('?' * len(colunas))})", valores)
+            con.execute("INSERT OR IGNORE INTO alerta_particoes (semana) VALUES (?)", (semana,))
+        log.info(f"Histórico: Foto de risco ({len(rows)} alunos, semana {semana}) gravada em {self.path}.")
+
+    def previous_risk_snapshot(self, ref_date: date) -> Optional[pd.DataFrame]:
+        semana = self._query("SELECT MAX(semana) AS semana FROM alerta_particoes WHERE semana < ?", (str(ref_date),))
+        if semana.empty or semana['semana'].isna().all():
+            return None
+        df = self._query("SELECT semana, nome, coordenador, risco, dias_ausente, desde "
+                         "FROM alerta_inatividade WHERE semana = ?", (semana['semana'].iloc[0],))
+        return self._risk_frame(df.rename(columns={v: k for k, v in self.RISK_COLUMNS.items()}))
+
+    def _scan_punches(self, ref_date: date) -> pd.DataFrame:
+        df = self._query(
+            "SELECT nome_norm, nome AS Nome, MAX(data) AS Data FROM presenca_diaria "
+            "WHERE data <= ? GROUP BY nome_norm", (str(ref_date),))
+        df['Data'] = pd.to_datetime(df['Data'])
+        return df[LAST_SEEN_COLUMNS]
+
+def history_dir(config: object) -> str:
+    """
+    Pasta do histórico local: 'output_dashboard' (chave lida historicamente pelas
+    abas de inatividade) ou a mesma pasta em que o DataWriter grava o CSV mestre.
+    """
+    caminhos = (getattr(config, 'CAMINHOS', {}) or {}).get('local', {})
+    return (caminhos.get('output_dashboard') or caminhos.get('dashboard')
+            or os.path.join(caminhos.get('output', "output"), "output-dashboard"))
+
+def build_history_repository(config: object) -> HistoryRepository:
+    """HISTORICO_BACKEND = 'csv' (padrão) ou 'sqlite' (arquivo HISTORICO_SQLITE, por padrão na pasta do histórico)."""
+    pasta = history_dir(config)
+    backend = getattr(config, 'HISTORICO_BACKEND', 'csv')
+    if backend == 'sqlite':
+        path = getattr(config, 'HISTORICO_SQLITE', None) or os.path.join(pasta, schema.ARQUIVO_DB_HISTORICO_SQLITE)
+        return SqliteHistoryRepository(path, csv_seed=os.path.join(pasta, schema.ARQUIVO_DB_HISTORICO))
+    if backend != 'csv':
+        raise ValueError(f"Backend de histórico desconhecido: '{backend}'. Use 'csv' ou 'sqlite'.")
+    return CsvHistoryRepository(pasta)
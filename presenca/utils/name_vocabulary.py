@@ -0,0 +1,129 @@
+import logging
+from typing import Dict, Iterable
+import numpy as np
+import pandas as pd
+import schema
+
+log = logging.getLogger(__name__)
+
+class NameVocabulary:
+    """
+    Vocabulário dos nomes das batidas (XML), fatorado uma única vez na
+    ingestão. A coluna de nomes vira categórica sobre esse vocabulário, de
+    modo que cada batida carrega apenas o código do nome.
+
+    Regras por nome (ignorado, cadastrado, situação de cadastro, chave do
+    aluno) são calculadas como arrays sobre os nomes distintos e aplicadas
+    às batidas por consulta de código.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names = pd.Index(pd.unique(pd.Series(list(names), dtype=object).dropna()), dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> 'NameVocabulary':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return cls(series.cat.categories)
+        return cls(series)
+
+    def apply_to_sources(self, data_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Fatora os nomes de 'registros_brutos' e guarda o vocabulário em
+        'name_vocabulary' de um novo dicionário; as fontes recebidas não são alteradas.
+        """
+        data_frames = dict(data_frames)
+        df_registros = data_frames.get('registros_brutos')
+        if df_registros is not None and not df_registros.empty and 'Name' in df_registros.columns:
+            vocabulary = self.from_series(df_registros['Name'])
+            self.names = vocabulary.names
+            data_frames['registros_brutos'] = df_registros.assign(
+                Name=pd.Categorical(df_registros['Name'], categories=self.names))
+            log.info(f"Vocabulário: {len(self)} nomes distintos em {len(df_registros)} batidas.")
+        data_frames['name_vocabulary'] = self
+        return data_frames
+
+    def codes(self, series: pd.Series) -> np.ndarray:
+        """Código de cada valor no vocabulário (-1 para nomes fora dele)."""
+        if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.categories.equals(self.names):
+            return series.cat.codes.to_numpy()
+        return self.names.get_indexer(pd.Index(series, dtype=object))
+
+    def isin(self, values: Iterable[str]) -> np.ndarray:
+        """Máscara booleana sobre o vocabulário."""
+        return self.names.isin(list(values))
+
+    def rows(self, flags: np.ndarray, series: pd.Series) -> np.ndarray:
+        """Propaga uma máscara do vocabulário para as linhas de `series`."""
+        codes = self.codes(series)
+        result = np.zeros(len(codes), dtype=bool)
+        known = codes >= 0
+        result[known] = np.asarray(flags, dtype=bool)[codes[known]]
+        return result
+
+    def lookup(self, mapping: pd.Series, default) -> np.ndarray:
+        """Valor de `mapping` (indexado por nome) para cada nome do vocabulário."""
+        mapping = mapping[~mapping.index.duplicated(keep='first')]
+        return mapping.reindex(self.names).fillna(default).to_numpy()
+
+    def registration_flags(self, df_cadastro: pd.DataFrame, df_ignorar: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Máscaras sobre o vocabulário, montadas uma única vez a partir do
+        cadastro e da lista de ignorados; a limpeza das batidas (ignored) e a
+        aba de ações (classify) leem as mesmas máscaras:
+
+            ignorar            nome na lista de ignorados
+            cadastro_entrada   nome_entrada de alguém do cadastro
+            cadastro_completo  nome completo de alguém do cadastro
+            real_ignorado      nome_entrada cujo nome completo está na lista de ignorados
+        """
+        ignorar = set(df_ignorar.iloc[:, 0].dropna().unique()) if not df_ignorar.empty else set()
+
+        cadastro_entrada = np.zeros(len(self), dtype=bool)
+        cadastro_completo = np.zeros(len(self), dtype=bool)
+        real_ignorado = np.zeros(len(self), dtype=bool)
+        if schema.COL_NAME in df_cadastro.columns:
+            cadastro_completo = self.isin(df_cadastro[schema.COL_NAME].dropna().unique())
+        if schema.COL_NOME_ENTRADA in df_cadastro.columns:
+            cadastro_entrada = self.isin(df_cadastro[schema.COL_NOME_ENTRADA].dropna().unique())
+            if schema.COL_NAME in df_cadastro.columns:
+                entrada_para_real = df_cadastro.dropna(
+                    subset=[schema.COL_NOME_ENTRADA, schema.COL_NAME]
+                ).set_index(schema.COL_NOME_ENTRADA)[schema.COL_NAME].to_dict()
+                nome_real = self.names.map(entrada_para_real)
+                real_ignorado = np.asarray(nome_real.isin(list(ignorar)), dtype=bool)
+
+        return {
+            'ignorar': self.isin(ignorar),
+            'cadastro_entrada': cadastro_entrada,
+            'cadastro_completo': cadastro_completo,
+            'real_ignorado': real_ignorado,
+        }
+
+    @staticmethod
+    def ignored(flags: Dict[str, np.ndarray]) -> np.ndarray:
+        """Nomes removidos das batidas: estão na lista de ignorados e não são de ninguém do cadastro."""
+        return flags['ignorar'] & ~(flags['cadastro_entrada'] | flags['cadastro_completo'])
+
+    def classify(self, flags: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Situação de cadastro de cada nome (máscaras de registration_flags),
+        na ordem de prioridade: nome_entrada cadastrado (ignorado se o nome
+        real estiver na lista de ignorados), nome ignorado, nome completo
+        usado no lugar do nome_entrada e, por fim, pessoa não cadastrada.
+        """
+        conditions = [
+            flags['cadastro_entrada'] & flags['real_ignorado'],
+            flags['cadastro_entrada'],
+            flags['ignorar'],
+            flags['cadastro_completo']
+        ]
+        choices = [
+            schema.ACAO_OK_IGNORADO,
+            schema.ACAO_OK_MATCH_CORRETO,
+            schema.ACAO_OK_IGNORADO,
+            schema.ACAO_CORRIGIR_NOME
+        ]
+        return np.select(conditions, choices, default=schema.ACAO_NAO_CADASTRADO)
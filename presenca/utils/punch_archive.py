@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import shutil
+from datetime import date
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import schema
+from .history_repository import LAST_SEEN_COLUMNS, history_dir, normalize_name
+
+log = logging.getLogger(__name__)
+
+TS_FILE = 'datetime.npy'
+CODES_FILE = 'name_code.npy'
+VOCAB_FILE = 'nomes.json'
+
+class PunchArchive:
+    """
+    Arquivo colunar das batidas brutas, um mês por partição:
+
+        <pasta>/nomes.json                  vocabulário de nomes (código = posição, só cresce)
+        <pasta>/mes=YYYY-MM/datetime.npy    horários datetime64[s], em ordem crescente
+        <pasta>/mes=YYYY-MM/name_code.npy   código int32 do nome biométrico de cada batida
+
+    As partições são lidas com np.load(mmap_mode='r'): um recorte por
+    intervalo de datas é um searchsorted sobre os horários ordenados e
+    devolve views do arquivo mapeado, sem copiar nem reprocessar XMLs.
+    Regravar um mês substitui a partição inteira.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._vocab: Optional[List[str]] = None
+
+    # --- Escrita ---
+
+    def append_month(self, punches: Optional[pd.DataFrame], month: date) -> str:
+        """
+        Grava (ou substitui) a partição do mês com as batidas lidas na
+        execução; retorna a pasta da partição. Batidas fora do mês (XMLs que
+        cobrem mais de um mês) não entram: cada partição guarda só o seu mês.
+        """
+        col_nome = 'Name' if punches is not None and 'Name' in punches.columns else schema.COL_NOME_ENTRADA
+        if punches is None or punches.empty or col_nome not in punches.columns:
+            log.info("Arquivo de Batidas: Nenhuma batida para arquivar.")
+            return ""
+
+        nomes = punches[col_nome].astype(object).str.strip()
+        horarios = pd.to_datetime(punches['Datetime'], errors='coerce')
+        valid = horarios.notna() & nomes.notna() & (nomes != '')
+
+        periodo = pd.Timestamp(month).to_period('M')
+        no_mes = (horarios >= periodo.start_time) & (horarios < (periodo + 1).start_time)
+        fora_do_mes = int((valid & ~no_mes).sum())
+        if fora_do_mes:
+            log.warning(f"Arquivo de Batidas: {fora_do_mes} batidas fora de {periodo} não entram na partição do mês.")
+        valid &= no_mes
+        nomes, horarios = nomes[valid], horarios[valid].to_numpy(dtype='datetime64[s]')
+
+        codes_por_valor, uniques = pd.factorize(nomes)
+        codes = self._encode_names(list(uniques))[codes_por_valor]
+        ordem = np.argsort(horarios, kind='stable')
+
+        destino = self._partition_path(month)
+        tmp = destino + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, TS_FILE), horarios[ordem])
+        np.save(os.path.join(tmp, CODES_FILE), codes[ordem])
+        self._swap(tmp, destino)
+
+        log.info(f"Arquivo de Batidas: {len(ordem)} batidas de {len(uniques)} nomes arquivadas em {destino}.")
+        return destino
+
+    def _encode_names(self, names: List[str]) -> np.ndarray:
+        """Códigos dos nomes no vocabulário; nomes novos entram no fim (códigos antigos não mudam)."""
+        vocab = self.vocabulary
+        posicao = {nome: i for i, nome in enumerate(vocab)}
+        novos = [n for n in names if n not in posicao]
+        if novos:
+            for nome in novos:
+                posicao[nome] = len(vocab)
+                vocab.append(nome)
+            os.makedirs(self.root, exist_ok=True)
+            path = os.path.join(self.root, VOCAB_FILE)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(vocab, f, ensure_ascii=False)
+            os.replace(path + '.tmp', path)
+        return np.array([posicao[n] for n in names], dtype=np.int32)
+
+    @staticmethod
+    def _swap(tmp: str, destino: str):
+        antigo = destino + '.old'
+        if os.path.exists(destino):
+            shutil.rmtree(antigo, ignore_errors=True)
+            os.replace(destino, antigo)
+        os.replace(tmp, destino)
+        shutil.rmtree(antigo, ignore_errors=True)
+
+    # --- Leitura ---
+
+    @property
+    def vocabulary(self) -> List[str]:
+        if self._vocab is None:
+            path = os.path.join(self.root, VOCAB_FILE)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    self._vocab = json.load(f)
+            else:
+                self._vocab = []
+        return self._vocab
+
+    def months(self) -> List[str]:
+        """Meses arquivados ('YYYY-MM'), em ordem."""
+        if not os.path.isdir(self.root):
+            return []
+        prefixo = schema.ARQUIVO_PARTICAO_BATIDAS.format(mes='')
+        return sorted(d[len(prefixo):] for d in os.listdir(self.root)
+                      if d.startswith(prefixo) and not d.endswith(('.tmp', '.old')))
+
+    def slices(self, start=None, end=None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (códigos, horários) das batidas em [start, end], uma partição por vez,
+        como views dos arquivos mapeados em memória (somente leitura).
+        """
+        inicio = np.datetime64(pd.Timestamp(start), 's') if start is not None else None
+        # 'end' é inclusivo no dia: uma data sem hora cobre o dia inteiro.
+        fim = None
+        if end is not None:
+            fim = pd.Timestamp(end)
+            if fim == fim.normalize():
+                fim = fim + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+            fim = np.datetime64(fim, 's')
+
+        for mes in self.months():
+            horarios, codes = self._load(mes)
+            if horarios is None or len(horarios) == 0:
+                continue
+            a = np.searchsorted(horarios, inicio, side='left') if inicio is not None else 0
+            b = np.searchsorted(horarios, fim, side='right') if fim is not None else len(horarios)
+            if b > a:
+                yield codes[a:b], horarios[a:b]
+
+    def read(self, start=None, end=None) -> pd.DataFrame:
+        """Batidas em [start, end] como DataFrame (Name, Datetime), no formato do leitor de XMLs."""
+        partes = list(self.slices(start, end))
+        if not partes:
+            return pd.DataFrame({'Name': pd.Series(dtype=object), 'Datetime': pd.Series(dtype='datetime64[ns]')})
+        codes = np.concatenate([c for c, _ in partes])
+        horarios = np.concatenate([h for _, h in partes])
+        nomes = np.asarray(self.vocabulary, dtype=object)
+        return pd.DataFrame({'Name': nomes[codes], 'Datetime': horarios.astype('datetime64[ns]')})
+
+    def last_punch_by_name(self, ref_date: date) -> pd.DataFrame:
+        """Último dia com batida (<= ref_date) por nome biométrico normalizado, varrendo todo o arquivo."""
+        ultimo = np.full(len(self.vocabulary), np.iinfo(np.int64).min, dtype=np.int64)
+        for codes, horarios in self.slices(end=ref_date):
+            np.maximum.at(ultimo, codes, horarios.view(np.int64))
+        vistos = np.flatnonzero(ultimo != np.iinfo(np.int64).min)
+        if len(vistos) == 0:
+            return pd.DataFrame(columns=LAST_SEEN_COLUMNS)
+
+        df = pd.DataFrame({
+            'Nome': np.asarray(self.vocabulary, dtype=object)[vistos],
+            'Data': ultimo[vistos].astype('datetime64[s]').astype('datetime64[D]').astype('datetime64[ns]'),
+        })
+        df['nome_norm'] = normalize_name(df['Nome'])
+        df = df.sort_values('Data', kind='stable').drop_duplicates('nome_norm', keep='last')
+        return df[LAST_SEEN_COLUMNS].reset_index(drop=True)
+
+    def _partition_path(self, month) -> str:
+        mes = pd.Timestamp(month).strftime('%Y-%m')
+        return os.path.join(self.root, schema.ARQUIVO_PARTICAO_BATIDAS.format(mes=mes))
+
+    def _load(self, mes: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        pasta = self._partition_path(f"{mes}-01")
+        try:
+            horarios = np.load(os.path.join(pasta, TS_FILE), mmap_mode='r')
+            codes = np.load(os.path.join(pasta, CODES_FILE), mmap_mode='r')
+        except (OSError, ValueError) as e:
+            log.warning(f"Arquivo de Batidas: Partição '{mes}' ilegível ({e}). Ignorada.")
+            return None, None
+        if len(horarios) != len(codes):
+            log.warning(f"Arquivo de Batidas: Partição '{mes}' inconsistente. Ignorada.")
+            return None, None
+        return horarios, codes
+
+def build_punch_archive(config: object) -> Optional[PunchArchive]:
+    """
+    ARQUIVO_BATIDAS_DIR, se configurado; no modo local, a pasta
+    Arquivo_Batidas ao lado do histórico. Fora do modo local a pasta precisa
+    ser configurada: sem ela, não há arquivo (None).
+    """
+    pasta = getattr(config, 'ARQUIVO_BATIDAS_DIR', None)
+    if not pasta:
+        if getattr(config, 'MODO_EXECUCAO', 'local') != 'local':
+            log.info("Arquivo de Batidas: 'ARQUIVO_BATIDAS_DIR' não configurado fora do modo local. Pulando.")
+            return None
+        pasta = os.path.join(history_dir(config), schema.PASTA_ARQUIVO_BATIDAS)
+    return PunchArchive(pasta)
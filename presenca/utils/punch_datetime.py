@@ -0,0 +1,118 @@
+import logging
+import re
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+_DIRECTIVE_WIDTHS = {'Y': 4, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+_DIRECTIVE_FIELDS = {'Y': 'year', 'm': 'month', 'd': 'day', 'H': 'hour', 'M': 'minute', 'S': 'second'}
+
+class PunchDatetimeParser:
+    """
+    Converte a coluna 'Horário' da catraca em datetime64 uma única vez.
+
+    O formato do equipamento é detectado por arquivo a partir de uma amostra
+    (o que mais converte, desempatando pela ordem de FORMATS, com dia antes
+    do mês). Formatos ISO usam o caminho rápido do próprio pandas com
+    format= explícito; os demais são de largura fixa e a conversão lê os
+    dígitos direto de uma matriz de code points (numpy), sem strptime linha
+    a linha.
+    Os poucos valores fora desse layout são convertidos pelos seus valores
+    distintos e mapeados de volta, de modo que cada texto é lido uma vez.
+    """
+
+    FORMATS = [
+        '%Y-%m-%d %H:%M:%S',
+        '%d/%m/%Y %H:%M:%S',
+        '%d/%m/%Y %H:%M',
+        '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%d %H:%M',
+        '%d-%m-%Y %H:%M:%S',
+        '%m/%d/%Y %H:%M:%S',
+    ]
+
+    def __init__(self, sample_size: int = 200):
+        self.sample_size = sample_size
+
+    def detect_format(self, values: pd.Series) -> Optional[str]:
+        sample = values.dropna().astype(str).str.strip()
+        sample = sample.iloc[:self.sample_size]
+        if sample.empty:
+            return None
+
+        best_format, best_hits = None, 0
+        for fmt in self.FORMATS:
+            hits = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+            if hits > best_hits:
+                best_format, best_hits = fmt, hits
+                if hits == len(sample):
+                    break
+        return best_format
+
+    def parse(self, values: pd.Series, source: str = '') -> pd.Series:
+        """Retorna a série em datetime64[ns]; textos inválidos viram NaT."""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        if values.empty:
+            return pd.to_datetime(values, errors='coerce')
+
+        text = values.astype(str).str.strip().where(values.notna())
+        fmt = self.detect_format(text)
+        if fmt and fmt.startswith('%Y-%m-%d'):
+            parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+        elif fmt:
+            parsed = self._parse_fixed_width(text, fmt)
+        else:
+            parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+
+        pendentes = parsed.isna() & text.notna()
+        if pendentes.any():
+            distintos = pd.Series(pd.unique(text[pendentes]), dtype=object)
+            convertidos = pd.to_datetime(distintos, format='mixed', dayfirst=True, errors='coerce')
+            parsed[pendentes] = text[pendentes].map(pd.Series(convertidos.to_numpy(), index=distintos))
+            log.warning(f"Datas: {int(pendentes.sum())} horários fora do formato '{fmt}' em {source or 'registros'}.")
+
+        log.info(f"Datas: formato '{fmt}' detectado em {source or 'registros'}.")
+        return parsed
+
+    @staticmethod
+    def _layout(fmt: str) -> Tuple[List[Tuple[str, int, int]], List[Tuple[int, str]], int]:
+        """Posição de cada campo e de cada separador literal num formato de largura fixa."""
+        fields, literals, pos = [], [], 0
+        for directive, literal in re.findall(r'%(.)|(.)', fmt):
+            if directive:
+                width = _DIRECTIVE_WIDTHS[directive]
+                fields.append((_DIRECTIVE_FIELDS[directive], pos, width))
+                pos += width
+            else:
+                literals.append((pos, literal))
+                pos += 1
+        return fields, literals, pos
+
+    def _parse_fixed_width(self, text: pd.Series, fmt: str) -> pd.Series:
+        fields, literals, width = self._layout(fmt)
+        codes = text.fillna('').to_numpy(dtype=f'U{width + 1}').view(np.uint32).reshape(len(text), width + 1)
+
+        ok = codes[:, width] == 0
+        for pos, literal in literals:
+            ok &= codes[:, pos] == ord(literal)
+
+        parts = {'second': np.zeros(len(text), dtype=np.int64)}
+        for name, start, size in fields:
+            block = codes[:, start:start + size].astype(np.int64) - ord('0')
+            ok &= ((block >= 0) & (block <= 9)).all(axis=1)
+            parts[name] = block @ (10 ** np.arange(size - 1, -1, -1))
+
+        ok &= (parts['month'] >= 1) & (parts['month'] <= 12) & (parts['day'] >= 1)
+        ok &= (parts['hour'] <= 23) & (parts['minute'] <= 59) & (parts['second'] <= 59)
+
+        months = np.where(ok, (parts['year'] - 1970) * 12 + parts['month'] - 1, 0).astype('datetime64[M]')
+        days = months.astype('datetime64[D]') + np.where(ok, parts['day'] - 1, 0)
+        ok &= days.astype('datetime64[M]') == months
+
+        seconds = parts['hour'] * 3600 + parts['minute'] * 60 + parts['second']
+        stamps = (days.astype('datetime64[s]') + seconds).astype('datetime64[ns]')
+        stamps[~ok] = np.datetime64('NaT')
+        return pd.Series(stamps, index=text.index)
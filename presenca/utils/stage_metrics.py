@@ -0,0 +1,37 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict
+
+log = logging.getLogger(__name__)
+
+class StageMetrics:
+    """Acumula tempos por etapa e contadores (ex.: acertos de cache) de uma execução."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - start)
+
+    def increment(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def as_dict(self) -> dict:
+        return {
+            'timings': {k: round(v, 4) for k, v in self.timings.items()},
+            'counters': dict(self.counters)
+        }
+
+    def log_summary(self):
+        for name, seconds in self.timings.items():
+            log.info(f"Métricas: etapa '{name}' levou {seconds:.3f}s.")
+        for name, value in self.counters.items():
+            log.info(f"Métricas: {name} = {value}.")
@@ -0,0 +1,99 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+import schema
+
+log = logging.getLogger(__name__)
+
+class StudentKeyRegistry:
+    """
+    Ponto único de normalização do ID StoneLab.
+
+    Cada ID canônico (sem espaços e sem o sufixo '.0' que o Sheets/CSV
+    introduz em números) recebe uma chave inteira densa. As junções e filtros
+    do pipeline usam essa chave; o texto original fica disponível via decode().
+    """
+
+    MISSING = -1
+
+    SOURCE_ID_COLUMNS = {
+        'cadastro': [schema.CADASTRO_ID_STONELAB],
+        'io_alunos': [schema.IO_COL_ID_RAW, schema.COL_ID_STONELAB],
+        'justificativas': [schema.JUSTIFICATIVA_ID_STONELAB, schema.COL_ID_STONELAB],
+    }
+
+    def __init__(self):
+        self._key_by_id: Dict[str, int] = {}
+        self._ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def canonicalize(values: pd.Series) -> pd.Series:
+        """Normaliza IDs para texto canônico; vazios viram NaN."""
+        s = pd.Series(values, copy=False).astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+        s = s.mask(s.isin(['', 'nan', 'None', '<NA>']))
+        return s.astype(object).where(s.notna(), np.nan)
+
+    def encode(self, values: pd.Series, register: bool = True) -> np.ndarray:
+        """Converte IDs em chaves inteiras. Com register=False, IDs novos viram MISSING."""
+        canonical = self.canonicalize(values)
+        codes, uniques = pd.factorize(canonical)
+
+        unique_keys = np.empty(len(uniques), dtype=np.int32)
+        for i, sid in enumerate(uniques):
+            key = self._key_by_id.get(sid)
+            if key is None and register:
+                key = len(self._ids)
+                self._key_by_id[sid] = key
+                self._ids.append(sid)
+            unique_keys[i] = self.MISSING if key is None else key
+
+        keys = np.full(len(codes), self.MISSING, dtype=np.int32)
+        mask = codes >= 0
+        keys[mask] = unique_keys[codes[mask]]
+        return keys
+
+    def decode(self, keys: Iterable[int]) -> np.ndarray:
+        """Converte chaves inteiras de volta para o ID de exibição."""
+        labels = np.array(self._ids + [np.nan], dtype=object)
+        keys = np.asarray(keys, dtype=np.int64)
+        return labels[np.where(keys >= 0, keys, len(self._ids))]
+
+    def apply_to_sources(self, data_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Canoniza a coluna de ID de cada fonte e adiciona a coluna de chave
+        inteira. Devolve um novo dicionário com novos DataFrames: as fontes
+        recebidas não são alteradas.
+        """
+        data_frames = dict(data_frames)
+        for source, candidates in self.SOURCE_ID_COLUMNS.items():
+            df = data_frames.get(source)
+            if df is None or df.empty:
+                continue
+
+            col_id = self.find_id_column(df, candidates)
+            if col_id is None:
+                log.warning(f"Chaves: Coluna de ID não encontrada em '{source}'.")
+                continue
+
+            ids = self.canonicalize(df[col_id])
+            data_frames[source] = df.assign(**{col_id: ids, schema.COL_STUDENT_KEY: self.encode(ids)})
+
+        data_frames['student_keys'] = self
+        log.info(f"Chaves: {len(self)} IDs StoneLab distintos registrados.")
+        return data_frames
+
+    @staticmethod
+    def find_id_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+        stripped = {str(c).strip(): c for c in df.columns}
+        for candidate in candidates:
+            if candidate in stripped:
+                return stripped[candidate]
+        for col in df.columns:
+            c_lower = str(col).lower()
+            if "id" in c_lower and "stonelab" in c_lower:
+                return col
+        return None
@@ -16,6 +16,14 @@ ARQUIVO_FERIADOS_LOCAL = "feriados.csv"
 ARQUIVO_JUSTIFICATIVAS_LOCAL = "justificativas.csv"
 PASTA_DASHBOARD_LOCAL = "output-dashboard"
 NOME_ARQUIVO_DASHBOARD = "DASHBOARD_SNAPSHOT_ATUAL.xlsx"
+ARQUIVO_CUBO_PRESENCA = "CUBO_PRESENCA_{data_fim}.npz"
+ARQUIVO_DB_HISTORICO = "STONE_LAB_DATABASE_HISTORICO.csv"
+ARQUIVO_DB_HISTORICO_SQLITE = "STONE_LAB_HISTORICO.sqlite"
+ARQUIVO_ULTIMA_PRESENCA = "STONE_LAB_ULTIMA_PRESENCA.csv"
+ARQUIVO_PARTICAO_INATIVIDADE = "semana={semana}.csv"
+ARQUIVO_QUALIDADE_DADOS = "QUALIDADE_DADOS_{data_fim}.json"
+PASTA_ARQUIVO_BATIDAS = "Arquivo_Batidas"
+ARQUIVO_PARTICAO_BATIDAS = "mes={mes}"
 
 CADASTRO_NOME_COMPLETO = "Qual o seu nome completo?"
 CADASTRO_FUNCAO = "Qual a sua função no projeto?"
@@ -42,6 +50,7 @@ COL_NAME = "name"
 COL_FUNCTION = "function"
 COL_COORDINATOR = "coordinator"
 COL_ID_STONELAB = "id_stonelab"
+COL_STUDENT_KEY = "student_key"
 COL_NOME_ENTRADA = "nome_entrada"
 COL_DATE = "date"
 COL_XML_DATE = "Date"
@@ -70,14 +79,39 @@ OUT_COL_ACOES_NOME_XML = "nome_entrada"
 OUT_COL_ACOES_SEMANA = "Semana"
 OUT_COL_ACOES_FREQ_OBS = "Freq Obs"
 OUT_COL_ACOES_SITUACAO = "Situacao"
+OUT_COL_ACOES_SUGESTAO = "Sugestao (Cadastro)"
 
 OUT_COL_ULTIMA_PRESENCA = "Última Presença"
 OUT_COL_DIAS_AUSENTE = "Dias Ausente"
 OUT_COL_RISCO = "Nível de Risco"
+OUT_COL_RISCO_ANTERIOR = "Nível Anterior"
+OUT_COL_MUDANCA_RISCO = "Mudança"
+OUT_COL_NIVEL_DESDE = "No Nível Desde"
+OUT_COL_DIAS_NO_NIVEL = "Dias no Nível"
 OUT_COL_NOME_LIMPEZA = "Nome"
 OUT_COL_ULTIMA_PRESENCA_LIMPEZA = "Última Presença"
 OUT_COL_DIAS_INATIVO_LIMPEZA = "Dias Ausente"
 
+OUT_COL_PERM_DATA = "Data"
+OUT_COL_PERM_ENTRADA = "Entrada"
+OUT_COL_PERM_SAIDA = "Saída"
+OUT_COL_PERM_BATIDAS = "Batidas"
+OUT_COL_PERM_HORAS = "Permanência (h)"
+OUT_COL_PERM_ALUNOS = "Alunos"
+OUT_COL_PERM_DIAS = "Dias Medidos"
+OUT_COL_PERM_MEDIA_HORAS = "Permanência Média (h)"
+OUT_COL_PERM_ENTRADA_MEDIANA = "Entrada Mediana"
+OUT_COL_PERM_SAIDA_MEDIANA = "Saída Mediana"
+
+OUT_COL_QD_FONTE = "Fonte"
+OUT_COL_QD_COLUNA = "Coluna"
+OUT_COL_QD_REGRA = "Regra"
+OUT_COL_QD_SEVERIDADE = "Severidade"
+OUT_COL_QD_DESCRICAO = "Descrição"
+OUT_COL_QD_LINHAS = "Linhas Afetadas"
+OUT_COL_QD_TOTAL = "Total de Linhas"
+OUT_COL_QD_EXEMPLOS = "Exemplos"
+
 LIMIAR_ATINGIMENTO_GERAL = 0.75
 
 RISCO_3_VERMELHO = "(3) Vermelho (> 45 dias)"
@@ -88,6 +122,22 @@ RISCO_PRE_INATIVIDADE = "(4) Risco Inicial (10-15 dias)"
 RISCO_ATIVO = "Ativo"
 RISCO_JUSTIFICADO = "Justificado"
 
+# Do menos ao mais grave; usado para comparar níveis entre execuções.
+NIVEIS_RISCO = [RISCO_PRE_INATIVIDADE, RISCO_1_AMARELO, RISCO_2_LARANJA, RISCO_3_VERMELHO]
+
+MUDANCA_NOVO_RISCO = "(1) Novo em risco"
+MUDANCA_PIOROU = "(2) Piorou"
+MUDANCA_MANTEVE = "(3) Manteve"
+MUDANCA_MELHOROU = "(4) Melhorou"
+MUDANCA_SAIU_RISCO = "(5) Saiu do risco"
+MUDANCA_SEM_HISTORICO = "Sem histórico anterior"
+
+SEVERIDADE_ERRO = "Erro"
+SEVERIDADE_AVISO = "Aviso"
+SEVERIDADE_INFO = "Info"
+# Do mais ao menos grave; ordem da aba de qualidade dos dados.
+SEVERIDADES = [SEVERIDADE_ERRO, SEVERIDADE_AVISO, SEVERIDADE_INFO]
+
 STATUS_ATINGIU = "Atingiu"
 STATUS_NAO_ATINGIU = "Não Atingiu"
 STATUS_JUSTIFICADO = "Semana Justificada"
@@ -110,7 +160,16 @@ ABA_IGNORAR = "Pessoas para nao monitorar"
 ABA_INATIVIDADE = "Inatividade_Alunos"
 ABA_DB_HISTORICO = "Report_Raw_Historico"
 ABA_DB_INATIVIDADE = "Alerta_Inatividade_Historico"
+ABA_TRANSICOES_INATIVIDADE = "Transicoes_Inatividade"
 ABA_LIMPEZA_BIOMETRIA = "Limpeza_Biometria_Inativos"
+ABA_PERMANENCIA = "Permanencia"
+ABA_PERMANENCIA_COORDENADORES = "Permanencia_Coordenadores"
+ABA_PAINEL_COORDENADORES = "Painel_Coordenadores"
+ABA_ACAO_COBRANCA = "Acao_Cobranca"
+ABA_QUALIDADE_DADOS = "Qualidade_Dados"
+
+# Alvo de --only-tabs que só atualiza a base histórica do dashboard (sem Excel).
+ALVO_DASHBOARD = "dashboard"
 
 DB_HIST_COL_ID = COL_ID_STONELAB
 DB_HIST_COL_NOME = OUT_COL_NOME
@@ -124,6 +183,11 @@ DB_HIST_COL_FALT_JUST = OUT_COL_FALTAS_JUST
 DB_HIST_COL_FERIAS = OUT_COL_DIAS_FERIAS
 DB_HIST_COL_SITUACAO = OUT_COL_SITUACAO
 
+# Foto de risco gravada a cada execução em ABA_DB_INATIVIDADE (uma partição por Semana).
+DB_INATIVIDADE_COLUNAS = [
+    OUT_COL_SEMANA, OUT_COL_NOME, OUT_COL_COORDENADOR, OUT_COL_RISCO, OUT_COL_DIAS_AUSENTE, OUT_COL_NIVEL_DESDE
+]
+
 COLOR_RED_BG = '#FFC7CE'
 COLOR_RED_FONT = '#9C0006'
 COLOR_YELLOW_BG = '#FFEB9C'
@@ -0,0 +1,16 @@
+import sys
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.domain.services.report_generators.action_sheets import ActionSheetGenerator
+
+def test_inicio_da_semana_e_a_segunda_feira():
+    datas = pd.Series(pd.to_datetime(['2025-11-03 00:00:00', '2025-11-05 13:00:00', '2025-11-09 23:59:00', '2025-11-10 08:00:00']))
+
+    semanas = ActionSheetGenerator._week_start(datas)
+
+    assert semanas.dt.strftime('%Y-%m-%d').tolist() == ['2025-11-03', '2025-11-03', '2025-11-03', '2025-11-10']
@@ -0,0 +1,85 @@
+import sys
+import time
+import asyncio
+import threading
+import pytest
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.run_config import RunConfig
+from presenca.utils.async_io import IoOrchestrator
+from presenca.utils.data_reader import DataReader
+
+LATENCIA = 0.2
+
+class FakeSheets:
+    """Cliente gspread falso: cada leitura de aba espera LATENCIA e conta quantas estão em voo."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.em_voo = 0
+        self.pico = 0
+
+    def open(self, planilha):
+        return self
+
+    def worksheet(self, aba):
+        return _FakeWorksheet(self, aba)
+
+class _FakeWorksheet:
+    def __init__(self, cliente, aba):
+        self.cliente, self.aba = cliente, aba
+
+    def get_all_values(self):
+        with self.cliente.lock:
+            self.cliente.em_voo += 1
+            self.cliente.pico = max(self.cliente.pico, self.cliente.em_voo)
+        time.sleep(LATENCIA)
+        with self.cliente.lock:
+            self.cliente.em_voo -= 1
+        return [['aba'], [self.aba]]
+
+def _ler_colab(tmp_path, io_concurrency):
+    config = RunConfig(2025, 11, mode='colab', io_concurrency=io_concurrency,
+                       settings={'CAMINHOS': {'colab': {'dados_presenca': str(tmp_path / 'sem_xmls')}}})
+    cliente = FakeSheets()
+    inicio = time.perf_counter()
+    fontes = DataReader(config, gspread_client=cliente).load_all_sources()
+    return fontes, cliente, time.perf_counter() - inicio
+
+def test_planilhas_do_colab_lidas_em_paralelo_com_limite(tmp_path):
+    fontes, cliente, tempo = _ler_colab(tmp_path, io_concurrency=3)
+
+    assert list(fontes) == ['cadastro', 'io_alunos', 'ignorar', 'feriados', 'justificativas', 'registros_brutos']
+    assert fontes['feriados']['aba'].tolist() == ['2025']
+    assert cliente.pico == 3
+    assert tempo < 4 * LATENCIA  # 5 leituras em 2 ondas; em sequência seriam 5 * LATENCIA
+
+    _, cliente, tempo = _ler_colab(tmp_path, io_concurrency=1)
+    assert cliente.pico == 1 and tempo >= 5 * LATENCIA
+
+def test_orquestrador_dentro_de_loop_ja_rodando_e_com_falha():
+    def upload():
+        time.sleep(LATENCIA)
+        return 'link'
+
+    def base_mestra():
+        time.sleep(LATENCIA)
+        return 'id'
+
+    async def no_notebook():
+        # No Colab já existe um loop rodando; gather() precisa funcionar mesmo assim.
+        return IoOrchestrator(2).gather({'excel': upload, 'dashboard': base_mestra})
+
+    inicio = time.perf_counter()
+    assert asyncio.run(no_notebook()) == {'excel': 'link', 'dashboard': 'id'}
+    assert time.perf_counter() - inicio < 2 * LATENCIA
+
+    def falha():
+        raise ConnectionError("Drive fora do ar")
+
+    with pytest.raises(ConnectionError):
+        IoOrchestrator(2).gather({'excel': falha, 'dashboard': base_mestra})
@@ -0,0 +1,42 @@
+import sys
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.domain.services.attainment_rollup import AttainmentRollup
+
+def _relatorio():
+    semanas = pd.to_datetime(['2025-11-03', '2025-11-10'] * 2)
+    return pd.DataFrame({
+        schema.COL_ID_STONELAB: ['1', '1', '2', '2'],
+        schema.COL_NAME: ['Ana', 'Ana', 'Bia', 'Bia'],
+        schema.COL_COORDINATOR: ['Prof. Alpha'] * 4,
+        schema.COL_DATE: semanas,
+        'observed_frequency': [3, 5, 0, 1],
+        'meta_dinamica': [3, 3, 3, 3],
+        'workdays': [5, 5, 5, 5],
+        'justified_days': [0, 0, 5, 0],
+        schema.OUT_COL_SITUACAO: [schema.STATUS_ATINGIU, schema.STATUS_ATINGIU,
+                                  schema.STATUS_JUSTIFICADO, schema.STATUS_NAO_ATINGIU],
+    })
+
+def test_niveis_saem_de_uma_unica_agregacao():
+    rollup = AttainmentRollup(_relatorio())
+
+    alunos = rollup.by_student().set_index(schema.COL_NAME)
+    assert alunos.loc['Ana', 'status'] == schema.STATUS_ATINGIU
+    assert alunos.loc['Ana', 'ratio_visual'] == 0.8
+    assert alunos.loc['Bia', 'status'] == schema.STATUS_JUSTIFICADO
+
+    painel = rollup.by_coordinator_week()
+    assert painel['total_alunos'].tolist() == [2, 2]
+    assert painel['atingiram'].tolist() == [1, 1]
+
+    # Semana justificada sai do KPI geral.
+    semanas = rollup.by_week()
+    assert semanas['total_de_alunos'].tolist() == [1, 2]
+    assert semanas['KPI_Presenca'].tolist() == [1.0, 0.5]
@@ -0,0 +1,78 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.domain.models.tenure_table import TenureTable
+from presenca.domain.services.AttendanceTransformer import AttendanceTransformer
+
+class _Jornadas:
+    def __init__(self, tenures):
+        self.tenures = tenures
+
+    def get(self, io_alunos):
+        return self.tenures
+
+def _transformer():
+    nat = np.datetime64('NaT')
+    # Ana e Bia dividem o nome_entrada 'ana'; Caio tem cadastro mas não tem jornada.
+    tenures = TenureTable(
+        keys=[0, 1],
+        beginnings=np.array(['2025-01-01', '2025-11-10'], dtype='datetime64[D]'),
+        ends=[nat, nat],
+        frequencies=[3, 3],
+        change_dates=[nat, nat],
+        changed_frequencies=[0, 0],
+    )
+    cadastro = pd.DataFrame({
+        schema.COL_STUDENT_KEY: [0, 1, 2],
+        schema.COL_NAME: ['Ana', 'Bia', 'Caio'],
+        schema.COL_NOME_ENTRADA: ['ana', 'ana', 'caio'],
+    })
+    datas = pd.to_datetime(['2025-11-05', '2025-11-12', '2025-11-12', '2025-11-12'])
+    registros = pd.DataFrame({
+        schema.COL_NOME_ENTRADA: ['ana', 'ana', 'caio', 'desconhecido'],
+        'Datetime': datas + pd.Timedelta(hours=9),
+        schema.COL_XML_DATE: datas,
+    })
+    data = {'registros_brutos': registros, 'cadastro': cadastro, 'io_alunos': pd.DataFrame()}
+    return AttendanceTransformer(data, {}, tenure_provider=_Jornadas(tenures))
+
+def test_nome_entrada_compartilhado_credita_todos_os_alunos_com_jornada():
+    transformer = _transformer()
+    transformer._filter_by_tenure()
+    final = transformer.data['registros_final']
+
+    pares = list(zip(final[schema.COL_STUDENT_KEY], final[schema.COL_XML_DATE].dt.strftime('%Y-%m-%d')))
+    # Bia só começa em 10/11; Caio (sem jornada) e o nome desconhecido ficam de fora.
+    assert pares == [(0, '2025-11-05'), (0, '2025-11-12'), (1, '2025-11-12')]
+
+def test_pares_batida_aluno_mantem_a_ordem_das_batidas():
+    transformer = _transformer()
+    registros = transformer.data['registros_brutos']
+    rows, keys = transformer._match_student_keys(registros[schema.COL_NOME_ENTRADA], transformer.tenure_provider.get(None))
+
+    assert rows.tolist() == [0, 0, 1, 1]
+    assert keys.tolist() == [0, 1, 0, 1]
+
+def test_sem_etapa_de_permanencia_nao_agrega_primeira_e_ultima_batida():
+    registros = pd.DataFrame({
+        'Name': ['ana', 'ana'],
+        'Datetime': ['05/11/2025 09:00:00', '05/11/2025 17:00:00'],
+    })
+    cadastro = pd.DataFrame(columns=[schema.CADASTRO_NOME_COMPLETO, schema.CADASTRO_FUNCAO, schema.CADASTRO_COORDENADOR,
+                                     schema.CADASTRO_ID_STONELAB, schema.CADASTRO_NOME_ENTRADA])
+    data = {'registros_brutos': registros, 'cadastro': cadastro}
+
+    com_permanencia = AttendanceTransformer(data, {})
+    com_permanencia._clean_and_rename_base_dfs()
+    sem_permanencia = AttendanceTransformer(data, {}, daily_spans=False)
+    sem_permanencia._clean_and_rename_base_dfs()
+
+    assert len(com_permanencia.data['permanencia_nomes']) == 1
+    assert 'permanencia_nomes' not in sem_permanencia.data
@@ -0,0 +1,33 @@
+import sys
+import pandas as pd
+from datetime import date
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.run_config import RunConfig
+from presenca.domain.services.report_generators.biometry_cleanup_sheet import BiometryCleanupSheetGenerator
+from presenca.utils.history_repository import CsvHistoryRepository
+from presenca.utils.punch_archive import PunchArchive
+
+def test_limpeza_usa_a_ultima_batida_do_arquivo_de_batidas(tmp_path):
+    arquivo = PunchArchive(str(tmp_path / 'arquivo'))
+    arquivo.append_month(pd.DataFrame({
+        'Name': ['Ana', 'Bia', 'Visitante', 'Caio'],
+        'Datetime': pd.to_datetime(['2025-10-01 08:00', '2025-10-02 09:00', '2025-10-03 10:00', '2025-10-30 08:00']),
+    }), date(2025, 10, 1))
+    processed_data = {
+        'registros_brutos': pd.DataFrame({schema.COL_NOME_ENTRADA: ['Caio'], 'Datetime': pd.to_datetime(['2025-11-28 08:00'])}),
+        'cadastro': pd.DataFrame({schema.COL_NAME: ['Caio Souza'], schema.COL_NOME_ENTRADA: ['Caio']}),
+        'ignorar': pd.DataFrame({'Nome': ['Visitante']}),
+    }
+
+    limpeza = BiometryCleanupSheetGenerator(processed_data, RunConfig(2025, 11), CsvHistoryRepository(str(tmp_path)),
+                                            arquivo).generate()[schema.ABA_LIMPEZA_BIOMETRIA]
+
+    # Ana e Bia só aparecem no arquivo; o nome ignorado fica de fora e Caio bateu no mês.
+    ultimas = limpeza.set_index(schema.OUT_COL_NOME_LIMPEZA)[schema.OUT_COL_ULTIMA_PRESENCA_LIMPEZA]
+    assert ultimas.to_dict() == {'Ana': pd.Timestamp('2025-10-01'), 'Bia': pd.Timestamp('2025-10-02')}
@@ -0,0 +1,29 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+# Orçamento folgado para máquinas lentas de CI; localmente o import fica bem abaixo.
+IMPORT_BUDGET_S = 2.0
+GOOGLE_PREFIXES = ('google', 'googleapiclient', 'gspread')
+
+def _importtime_main():
+    script = "import sys, main; print('google:' + ','.join(sorted(m for m in sys.modules if m.startswith(%r))))" % (GOOGLE_PREFIXES,)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    return proc
+
+def test_import_de_main_nao_carrega_clientes_google():
+    proc = _importtime_main()
+
+    carregados = proc.stdout.strip().splitlines()[-1].removeprefix('google:')
+    assert carregados == '', f"Módulos do Google carregados no import: {carregados}"
+
+    cumulativo = re.search(r'import time:\s+\d+ \|\s+(\d+) \| main$', proc.stderr, re.MULTILINE)
+    assert cumulativo is not None
+    assert int(cumulativo.group(1)) / 1e6 < IMPORT_BUDGET_S
@@ -0,0 +1,62 @@
+import sys
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.utils.data_quality import InputValidator
+from presenca.utils.input_validator import validar_estrutura_inputs
+
+def _cadastro(ids) -> pd.DataFrame:
+    df = pd.DataFrame({col: 'x' for col in schema.COLUNAS_OBRIGATORIAS_CADASTRO}, index=range(len(ids)))
+    df[schema.CADASTRO_ID_STONELAB] = ids
+    return df
+
+def test_achados_por_regra_com_contagem_e_exemplos():
+    fontes = {
+        'cadastro': _cadastro(['1', '2', '2.0', '3']),
+        'io_alunos': pd.DataFrame({
+            schema.IO_COL_ID_RAW: ['1', '2', '9', '3'],
+            schema.IO_COL_START_RAW: ['01/10/2025', '31/02/2025', '05/10/2025', '01/11/2025'],
+            schema.IO_COL_END1_RAW: [np.nan, np.nan, '01/09/2025', np.nan],
+            schema.IO_COL_FREQ1_RAW: ['3', 'três', '2', 'Saiu'],
+        }),
+        'justificativas': pd.DataFrame({
+            schema.JUSTIFICATIVA_ID_STONELAB: ['1', '3'],
+            schema.JUSTIFICATIVA_INICIO: ['10/11/2025', '2025-11-03'],
+            schema.JUSTIFICATIVA_FIM: ['05/11/2025', '2025-11-07'],
+        }),
+        'feriados': pd.DataFrame({schema.FERIADOS_DATA: ['2025-11-15', 'amanhã']}),
+    }
+    relatorio = InputValidator().validate(fontes)
+    achados = {(f.source, f.column, f.rule): f for f in relatorio.findings}
+
+    assert achados[('cadastro', schema.CADASTRO_ID_STONELAB, 'id_duplicado')].rows == 2
+    assert achados[('io_alunos', schema.IO_COL_START_RAW, 'data_invalida')].samples == [
+        {'linha': 3, schema.IO_COL_START_RAW: '31/02/2025', schema.IO_COL_ID_RAW: '2'}]
+    assert achados[('io_alunos', schema.IO_COL_FREQ1_RAW, 'frequencia_nao_numerica')].rows == 1
+    assert achados[('io_alunos', schema.IO_COL_END1_RAW, 'fim_antes_do_inicio')].rows == 1
+    assert achados[('io_alunos', schema.IO_COL_ID_RAW, 'id_sem_cadastro')].rows == 1
+    assert achados[('justificativas', schema.JUSTIFICATIVA_FIM, 'fim_antes_do_inicio')].rows == 1
+    assert achados[('feriados', schema.FERIADOS_DATA, 'data_invalida')].rows == 1
+    assert not relatorio.has_errors and validar_estrutura_inputs(fontes, relatorio)
+
+    aba = relatorio.to_frame()
+    assert aba[schema.OUT_COL_QD_SEVERIDADE].tolist() == [schema.SEVERIDADE_AVISO] * len(aba)
+    assert json.loads(relatorio.to_json())['resumo'][schema.SEVERIDADE_AVISO] == len(aba)
+
+def test_fonte_obrigatoria_vazia_ou_sem_coluna_interrompe():
+    sem_io = {'cadastro': _cadastro(['1']), 'io_alunos': pd.DataFrame()}
+    assert not validar_estrutura_inputs(sem_io)
+
+    sem_coluna = {'cadastro': _cadastro(['1']).drop(columns=[schema.CADASTRO_ID_STONELAB]),
+                  'io_alunos': pd.DataFrame({schema.IO_COL_ID_RAW: ['1']})}
+    relatorio = InputValidator().validate(sem_coluna)
+    assert relatorio.has_errors
+    assert [(f.source, f.rule) for f in relatorio.findings if f.severity == schema.SEVERIDADE_ERRO] == [
+        ('cadastro', 'coluna_obrigatoria')]
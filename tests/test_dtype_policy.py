@@ -0,0 +1,55 @@
+import sys
+import logging
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.utils.dtype_policy import DtypePolicy
+
+def test_relatorio_semanal_usa_tipos_compactos():
+    report = pd.DataFrame({
+        schema.COL_ID_STONELAB: ['1001', '1001', '1002'],
+        schema.COL_NAME: ['Ana', 'Ana', 'Bruno'],
+        schema.COL_COORDINATOR: ['Prof A', 'Prof A', 'Prof B'],
+        schema.COL_DATE: ['2025-11-03', '2025-11-10', '2025-11-03'],
+        'observed_frequency': [3, None, 5],
+        schema.OUT_COL_SITUACAO: [schema.STATUS_ATINGIU, schema.STATUS_NAO_ATINGIU, schema.STATUS_ATINGIU],
+    })
+
+    report = DtypePolicy().apply_to_report(report)
+
+    assert isinstance(report[schema.COL_NAME].dtype, pd.CategoricalDtype)
+    assert isinstance(report[schema.OUT_COL_SITUACAO].dtype, pd.CategoricalDtype)
+    assert report[schema.COL_DATE].dtype.kind == 'M'
+    assert report['observed_frequency'].dtype == 'int8'
+    assert report['observed_frequency'].tolist() == [3, 0, 5]
+    assert report[schema.COL_ID_STONELAB].dtype == object
+
+def test_registros_processados_mantem_datas_normalizadas():
+    registros = pd.DataFrame({
+        schema.COL_NOME_ENTRADA: ['ana', 'ana'],
+        schema.COL_XML_DATE: ['2025-11-03', '2025-11-04'],
+    })
+
+    processed = DtypePolicy().apply_to_processed({'registros_brutos': registros})
+
+    df = processed['registros_brutos']
+    assert isinstance(df[schema.COL_NOME_ENTRADA].dtype, pd.CategoricalDtype)
+    assert (df[schema.COL_XML_DATE] == df[schema.COL_XML_DATE].dt.normalize()).all()
+
+def test_contadores_nao_numericos_viram_zero_com_log_sem_alterar_o_original(caplog):
+    caplog.set_level(logging.INFO)
+    report = pd.DataFrame({'observed_frequency': ['3', 'x', None], schema.COL_DATE: ['2025-11-03', 'ontem', None]})
+
+    convertido = DtypePolicy().apply_to_report(report)
+
+    assert convertido['observed_frequency'].tolist() == [3, 0, 0]
+    assert report['observed_frequency'].tolist() == ['3', 'x', None]
+    assert report[schema.COL_DATE].tolist() == ['2025-11-03', 'ontem', None]
+    assert "1 valores não numéricos em 'observed_frequency'" in caplog.text
+    assert "1 valores vazios em 'observed_frequency'" in caplog.text
+    assert f"1 valores de '{schema.COL_DATE}' não são datas" in caplog.text
@@ -0,0 +1,56 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from types import SimpleNamespace
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.domain.services.daily_span_aggregator import DailySpanAggregator
+from presenca.domain.services.report_generators.dwell_time_sheet import DwellTimeSheetGenerator
+
+CODES = np.array([0, 1, 0, 0, 1])
+STAMPS = pd.to_datetime([
+    '2025-11-03 14:00:00', '2025-11-03 09:00:00', '2025-11-03 08:30:00',
+    '2025-11-03 18:00:00', '2025-11-04 10:00:00'
+]).to_numpy()
+
+def test_agregacao_independe_da_divisao_em_blocos():
+    inteiro = DailySpanAggregator().update(CODES, STAMPS).result()
+
+    em_blocos = DailySpanAggregator()
+    for i in range(len(CODES)):
+        em_blocos.update(CODES[i:i + 1], STAMPS[i:i + 1])
+
+    ordem = ['name_code', schema.COL_XML_DATE]
+    pd.testing.assert_frame_equal(
+        inteiro.sort_values(ordem).reset_index(drop=True),
+        em_blocos.result().sort_values(ordem).reset_index(drop=True)
+    )
+    ana = inteiro[inteiro['name_code'] == 0].iloc[0]
+    assert ana['first_punch'] == pd.Timestamp('2025-11-03 08:30:00')
+    assert ana['last_punch'] == pd.Timestamp('2025-11-03 18:00:00')
+    assert ana['punches'] == 3
+
+def test_permanencia_ignora_dias_com_batida_unica():
+    spans = DailySpanAggregator().update(CODES, STAMPS).result().rename(columns={'name_code': schema.COL_STUDENT_KEY})
+    cadastro = pd.DataFrame({
+        schema.COL_STUDENT_KEY: [0, 1],
+        schema.COL_ID_STONELAB: ['1001', '1002'],
+        schema.COL_NAME: ['Ana', 'Bia'],
+        schema.COL_COORDINATOR: ['Prof. Alpha', 'Prof. Alpha']
+    })
+    config = SimpleNamespace(DATA_INICIO_GERAL='2025-11-01', DATA_FIM_GERAL='2025-11-30')
+
+    abas = DwellTimeSheetGenerator({'permanencia': spans, 'cadastro': cadastro}, config).generate()
+    diario = abas[schema.ABA_PERMANENCIA].set_index(schema.OUT_COL_NOME)
+    semanal = abas[schema.ABA_PERMANENCIA_COORDENADORES]
+
+    assert diario.loc['Ana', schema.OUT_COL_PERM_HORAS] == 9.5
+    assert diario.loc['Ana', schema.OUT_COL_PERM_ENTRADA] == '08:30'
+    assert diario.loc['Bia', schema.OUT_COL_PERM_HORAS].isna().all()
+    assert semanal[schema.OUT_COL_PERM_DIAS].tolist() == [1]
+    assert semanal[schema.OUT_COL_PERM_MEDIA_HORAS].tolist() == [9.5]
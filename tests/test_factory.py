@@ -0,0 +1,90 @@
+import sys
+from datetime import date
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.domain.factory import CoordinatorFactory, TenureFactory, TenureProvider
+from presenca.utils.stage_metrics import StageMetrics
+from presenca.domain.models.coordinator import Coordinator
+
+def test_dimensao_de_coordenadores_normaliza_nomes_unicos():
+    factory = CoordinatorFactory()
+    raw = pd.Series([' prof. alpha', 'Prof. Alpha ', None, '', 'PROF. BETA', np.nan])
+
+    dimension = factory.create_dimension(raw)
+
+    assert isinstance(dimension.dtype, pd.CategoricalDtype)
+    assert dimension.tolist() == ['Prof. Alpha', 'Prof. Alpha', 'Indefinido', 'Indefinido', 'Prof. Beta', 'Indefinido']
+    assert list(dimension.cat.categories) == sorted(set(dimension))
+    assert factory.lookup('Prof. Alpha') is factory.get_or_create('prof. alpha')
+    assert isinstance(factory.coordinators['Prof. Beta'], Coordinator)
+
+def _io_df():
+    return pd.DataFrame({
+        'ID_Stonelab': ['1001', '1002', '1003', '1003'],
+        'Quando a data de referência?': ['01/01/2025', '10/03/2025', '01/02/2025', '01/01/2024'],
+        'Frequência esperada': ['5', 'Saiu', '3', '4'],
+        'end_date_1': ['30/06/2025', None, None, None],
+        'end_date_2': [None, None, None, None],
+        'freq_2': [2, None, None, None],
+    })
+
+def test_tabela_de_jornadas_replica_regras_do_modelo():
+    table = TenureFactory().create_tenure_table(_io_df())
+
+    assert len(table) == 3
+    keys = list(table.keys())
+    t1001, t1002, t1003 = (table[k][0] for k in keys)
+
+    assert t1001.beginning == date(2025, 1, 1)
+    assert t1001.end is None
+    assert t1001.get_expected_frequency(date(2025, 6, 29)) == 5
+    assert t1001.get_expected_frequency(date(2025, 6, 30)) == 2
+    assert t1002.original_expected_frequency == 0
+    assert t1003.beginning == date(2025, 2, 1)
+
+    model = t1001.to_model()
+    assert model.get_expected_frequency(date(2025, 7, 1)) == 2
+    assert model.active_at_date(date(2024, 12, 31)) is False
+
+def test_consultas_vetorizadas_de_jornada():
+    table = TenureFactory().create_tenure_table(_io_df())
+    keys = np.array([0, 0, 1, 2, 99], dtype=np.int32)
+    dates = np.array(['2024-12-31', '2025-07-07', '2025-04-01', '2025-02-03', '2025-02-03'], dtype='datetime64[D]')
+
+    assert table.active_at(keys, dates).tolist() == [False, True, True, True, False]
+    assert table.expected_frequency_at(keys, dates).tolist() == [0, 2, 0, 3, 0]
+
+def test_provider_reaproveita_jornadas_do_mesmo_io():
+    metrics = StageMetrics()
+    provider = TenureProvider(TenureFactory(), metrics)
+
+    primeira = provider.get(_io_df())
+    segunda = provider.get(_io_df())
+    alterado = _io_df()
+    alterado.loc[0, 'Frequência esperada'] = '4'
+    terceira = provider.get(alterado)
+
+    assert segunda is primeira
+    assert terceira is not primeira
+    assert metrics.counters['jornadas_cache_hit'] == 1
+    assert metrics.counters['jornadas_cache_miss'] == 2
+
+def test_provider_reconhece_o_mesmo_frame_sem_hash_do_conteudo(monkeypatch):
+    metrics = StageMetrics()
+    provider = TenureProvider(TenureFactory(), metrics)
+    hashes = []
+    original = TenureProvider._content_fingerprint
+    monkeypatch.setattr(TenureProvider, '_content_fingerprint', staticmethod(lambda df: hashes.append(1) or original(df)))
+
+    io_df = _io_df()
+    primeira = provider.get(io_df)
+    assert provider.get(io_df) is primeira
+    assert provider.get(io_df) is primeira
+    assert len(hashes) == 1
+    assert (metrics.counters['jornadas_cache_miss'], metrics.counters['jornadas_cache_hit']) == (1, 2)
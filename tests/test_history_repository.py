@@ -0,0 +1,123 @@
+import sqlite3
+import sys
+import pytest
+import pandas as pd
+from datetime import date
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.utils.history_repository import CsvHistoryRepository, SqliteHistoryRepository
+from presenca.utils.student_keys import StudentKeyRegistry
+
+def _historico(pasta: Path) -> Path:
+    df = pd.DataFrame({
+        schema.DB_HIST_COL_ID: ['1', '1', '2', '2', '3'],
+        schema.DB_HIST_COL_NOME: ['Ana Lúcia', 'Ana Lúcia', 'Bia', 'Bia', 'Caio'],
+        schema.DB_HIST_COL_COORDENADOR: ['Prof. Alpha'] * 5,
+        schema.DB_HIST_COL_DATE: ['2025-10-06', '2025-10-13', '2025-10-06', '2025-10-13', '2025-12-01'],
+        schema.DB_HIST_COL_FREQ_OBS: ['3', '0', '2', '0', '4'],
+        schema.DB_HIST_COL_SITUACAO: [schema.STATUS_ATINGIU, schema.STATUS_NAO_ATINGIU, schema.STATUS_NAO_ATINGIU,
+                                      schema.STATUS_JUSTIFICADO, schema.STATUS_ATINGIU],
+    })
+    path = pasta / schema.ARQUIVO_DB_HISTORICO
+    df.to_csv(path, index=False)
+    return path
+
+def test_sqlite_responde_igual_ao_csv(tmp_path):
+    csv_path = _historico(tmp_path)
+    registry = StudentKeyRegistry()
+    registry.encode(pd.Series(['1', '2', '3']))
+    ref = date(2025, 11, 30)
+
+    csv_repo = CsvHistoryRepository(str(tmp_path))
+    sql_repo = SqliteHistoryRepository(str(tmp_path / 'hist.sqlite'), csv_seed=str(csv_path))
+
+    por_chave = csv_repo.last_seen_by_key(ref, registry)
+    assert por_chave.to_dict() == sql_repo.last_seen_by_key(ref, registry).to_dict()
+    # Semana sem presença não conta; justificada conta; semana após ref_date fica de fora.
+    assert por_chave.to_dict() == {0: pd.Timestamp('2025-10-06'), 1: pd.Timestamp('2025-10-13')}
+
+    for present_only in (True, False):
+        csv_nomes = csv_repo.last_seen_by_name(ref, present_only).set_index('nome_norm')['Data']
+        sql_nomes = sql_repo.last_seen_by_name(ref, present_only).set_index('nome_norm')['Data']
+        assert csv_nomes.sort_index().equals(sql_nomes.sort_index())
+    assert 'ANA LUCIA' in csv_nomes.index
+
+def test_sqlite_regrava_semanas_e_consulta_presenca_diaria(tmp_path):
+    caminho = str(tmp_path / 'hist.sqlite')
+    repo = SqliteHistoryRepository(caminho)
+    semana = pd.DataFrame({
+        schema.DB_HIST_COL_ID: ['1', '2'], schema.DB_HIST_COL_NOME: ['Ana', 'Bia'],
+        schema.DB_HIST_COL_DATE: pd.to_datetime(['2025-11-03'] * 2), schema.DB_HIST_COL_FREQ_OBS: [3, 1],
+        schema.DB_HIST_COL_SITUACAO: [schema.STATUS_ATINGIU, schema.STATUS_NAO_ATINGIU],
+    })
+    repo.record_report(semana)
+    repo.record_report(semana)
+
+    # Regravar a mesma semana substitui as linhas em vez de duplicá-las.
+    with sqlite3.connect(caminho) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM report_semanal").fetchone() == (2,)
+
+    repo.record_daily_presence(pd.DataFrame({
+        schema.COL_NOME_ENTRADA: ['Ana', 'ana ', 'Bia'],
+        'Datetime': pd.to_datetime(['2025-11-03 08:00', '2025-11-05 09:00', '2025-12-02 10:00']),
+    }))
+    ultimos = repo.last_punch_by_name(date(2025, 11, 30)).set_index('nome_norm')['Data']
+    assert ultimos.to_dict() == {'ANA': pd.Timestamp('2025-11-05')}
+
+@pytest.mark.parametrize('backend', ['csv', 'sqlite'])
+def test_ultima_presenca_materializada_com_merge_por_maximo(tmp_path, backend):
+    csv_path = _historico(tmp_path)
+    if backend == 'csv':
+        repo = CsvHistoryRepository(str(tmp_path))
+    else:
+        repo = SqliteHistoryRepository(str(tmp_path / 'hist.sqlite'), csv_seed=str(csv_path))
+    registry = StudentKeyRegistry()
+    registry.encode(pd.Series(['1', '2', '3', '4']))
+
+    # Semeada pelo histórico no primeiro update; depois, máximo entre gravado e período.
+    relatorio = pd.DataFrame({
+        schema.DB_HIST_COL_ID: ['2', '4'], schema.DB_HIST_COL_NOME: ['Bia', 'Dora Lima'],
+        schema.DB_HIST_COL_DATE: pd.to_datetime(['2025-12-08', '2025-12-08']),
+        schema.DB_HIST_COL_FREQ_OBS: [2, 0], schema.DB_HIST_COL_SITUACAO: [schema.STATUS_NAO_ATINGIU] * 2,
+    })
+    repo.update_last_seen(date(2025, 12, 31), pd.Series(pd.to_datetime(['2025-12-10', '2025-12-03']), index=['2', '4']),
+                          pd.DataFrame({schema.COL_NOME_ENTRADA: ['Ana Lucia', 'Dora'],
+                                        'Datetime': pd.to_datetime(['2025-12-05 08:00', '2025-12-09 10:00'])}),
+                          relatorio)
+    repo.update_last_seen(date(2025, 12, 31), pd.Series(pd.to_datetime(['2025-12-01']), index=['2']))
+
+    por_chave = repo.last_seen_by_key(date(2026, 1, 31), registry)
+    assert por_chave.to_dict() == {0: pd.Timestamp('2025-10-06'), 1: pd.Timestamp('2025-12-10'),
+                                   2: pd.Timestamp('2025-12-01'), 3: pd.Timestamp('2025-12-03')}
+
+    # Nomes do relatório e nomes biométricos ficam em tipos separados.
+    presentes = repo.last_seen_by_name(date(2026, 1, 31)).set_index('nome_norm')['Data'].to_dict()
+    assert presentes == {'ANA LUCIA': pd.Timestamp('2025-10-06'), 'BIA': pd.Timestamp('2025-12-08'),
+                         'CAIO': pd.Timestamp('2025-12-01')}
+    listados = repo.last_seen_by_name(date(2026, 1, 31), present_only=False).set_index('nome_norm')['Data']
+    assert listados['ANA LUCIA'] == pd.Timestamp('2025-10-13') and listados['DORA LIMA'] == pd.Timestamp('2025-12-08')
+    batidas = repo.last_punch_by_name(date(2026, 1, 31)).set_index('nome_norm')
+    assert batidas['Data'].to_dict() == {'ANA LUCIA': pd.Timestamp('2025-12-05'), 'DORA': pd.Timestamp('2025-12-09')}
+    assert batidas.loc['DORA', 'Nome'] == 'Dora'
+
+    # Reprocessar um mês anterior ao último período gravado volta a varrer o histórico.
+    assert repo.last_seen_by_key(date(2025, 11, 30), registry).to_dict() == {
+        0: pd.Timestamp('2025-10-06'), 1: pd.Timestamp('2025-10-13')}
+
+def test_tabela_antiga_recebe_os_tipos_de_nome_que_faltam(tmp_path):
+    _historico(tmp_path)
+    repo = CsvHistoryRepository(str(tmp_path))
+    pd.DataFrame({'tipo': ['id', 'nome', '_periodo'], 'chave': ['1', 'DORA', ''], 'nome': ['', 'Dora', ''],
+                  'data': ['2025-10-06', '2025-11-20', '2025-11-30']}).to_csv(repo.last_seen_path, index=False)
+
+    repo.update_last_seen(date(2025, 12, 31), pd.Series(dtype='datetime64[ns]'))
+
+    nomes = repo.last_seen_by_name(date(2025, 12, 31), present_only=False).set_index('nome_norm')['Data']
+    assert nomes.to_dict() == {'ANA LUCIA': pd.Timestamp('2025-10-13'), 'BIA': pd.Timestamp('2025-10-13'),
+                               'CAIO': pd.Timestamp('2025-12-01')}
+    assert repo.last_punch_by_name(date(2025, 12, 31)).empty
@@ -0,0 +1,51 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.domain.models.presence_cube import PresenceCube
+from presenca.domain.models.tenure_table import TenureTable
+from presenca.domain.services.report_generators.inactivity_sheet import InactivitySheetGenerator
+from presenca.run_config import RunConfig
+from presenca.utils.history_repository import CsvHistoryRepository
+
+def test_inatividade_colunar_com_justificativa_e_inicio_de_jornada(tmp_path):
+    nat = np.datetime64('NaT')
+    tenures = TenureTable(
+        keys=[0, 1, 2, 3, 4],
+        beginnings=np.array(['2025-01-01', '2025-09-01', '2025-11-25', '2025-01-01', '2025-01-01'], dtype='datetime64[D]'),
+        ends=[nat] * 5,
+        frequencies=[3, 3, 3, 0, 3],
+        change_dates=[nat] * 5,
+        changed_frequencies=[0] * 5,
+    )
+    cadastro = pd.DataFrame({
+        schema.COL_STUDENT_KEY: [0, 1, 2, 3, 4],
+        schema.COL_NAME: ['Ana', 'Bia', 'Caio', 'Dani', 'caio '],
+        schema.COL_FUNCTION: ['Aluno'] * 5,
+        schema.COL_COORDINATOR: pd.Categorical(['Prof. Alpha', 'Prof. Beta', 'Prof. Alpha', 'Prof. Beta', 'Prof. Beta']),
+    })
+    justificativas = pd.DataFrame({
+        schema.COL_STUDENT_KEY: [1, 0],
+        schema.JUSTIFICATIVA_INICIO: ['2025-11-20', '2025-10-01'],
+        schema.JUSTIFICATIVA_FIM: ['2025-12-05', '2025-10-31'],
+    })
+    processed = {
+        'cadastro': cadastro, 'tenures': tenures, 'justificativas': justificativas,
+        'presence_cube': PresenceCube.from_punches(np.array([0]), np.array(['2025-11-05'], dtype='datetime64[D]')),
+    }
+    config = RunConfig(2025, 11, settings={'CAMINHOS': {'local': {'output': str(tmp_path)}}})
+
+    aba = InactivitySheetGenerator(processed, config, CsvHistoryRepository(str(tmp_path))).generate()[schema.ABA_INATIVIDADE]
+
+    # Ana: 25 dias sem vir. Bia: 90 dias desde o início, mas justificada em 30/11.
+    # Caio começou há 5 dias; o 'caio ' mais antigo sai na deduplicação; Dani não tem jornada com frequência.
+    assert aba[schema.OUT_COL_NOME].tolist() == ['Ana']
+    assert aba[schema.OUT_COL_DIAS_AUSENTE].tolist() == [25]
+    assert aba[schema.OUT_COL_RISCO].astype(str).tolist() == [schema.RISCO_1_AMARELO]
+    assert aba[schema.OUT_COL_COORDENADOR].astype(str).tolist() == ['Prof. Alpha']
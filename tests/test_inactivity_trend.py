@@ -0,0 +1,58 @@
+import sys
+import pytest
+import pandas as pd
+from datetime import date
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.domain.services.report_generators.inactivity_trend_sheet import InactivityTrendSheetGenerator
+from presenca.run_config import RunConfig
+from presenca.utils.history_repository import CsvHistoryRepository, SqliteHistoryRepository
+
+def _aba_inatividade(semana: str, linhas) -> pd.DataFrame:
+    return pd.DataFrame(linhas, columns=[schema.OUT_COL_NOME, schema.OUT_COL_COORDENADOR,
+                                         schema.OUT_COL_RISCO, schema.OUT_COL_DIAS_AUSENTE]).assign(
+        **{schema.OUT_COL_SEMANA: pd.Timestamp(semana).date()})
+
+@pytest.mark.parametrize('backend', ['csv', 'sqlite'])
+def test_transicoes_de_risco_contra_a_foto_anterior(tmp_path, backend):
+    repo = CsvHistoryRepository(str(tmp_path)) if backend == 'csv' else SqliteHistoryRepository(str(tmp_path / 'h.sqlite'))
+
+    def rodar(ano, mes, aba):
+        config = RunConfig(ano, mes, settings={'CAMINHOS': {'local': {'output': str(tmp_path)}}})
+        trend = InactivityTrendSheetGenerator(aba, config, repo).generate()[schema.ABA_TRANSICOES_INATIVIDADE]
+        repo.record_risk_snapshot(InactivityTrendSheetGenerator.snapshot(trend), config.data_fim)
+        return trend.set_index(schema.OUT_COL_NOME)
+
+    outubro = rodar(2025, 10, _aba_inatividade('2025-10-31', [
+        ('Ana', 'Prof. Alpha', schema.RISCO_1_AMARELO, 20),
+        ('Bia', 'Prof. Beta', schema.RISCO_3_VERMELHO, 60),
+        ('Caio', 'Prof. Beta', schema.RISCO_2_LARANJA, 35),
+    ]))
+    assert set(outubro[schema.OUT_COL_MUDANCA_RISCO]) == {schema.MUDANCA_SEM_HISTORICO}
+
+    # Uma foto posterior (reprocessamento de dezembro) não vira "anterior" de novembro.
+    repo.record_risk_snapshot(_aba_inatividade('2025-12-31', [('Ana', 'X', schema.RISCO_ATIVO, 0)]).assign(
+        **{schema.OUT_COL_NIVEL_DESDE: '2025-12-31'}))
+
+    novembro = rodar(2025, 11, _aba_inatividade('2025-11-30', [
+        ('ana ', 'Prof. Alpha', schema.RISCO_2_LARANJA, 50),
+        ('Bia', 'Prof. Beta', schema.RISCO_3_VERMELHO, 90),
+        ('Dani', 'Prof. Alpha', schema.RISCO_PRE_INATIVIDADE, 12),
+    ]))
+
+    assert novembro[schema.OUT_COL_MUDANCA_RISCO].to_dict() == {
+        'Dani': schema.MUDANCA_NOVO_RISCO, 'ana ': schema.MUDANCA_PIOROU,
+        'Bia': schema.MUDANCA_MANTEVE, 'Caio': schema.MUDANCA_SAIU_RISCO,
+    }
+    assert novembro.loc['Bia', schema.OUT_COL_NIVEL_DESDE] == date(2025, 10, 31)
+    assert novembro.loc['Bia', schema.OUT_COL_DIAS_NO_NIVEL] == 30
+    assert novembro.loc['ana ', schema.OUT_COL_RISCO_ANTERIOR] == schema.RISCO_1_AMARELO
+    assert novembro.loc['Caio', schema.OUT_COL_RISCO] == schema.RISCO_ATIVO
+
+    foto = repo.previous_risk_snapshot(date(2025, 12, 1))
+    assert sorted(foto[schema.OUT_COL_NOME]) == ['Bia', 'Dani', 'ana ']
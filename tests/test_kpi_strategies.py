@@ -0,0 +1,46 @@
+import sys
+import math
+import pandas as pd
+from pathlib import Path
+from types import SimpleNamespace
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.domain.services.kpi_calculator_padrao import KpiCalculatorPadrao
+from presenca.domain.services.kpi_strategies import KpiCalendar, build_kpi_strategy
+
+def _semanas():
+    return pd.DataFrame({
+        schema.COL_STUDENT_KEY: [0, 1, 2, 3],
+        schema.COL_DATE: pd.to_datetime(['2025-11-10', '2025-11-10', '2025-11-17', '2025-11-17']),
+        'observed_frequency': [3, 2, 1, 4],
+        'expected_frequency': [4, 3, 2, float('nan')],
+        'justified_days': [0, 1, 0, 0],
+    })
+
+def test_meta_dinamica_vetorizada_desconta_feriados():
+    calendar = KpiCalendar(pd.to_datetime(['2025-11-15', '2025-11-20']).to_numpy())
+
+    meta = build_kpi_strategy('padrao').target(_semanas(), calendar)
+
+    # Semana de 17/11 tem um feriado numa quinta; sábado 15/11 não conta.
+    assert meta.tolist() == [math.ceil(5 * 4 / 5), math.ceil(5 * 3 / 5), math.ceil(4 * 2 / 5), 3]
+
+def test_estrategias_de_comparacao_saem_lado_a_lado():
+    config = SimpleNamespace(KPI_ESTRATEGIAS_COMPARACAO=['dias_fixos', 'limiar'], KPI_DIAS_FIXOS=2,
+                             LIMIAR_ATINGIMENTO_GERAL=0.5)
+
+    calculado = KpiCalculatorPadrao(_semanas(), {'feriados': pd.DataFrame()}, config).calculate()
+
+    assert calculado[schema.OUT_COL_SITUACAO].tolist() == [
+        schema.STATUS_NAO_ATINGIU, schema.STATUS_JUSTIFICADO, schema.STATUS_NAO_ATINGIU, schema.STATUS_ATINGIU
+    ]
+    assert calculado[f"{schema.OUT_COL_SITUACAO} (Dias Fixos)"].tolist() == [
+        schema.STATUS_ATINGIU, schema.STATUS_ATINGIU, schema.STATUS_NAO_ATINGIU, schema.STATUS_ATINGIU
+    ]
+    assert calculado[f"{schema.OUT_COL_SITUACAO} (Limiar)"].tolist() == [
+        schema.STATUS_ATINGIU, schema.STATUS_ATINGIU, schema.STATUS_ATINGIU, schema.STATUS_ATINGIU
+    ]
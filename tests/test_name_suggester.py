@@ -0,0 +1,33 @@
+import sys
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.domain.services.name_suggester import NameSuggester
+
+def _cadastro():
+    return pd.DataFrame({
+        'name': ['José da Conceição', 'Ana Lima Rocha', 'Bruno Souza'],
+        'nome_entrada': ['jose.conceicao', 'ana lima', None],
+    })
+
+def test_sugere_pessoa_mais_proxima_ignorando_acentos_e_caixa():
+    suggester = NameSuggester.from_cadastro(_cadastro(), 'name', 'nome_entrada')
+
+    assert suggester.suggest('JOSE DA CONCEICAO') == 'José da Conceição'
+    assert suggester.suggest('Ana Lma Rocha') == 'Ana Lima Rocha'
+    assert suggester.suggest('ana lim') == 'Ana Lima Rocha'
+    assert suggester.suggest('Bruno Sousa') == 'Bruno Souza'
+
+def test_nomes_distantes_ficam_sem_sugestao():
+    suggester = NameSuggester.from_cadastro(_cadastro(), 'name', 'nome_entrada')
+
+    assert suggester.suggest('Visitante Externo') is None
+    assert suggester.suggest('') is None
+    assert suggester.suggest_many(['Ana Lma Rocha', 'Visitante Externo']) == {
+        'Ana Lma Rocha': 'Ana Lima Rocha',
+        'Visitante Externo': None,
+    }
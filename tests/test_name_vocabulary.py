@@ -0,0 +1,72 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.utils.name_vocabulary import NameVocabulary
+
+def test_ingestao_fatora_nomes_das_batidas():
+    dados = {'registros_brutos': pd.DataFrame({'Name': ['ana', 'bia', 'ana', 'Visitante'], 'Datetime': ['x'] * 4})}
+
+    fontes = dados
+    dados = NameVocabulary().apply_to_sources(fontes)
+    vocabulary = dados['name_vocabulary']
+
+    # As fontes recebidas não são alteradas.
+    assert 'name_vocabulary' not in fontes
+    assert fontes['registros_brutos']['Name'].dtype == object
+
+    assert len(vocabulary) == 3
+    assert isinstance(dados['registros_brutos']['Name'].dtype, pd.CategoricalDtype)
+    assert vocabulary.codes(dados['registros_brutos']['Name']).tolist() == [0, 1, 0, 2]
+    assert vocabulary.codes(pd.Series(['bia', 'desconhecido'])).tolist() == [1, -1]
+
+def test_mascaras_do_vocabulario_chegam_as_linhas():
+    vocabulary = NameVocabulary(['ana', 'bia', 'Visitante'])
+    batidas = pd.Series(['Visitante', 'ana', 'Visitante', 'fora'])
+
+    ignorados = vocabulary.rows(vocabulary.isin({'Visitante'}), batidas)
+    chaves = vocabulary.lookup(pd.Series([7, 8], index=['ana', 'ana']), -1)
+
+    assert ignorados.tolist() == [True, False, True, False]
+    assert chaves.tolist() == [7, -1, -1]
+
+def test_classificacao_respeita_prioridades():
+    vocabulary = NameVocabulary(['ana', 'bia', 'Carla Souza', 'Visitante', 'Desconhecido'])
+
+    cadastro = pd.DataFrame({
+        schema.COL_NAME: ['Ana Lima', 'Bia Rocha', 'Carla Souza'],
+        schema.COL_NOME_ENTRADA: ['ana', 'bia', None],
+    })
+    ignorar = pd.DataFrame({'Nome': ['Bia Rocha', 'Visitante']})
+
+    situacoes = vocabulary.classify(vocabulary.registration_flags(cadastro, ignorar))
+
+    assert situacoes.tolist() == [
+        schema.ACAO_OK_MATCH_CORRETO,
+        schema.ACAO_OK_IGNORADO,
+        schema.ACAO_CORRIGIR_NOME,
+        schema.ACAO_OK_IGNORADO,
+        schema.ACAO_NAO_CADASTRADO,
+    ]
+
+def test_limpeza_e_classificacao_usam_as_mesmas_mascaras():
+    vocabulary = NameVocabulary(['ana', 'Bia Rocha', 'Visitante'])
+    cadastro = pd.DataFrame({
+        schema.COL_NAME: ['Ana Lima', 'Bia Rocha'],
+        schema.COL_NOME_ENTRADA: ['ana', 'bia'],
+    })
+    # 'ana' é nome_entrada de alguém do cadastro: mesmo na lista, não é removida.
+    ignorar = pd.DataFrame({'Nome': ['ana', 'Bia Rocha', 'Visitante']})
+
+    flags = vocabulary.registration_flags(cadastro, ignorar)
+
+    assert vocabulary.ignored(flags).tolist() == [False, False, True]
+    assert vocabulary.classify(flags).tolist() == [
+        schema.ACAO_OK_MATCH_CORRETO, schema.ACAO_OK_IGNORADO, schema.ACAO_OK_IGNORADO
+    ]
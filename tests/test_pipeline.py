@@ -23,6 +23,13 @@ except ImportError:
     pytest.fail("Arquivo configs/settings_local.py nao encontrado")
 
 import main
+import schema
+from presenca.pipeline import PresencePipeline
+from presenca.run_config import RunConfig
+from presenca.utils.data_reader import read_punch_xml
+from presenca.utils.data_writer import DataWriter
+from presenca.utils.punch_archive import PunchArchive
+from presenca.utils.punch_datetime import PunchDatetimeParser
 
 def test_pipeline_com_fixtures_mock(caplog):
     caplog.set_level(logging.INFO)
@@ -116,5 +123,58 @@ def test_pipeline_com_fixtures_mock(caplog):
         settings.ANO_DO_RELATORIO = ano_orig
         settings.MES_DO_RELATORIO = mes_orig
 
+def _fontes() -> dict:
+    fontes = {nome: pd.read_csv(FIXTURES_DIR / f"mock_{nome}.csv")
+              for nome in ('cadastro', 'io_alunos', 'ignorar', 'feriados', 'justificativas')}
+    fontes['registros_brutos'] = read_punch_xml(str(FIXTURES_DIR / "mock_presenca.xml"), PunchDatetimeParser())
+    return fontes
+
+def test_pipeline_e_transformer_compartilham_uma_construcao_de_jornadas(tmp_path):
+    config = RunConfig(2025, 11, only_tabs=(schema.ABA_REPORT_RAW,), settings={'CAMINHOS': {'local': {
+        'output': str(tmp_path), 'dashboard': str(tmp_path / 'dashboard')}}})
+    pipeline = PresencePipeline(data_reader=None, data_writer=DataWriter(config), config=config)
+
+    assert pipeline.run(dados_input=_fontes())
+    assert pipeline.metrics.counters['jornadas_cache_miss'] == 1
+    assert pipeline.metrics.counters['jornadas_cache_hit'] >= 1
+
+def test_arquivo_de_batidas_guarda_todas_as_batidas_lidas_do_mes(tmp_path):
+    config = RunConfig(2025, 11, only_tabs=(schema.ABA_REPORT_RAW,), settings={'CAMINHOS': {'local': {
+        'output': str(tmp_path), 'dashboard': str(tmp_path / 'dashboard')}}})
+    fontes = _fontes()
+    lidas = fontes['registros_brutos']
+    no_mes = lidas['Datetime'].between(pd.Timestamp('2025-11-01'), pd.Timestamp('2025-11-30 23:59:59'))
+    esperadas = int((no_mes & lidas['Name'].notna()).sum())
+
+    assert PresencePipeline(data_reader=None, data_writer=DataWriter(config), config=config).run(dados_input=fontes)
+
+    # Todas as batidas lidas do mês, não só a primeira de cada pessoa por dia nem só as não ignoradas.
+    arquivo = PunchArchive(str(tmp_path / 'dashboard' / schema.PASTA_ARQUIVO_BATIDAS))
+    assert arquivo.months() == ['2025-11']
+    assert len(arquivo.read()) == esperadas
+
+def test_pipeline_nao_altera_os_dados_de_entrada(tmp_path):
+    config = RunConfig(2025, 11, only_tabs=(schema.ABA_REPORT_RAW,), settings={'CAMINHOS': {'local': {
+        'output': str(tmp_path), 'dashboard': str(tmp_path / 'dashboard')}}})
+    fontes = _fontes()
+    originais = {nome: df.copy() for nome, df in fontes.items()}
+
+    assert PresencePipeline(data_reader=None, data_writer=DataWriter(config), config=config).run(dados_input=fontes)
+
+    # Os mesmos dados podem ser reusados em outra execução.
+    assert set(fontes) == set(originais)
+    for nome, df in originais.items():
+        pd.testing.assert_frame_equal(fontes[nome], df)
+
+def test_cubo_de_presenca_so_e_gravado_com_pasta_de_cache(tmp_path):
+    caminhos = {'CAMINHOS': {'local': {'output': str(tmp_path), 'dashboard': str(tmp_path / 'dashboard')}}}
+    for cache_dir in (None, str(tmp_path / 'cache')):
+        config = RunConfig(2025, 11, only_tabs=(schema.ABA_REPORT_RAW,), cache_dir=cache_dir, settings=caminhos)
+        assert PresencePipeline(data_reader=None, data_writer=DataWriter(config), config=config).run(dados_input=_fontes())
+
+    cubo = schema.ARQUIVO_CUBO_PRESENCA.format(data_fim='2025-11-30')
+    assert not (tmp_path / 'dashboard' / cubo).exists()
+    assert (tmp_path / 'cache' / cubo).exists()
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
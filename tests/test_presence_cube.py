@@ -0,0 +1,43 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.domain.models.presence_cube import PresenceCube
+from presenca.utils.student_keys import StudentKeyRegistry
+
+def _cube():
+    keys = [3, 3, 3, 1, 1]
+    dates = pd.to_datetime(['2025-11-03', '2025-11-03', '2025-11-09', '2025-11-05', '2025-11-12'])
+    return PresenceCube.from_punches(keys, dates.to_numpy(dtype='datetime64[D]'))
+
+def test_cubo_conta_dias_distintos_por_semana():
+    cube = _cube()
+    semanas = np.array(['2025-11-03', '2025-11-03', '2025-11-10', '2025-11-03'], dtype='datetime64[D]')
+
+    contagens = cube.days_present([3, 1, 1, 7], semanas)
+
+    # Duas batidas na mesma segunda contam um dia; domingo entra na semana.
+    assert contagens.tolist() == [2, 1, 1, 0]
+
+def test_cubo_ultima_presenca_por_aluno():
+    ultima = _cube().last_presence()
+
+    assert ultima[3] == pd.Timestamp('2025-11-09')
+    assert ultima[1] == pd.Timestamp('2025-11-12')
+
+def test_cubo_persiste_por_id_stonelab(tmp_path):
+    registry = StudentKeyRegistry()
+    keys = registry.encode(pd.Series(['1001', '1002']))
+    cube = PresenceCube.from_punches(keys, np.array(['2025-11-03', '2025-11-04'], dtype='datetime64[D]'))
+
+    path = cube.to_npz(str(tmp_path / 'cubo.npz'), registry)
+    relido = PresenceCube.from_npz(path, registry)
+
+    assert relido.start == cube.start
+    assert np.array_equal(relido.student_keys, cube.student_keys)
+    assert np.array_equal(relido.presence, cube.presence)
@@ -0,0 +1,29 @@
+import sys
+import pytest
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.domain.models.processed_data import ProcessedData
+
+def test_container_e_somente_leitura():
+    cadastro = pd.DataFrame({'name': ['Ana']})
+    dados = ProcessedData({'cadastro': cadastro})
+
+    with pytest.raises(TypeError):
+        dados['cadastro'] = pd.DataFrame()
+
+    assert dados['cadastro'] is cadastro
+    assert dados.get('feriados') is None
+    assert 'cadastro' in dados
+
+def test_replace_gera_novo_container_sem_alterar_o_original():
+    dados = ProcessedData({'cadastro': pd.DataFrame({'name': ['Ana']})})
+    novos = dados.replace(feriados=pd.DataFrame({'Data': ['2025-11-20']}))
+
+    assert 'feriados' not in dados
+    assert set(novos) == {'cadastro', 'feriados'}
+    assert novos['cadastro'] is dados['cadastro']
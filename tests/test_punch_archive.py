@@ -0,0 +1,57 @@
+import sys
+import numpy as np
+import pandas as pd
+from datetime import date
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.run_config import RunConfig
+from presenca.utils.punch_archive import PunchArchive, build_punch_archive
+
+def _batidas(linhas) -> pd.DataFrame:
+    nomes, horarios = zip(*linhas)
+    return pd.DataFrame({schema.COL_NOME_ENTRADA: list(nomes), 'Datetime': pd.to_datetime(list(horarios))})
+
+def test_arquivo_mensal_com_recorte_por_data_e_regravacao(tmp_path):
+    arquivo = PunchArchive(str(tmp_path / 'arquivo'))
+    arquivo.append_month(_batidas([('Ana', '2025-10-20 08:00'), ('Bia', '2025-10-02 09:00'),
+                                   ('Ana', '2025-10-02 07:00')]), date(2025, 10, 1))
+    arquivo.append_month(_batidas([('Caio', '2025-11-03 08:00'), ('Ana', None)]), date(2025, 11, 1))
+    # Reprocessar novembro substitui a partição; o vocabulário só cresce.
+    arquivo.append_month(_batidas([('bia ', '2025-11-05 10:00'), ('Ana', '2025-11-04 18:00')]), date(2025, 11, 1))
+
+    relido = PunchArchive(str(tmp_path / 'arquivo'))
+    assert relido.months() == ['2025-10', '2025-11']
+    assert relido.vocabulary == ['Ana', 'Bia', 'Caio', 'bia']
+
+    codes, horarios = next(relido.slices('2025-10-02', '2025-10-02'))
+    assert isinstance(horarios.base, np.memmap) and horarios.dtype == np.dtype('datetime64[s]')
+    assert [relido.vocabulary[c] for c in codes] == ['Ana', 'Bia']
+
+    recorte = relido.read('2025-10-15', '2025-11-04')
+    assert recorte.values.tolist() == [['Ana', pd.Timestamp('2025-10-20 08:00')], ['Ana', pd.Timestamp('2025-11-04 18:00')]]
+
+    ultimos = relido.last_punch_by_name(date(2025, 11, 30)).set_index('nome_norm')
+    assert ultimos['Data'].to_dict() == {'ANA': pd.Timestamp('2025-11-04'), 'BIA': pd.Timestamp('2025-11-05')}
+    assert relido.last_punch_by_name(date(2025, 10, 31)).set_index('nome_norm')['Data'].to_dict() == {
+        'ANA': pd.Timestamp('2025-10-20'), 'BIA': pd.Timestamp('2025-10-02')}
+
+def test_particao_guarda_so_o_proprio_mes(tmp_path):
+    arquivo = PunchArchive(str(tmp_path / 'arquivo'))
+    arquivo.append_month(_batidas([('Ana', '2025-10-31 18:00'), ('Ana', '2025-11-03 08:00'),
+                                   ('Bia', '2025-11-30 23:00'), ('Bia', '2025-12-01 08:00')]), date(2025, 11, 1))
+
+    assert arquivo.months() == ['2025-11']
+    assert arquivo.read()['Datetime'].dt.strftime('%Y-%m-%d').tolist() == ['2025-11-03', '2025-11-30']
+
+def test_fora_do_modo_local_o_arquivo_exige_pasta_configurada(tmp_path):
+    caminhos = {'local': {'dashboard': str(tmp_path / 'dashboard')}}
+
+    assert build_punch_archive(RunConfig(2025, 11, mode='colab', settings={'CAMINHOS': caminhos})) is None
+    assert build_punch_archive(RunConfig(2025, 11, settings={'CAMINHOS': caminhos})).root == str(tmp_path / 'dashboard' / schema.PASTA_ARQUIVO_BATIDAS)
+    configurado = RunConfig(2025, 11, mode='colab', settings={'ARQUIVO_BATIDAS_DIR': str(tmp_path / 'arquivo')})
+    assert build_punch_archive(configurado).root == str(tmp_path / 'arquivo')
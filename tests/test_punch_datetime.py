@@ -0,0 +1,29 @@
+import sys
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.utils.punch_datetime import PunchDatetimeParser
+
+def test_formato_brasileiro_le_dia_antes_do_mes():
+    horarios = pd.Series(['03/11/2025 08:30:00', '04/11/2025 17:45:10', '13/11/2025 09:00:00'])
+
+    parser = PunchDatetimeParser()
+    datas = parser.parse(horarios)
+
+    assert parser.detect_format(horarios) == '%d/%m/%Y %H:%M:%S'
+    assert datas.iloc[0] == pd.Timestamp('2025-11-03 08:30:00')
+    assert datas.iloc[1] == pd.Timestamp('2025-11-04 17:45:10')
+
+def test_horarios_fora_do_formato_usam_conversao_por_valor_distinto():
+    horarios = pd.Series(['2025-11-03 08:30:00', '2025-11-03 08:31', 'lixo', None, '2025-11-04 10:00:00'])
+
+    datas = PunchDatetimeParser().parse(horarios)
+
+    assert pd.api.types.is_datetime64_any_dtype(datas)
+    assert datas.iloc[1] == pd.Timestamp('2025-11-03 08:31:00')
+    assert datas.iloc[2:4].isna().all()
+    assert datas.iloc[4] == pd.Timestamp('2025-11-04 10:00:00')
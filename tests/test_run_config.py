@@ -0,0 +1,49 @@
+import sys
+import pickle
+import dataclasses
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from presenca.cli import build_parser, config_from_args
+from presenca.run_config import RunConfig
+
+def _settings():
+    return SimpleNamespace(ANO_DO_RELATORIO=2025, MES_DO_RELATORIO=11, MODO_EXECUCAO='local',
+                           CAMINHOS={'local': {'output': 'output'}}, minusculo='ignorado')
+
+def test_config_imutavel_com_nomes_legados():
+    settings = _settings()
+    config = RunConfig.from_settings(settings, month=2)
+
+    assert config.DATA_INICIO_GERAL == '2025-02-01'
+    assert config.DATA_FIM_GERAL == '2025-02-28'
+    assert config.MODO_EXECUCAO == 'local'
+    assert not hasattr(config, 'minusculo')
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.month = 3
+    with pytest.raises(TypeError):
+        config.CAMINHOS['colab'] = {}
+
+    # Cópia tirada na criação: o módulo de settings segue intocado e independente.
+    settings.CAMINHOS['local']['output'] = 'outro'
+    assert config.CAMINHOS['local']['output'] == 'output'
+    assert not hasattr(settings, 'DATA_INICIO_GERAL')
+
+    assert pickle.loads(pickle.dumps(config)) == config
+
+def test_cli_monta_config():
+    args = build_parser().parse_args(['run', '--profile', 'colab', '--year', '2024', '--month', '3',
+                                      '--mode', 'local', '--workers', '2', '--only-tabs', 'B', 'Z'])
+    config = config_from_args(args)
+
+    assert (config.year, config.month, config.mode, config.workers, config.profile) == (2024, 3, 'local', 2, 'colab')
+    assert config.only_tabs == ('B', 'Z')
+
+    with pytest.raises(ValueError):
+        RunConfig.from_settings(_settings(), month=13)
@@ -0,0 +1,51 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.utils.student_keys import StudentKeyRegistry
+
+def test_ids_equivalentes_recebem_mesma_chave():
+    registry = StudentKeyRegistry()
+    keys = registry.encode(pd.Series([1001, '1001 ', '1001.0', 1002.0, None, '']))
+
+    assert keys[0] == keys[1] == keys[2]
+    assert keys[3] != keys[0]
+    assert keys[4] == StudentKeyRegistry.MISSING
+    assert keys[5] == StudentKeyRegistry.MISSING
+    assert list(registry.decode(keys[:4])) == ['1001', '1001', '1001', '1002']
+
+def test_lookup_sem_registro_nao_cria_chaves():
+    registry = StudentKeyRegistry()
+    registry.encode(pd.Series(['1001']))
+
+    keys = registry.encode(pd.Series(['1001', '9999']), register=False)
+
+    assert keys.tolist() == [0, StudentKeyRegistry.MISSING]
+    assert len(registry) == 1
+
+def test_fontes_compartilham_o_mesmo_espaco_de_chaves():
+    dados = {
+        'cadastro': pd.DataFrame({schema.CADASTRO_ID_STONELAB: [1001, 1002]}),
+        'io_alunos': pd.DataFrame({schema.IO_COL_ID_RAW: ['1002.0', '1001']}),
+        'justificativas': pd.DataFrame({schema.JUSTIFICATIVA_ID_STONELAB: [' 1001']}),
+    }
+
+    fontes = dados
+    dados = StudentKeyRegistry().apply_to_sources(fontes)
+
+    # As fontes recebidas não são alteradas.
+    assert set(fontes) == {'cadastro', 'io_alunos', 'justificativas'}
+    assert schema.COL_STUDENT_KEY not in fontes['cadastro'].columns
+    assert fontes['io_alunos'][schema.IO_COL_ID_RAW].tolist() == ['1002.0', '1001']
+
+    assert dados['cadastro'][schema.COL_STUDENT_KEY].tolist() == [0, 1]
+    assert dados['io_alunos'][schema.COL_STUDENT_KEY].tolist() == [1, 0]
+    assert dados['justificativas'][schema.COL_STUDENT_KEY].tolist() == [0]
+    assert dados['io_alunos'][schema.IO_COL_ID_RAW].tolist() == ['1002', '1001']
+    assert dados['cadastro'][schema.COL_STUDENT_KEY].dtype == np.int32
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = TEST_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import schema
+from presenca.tab_plan import STAGES, TabPlan
+
+def test_sem_alvos_roda_tudo():
+    plan = TabPlan()
+
+    assert plan.stages == [stage.name for stage in STAGES]
+    assert plan.write_excel and plan.update_dashboard
+    assert plan.select({'A': 1}) == {'A': 1}
+
+def test_dashboard_roda_so_ate_o_kpi_sem_excel():
+    plan = TabPlan([schema.ALVO_DASHBOARD])
+
+    assert plan.stages == ['base', 'kpi', 'report_raw']
+    assert not plan.write_excel
+    assert plan.update_dashboard
+
+def test_dependencias_e_selecao_das_abas():
+    plan = TabPlan([schema.ABA_ACAO_COBRANCA, schema.ABA_PERMANENCIA, 'Nao_Existe'])
+
+    assert plan.stages == ['base', 'kpi', 'rollup', 'debtors', 'summary', 'dwell']
+    assert plan.unknown == ['Nao_Existe']
+    assert not plan.update_dashboard
+
+    geradas = {schema.ABA_ACAO_COBRANCA: 1, schema.ABA_RESUMO_POR_ALUNO: 2,
+               schema.ABA_PERMANENCIA: 3, schema.ABA_PERMANENCIA_COORDENADORES: 4}
+    assert list(plan.select(geradas)) == [schema.ABA_ACAO_COBRANCA, schema.ABA_PERMANENCIA]